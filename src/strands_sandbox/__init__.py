@@ -5,20 +5,36 @@ Provides unified interface for multiple sandbox backend implementations.
 """
 
 from .code_interpreter import CodeInterpreter
+from .daemon import DaemonCodeInterpreter, SandboxDaemon
 from .e2bcodeinterpreter import E2BCodeInterpreter
 from .models import (
+    BaseAction,
+    CancelExecutionAction,
+    CancelJobAction,
+    CheckpointSessionAction,
     CodeInterpreterInput,
     ExecuteCodeAction,
     ExecuteCommandAction,
+    ExecutionError,
+    ExecutionResult,
     FileContent,
+    ForkSessionAction,
+    GetJobAction,
     InitSessionAction,
     LanguageType,
     ListFilesAction,
     ListLocalSessionsAction,
     ReadFilesAction,
     RemoveFilesAction,
+    RestoreSessionAction,
+    SandboxEnvironment,
+    StartJobAction,
+    SyncFilesAction,
     WriteFilesAction,
 )
+from .recording import RecordingCodeInterpreter, ReplayCodeInterpreter
+from .router import RouterCodeInterpreter
+from .scheduler import Priority, SandboxScheduler, SchedulerTimeoutError
 
 __version__ = "0.1.0"
 
@@ -26,17 +42,39 @@ __all__ = [
     # Main classes
     "CodeInterpreter",
     "E2BCodeInterpreter",
+    "RouterCodeInterpreter",
+    "RecordingCodeInterpreter",
+    "ReplayCodeInterpreter",
+    "DaemonCodeInterpreter",
+    # Daemon
+    "SandboxDaemon",
+    # Scheduling
+    "SandboxScheduler",
+    "Priority",
+    "SchedulerTimeoutError",
     # Models
     "CodeInterpreterInput",
     "LanguageType",
     "FileContent",
+    "SandboxEnvironment",
+    "ExecutionResult",
+    "ExecutionError",
     # Actions
+    "BaseAction",
     "InitSessionAction",
     "ListLocalSessionsAction",
     "ExecuteCodeAction",
     "ExecuteCommandAction",
+    "CancelExecutionAction",
+    "StartJobAction",
+    "GetJobAction",
+    "CancelJobAction",
+    "CheckpointSessionAction",
+    "RestoreSessionAction",
+    "ForkSessionAction",
     "ReadFilesAction",
     "WriteFilesAction",
     "ListFilesAction",
     "RemoveFilesAction",
+    "SyncFilesAction",
 ]
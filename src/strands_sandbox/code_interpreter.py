@@ -5,32 +5,60 @@ This module contains the base tool class that provides lifecycle management
 and can be extended by specific platform implementations.
 """
 
+import copy
+import json
 import logging
+import re
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from strands import tool
 
 from .models import (
+    CancelExecutionAction,
+    CancelJobAction,
+    CheckpointSessionAction,
     CodeInterpreterInput,
     ExecuteCodeAction,
     ExecuteCommandAction,
+    ExecutionResult,
+    ForkSessionAction,
+    GetJobAction,
     InitSessionAction,
     LanguageType,
     ListFilesAction,
     ListLocalSessionsAction,
     ReadFilesAction,
     RemoveFilesAction,
+    RestoreSessionAction,
+    StartJobAction,
+    SyncFilesAction,
     WriteFilesAction,
 )
+from .validation import Validator, default_validators
 
 logger = logging.getLogger(__name__)
 
+# Reference to an earlier batch step's result inside a string field, e.g. {{steps.0.content.0.json.jobId}}
+_STEP_REFERENCE = re.compile(r"\{\{\s*steps\.(\d+)\.([^}\s]+)\s*\}\}")
+
 
 class CodeInterpreter(ABC):
     def __init__(self):
         self._started = False
 
+        # Local syntax checks run on code before it reaches a sandbox; edit or clear per language to customize
+        self.validators: Dict[LanguageType, List[Validator]] = default_validators()
+
+        # Successful results of actions sent with an idempotency key: session -> key -> result,
+        # keeping the most recent idempotency_limit keys per session
+        self.idempotency_limit = 128
+        self._idempotent_results: Dict[str, "OrderedDict[str, Dict[str, Any]]"] = {}
+        self._idempotent_pending: Dict[Tuple[str, str], threading.Event] = {}
+        self._idempotent_lock = threading.Lock()
+
         # Existing description (keep all of it)
         description_template = """
         Code Interpreter tool for executing code in isolated sandbox environments.
@@ -80,10 +108,15 @@ class CodeInterpreter(ABC):
         - listLocalSessions: View all active sessions and their status
         - executeCode: Run code in a specified programming language
         - executeCommand: Execute shell commands in the sandbox
+        - cancelExecution: Interrupt a running execution, keeping the session intact
+        - startJob / getJob / cancelJob: Run code or commands in the background, poll their output, stop them
+        - checkpointSession / restoreSession: Save and restore a session's variables and selected files
+        - forkSession: Clone a session's variables and files into new parallel sessions
         - readFiles: Read file contents from the sandbox file system
         - writeFiles: Create or update files in the sandbox
         - listFiles: Browse directory contents and file structures
         - removeFiles: Delete files from the sandbox environment
+        - syncFiles: Incrementally synchronize a local directory with the sandbox (only changed files move)
 
         Common Usage Scenarios:
         ---------------------
@@ -151,23 +184,55 @@ class CodeInterpreter(ABC):
                 }}
             }}
         )
+
+        # Run several steps in one call; later steps can use earlier results
+        agent.tool.code_interpreter(
+            code_interpreter_input={{
+                "actions": [
+                    {{"type": "writeFiles", "content": [{{"path": "job.py", "text": "print(6 * 7)"}}]}},
+                    {{"type": "startJob", "command": "python job.py"}},
+                    {{"type": "getJob", "job_id": "{{{{steps.1.content.0.json.jobId}}}}"}}
+                ],
+                "stop_on_error": True
+            }}
+        )
 ```
 
         Args:
             code_interpreter_input: Structured input containing the action to perform.
                 Must be a CodeInterpreterInput object with an 'action' field specifying
-                the operation type and required parameters.
+                the operation type and required parameters, or an 'actions' list to run
+                several actions in order within one call (with 'stop_on_error', default true).
+                In a batch, string fields may reference earlier results as
+                {{{{steps.N.<path>}}}}, e.g. {{{{steps.0.content.0.json.checkpointId}}}}.
 
                 Action Types and Required Fields:
                 - InitSessionAction: type="initSession", description (required), session_name (optional)
-                - ExecuteCodeAction: type="executeCode", session_name, code, language, clear_context (optional)
+                - ExecuteCodeAction: type="executeCode", session_name, code, language, clear_context (optional),
+                  timeout (optional, seconds), inputs (optional, Python only)
                   * language must be one of: {{supported_languages_enum}}
-                - ExecuteCommandAction: type="executeCommand", session_name, command
-                - ReadFilesAction: type="readFiles", session_name, paths (list)
+                  * inputs maps variable names to JSON values defined before the code runs; pass data there
+                    instead of embedding it in the code
+                - ExecuteCommandAction: type="executeCommand", session_name, command, timeout (optional, seconds)
+                - CancelExecutionAction: type="cancelExecution", session_name
+                - StartJobAction: type="startJob", session_name, code or command, language (optional)
+                - GetJobAction: type="getJob", session_name, job_id, offset (optional)
+                - CancelJobAction: type="cancelJob", session_name, job_id
+                - CheckpointSessionAction: type="checkpointSession", session_name, paths, skip_variables,
+                  max_variable_bytes (all optional)
+                - RestoreSessionAction: type="restoreSession", session_name, checkpoint_id
+                - ForkSessionAction: type="forkSession", session_name, count or session_names, paths (optional)
+                - ReadFilesAction: type="readFiles", session_name, paths (list), and optionally one of
+                  offset/length, start_line/end_line or tail_lines, plus max_bytes, encoding, binary
                 - WriteFilesAction: type="writeFiles", session_name, content (list of FileContent objects)
-                - ListFilesAction: type="listFiles", session_name, path
-                - RemoveFilesAction: type="removeFiles", session_name, paths (list)
+                - ListFilesAction: type="listFiles", session_name, path, recursive, max_depth, pattern, limit, cursor
+                  * pass the returned nextCursor as cursor to fetch the next page
+                - RemoveFilesAction: type="removeFiles", session_name, paths (list of paths or globs), recursive (optional)
+                - SyncFilesAction: type="syncFiles", session_name, local_path, remote_path, direction
+                  ("upload" or "download"), delete, exclude (all but local_path optional)
                 - ListLocalSessionsAction: type="listLocalSessions"
+                Every action also accepts an optional idempotency_key: a retried call with the same key
+                returns the stored result of the first successful attempt instead of running again.
 
         Returns:
             Dict containing execution results in the format:
@@ -227,10 +292,64 @@ class CodeInterpreter(ABC):
 
         if isinstance(code_interpreter_input, dict):
             logger.debug("Mapping dict to CodeInterpreterInput")
-            action = CodeInterpreterInput.model_validate(code_interpreter_input).action
-        else:
-            action = code_interpreter_input.action
+            code_interpreter_input = CodeInterpreterInput.model_validate(code_interpreter_input)
+
+        if code_interpreter_input.actions is not None:
+            return self.dispatch_batch(code_interpreter_input.actions, code_interpreter_input.stop_on_error)
+        return self.dispatch(code_interpreter_input.action)
+
+    def dispatch(self, action: Any) -> Dict[str, Any]:
+        """Run a single validated action against this platform.
 
+        This is what the tool entry point calls after parsing its input; wrappers that compose
+        interpreters (routing, recording, ...) forward actions through it.
+        """
+        rejected = self._prevalidate(action)
+        if rejected:
+            return rejected
+
+        if not self._started:
+            self._start()
+
+        if action.idempotency_key:
+            return self._dispatch_once(action, action.idempotency_key)
+        return self._route(action)
+
+    def _dispatch_once(self, action: Any, key: str) -> Dict[str, Any]:
+        """Run an action at most once per session and idempotency key, returning the stored result to retries."""
+        session_name = getattr(action, "session_name", None) or getattr(self, "default_session", "")
+        slot = (session_name, key)
+
+        while True:
+            with self._idempotent_lock:
+                results = self._idempotent_results.get(session_name)
+                if results is not None and key in results:
+                    logger.debug(f"Returning stored result for idempotency key '{key}'")
+                    results.move_to_end(key)
+                    # Callers may mutate what they get back; hand out copies of the stored result
+                    return copy.deepcopy(results[key])
+                pending = self._idempotent_pending.get(slot)
+                if pending is None:
+                    self._idempotent_pending[slot] = threading.Event()
+                    break
+            # The same request is already running: wait for it, then take its result or retry if it failed
+            pending.wait()
+
+        try:
+            result = self._route(action)
+            if result.get("status") == "success":
+                with self._idempotent_lock:
+                    results = self._idempotent_results.setdefault(session_name, OrderedDict())
+                    results[key] = copy.deepcopy(result)
+                    while len(results) > self.idempotency_limit:
+                        results.popitem(last=False)
+            return result
+        finally:
+            with self._idempotent_lock:
+                self._idempotent_pending.pop(slot).set()
+
+    def _route(self, action: Any) -> Dict[str, Any]:
+        """Call the implementation method for an action."""
         logger.debug(f"Processing action: {type(action).__name__}")
 
         # Delegate to implementations
@@ -239,9 +358,23 @@ class CodeInterpreter(ABC):
         elif isinstance(action, ListLocalSessionsAction):
             return self.list_local_sessions()
         elif isinstance(action, ExecuteCodeAction):
-            return self.execute_code(action)
+            return self._render(self.execute_code(action))
         elif isinstance(action, ExecuteCommandAction):
-            return self.execute_command(action)
+            return self._render(self.execute_command(action))
+        elif isinstance(action, CancelExecutionAction):
+            return self.cancel_execution(action)
+        elif isinstance(action, StartJobAction):
+            return self.start_job(action)
+        elif isinstance(action, GetJobAction):
+            return self.get_job(action)
+        elif isinstance(action, CancelJobAction):
+            return self.cancel_job(action)
+        elif isinstance(action, CheckpointSessionAction):
+            return self.checkpoint_session(action)
+        elif isinstance(action, RestoreSessionAction):
+            return self.restore_session(action)
+        elif isinstance(action, ForkSessionAction):
+            return self.fork_session(action)
         elif isinstance(action, ReadFilesAction):
             return self.read_files(action)
         elif isinstance(action, ListFilesAction):
@@ -250,6 +383,8 @@ class CodeInterpreter(ABC):
             return self.remove_files(action)
         elif isinstance(action, WriteFilesAction):
             return self.write_files(action)
+        elif isinstance(action, SyncFilesAction):
+            return self.sync_files(action)
         else:
             return {"status": "error", "content": [{"text": f"Unknown action: {type(action)}"}]}
 
@@ -265,6 +400,7 @@ class CodeInterpreter(ABC):
         if self._started:
             self.cleanup_platform()
             self._started = False
+            self._idempotent_results.clear()
             logger.debug("Code Interpreter cleaned up")
 
     def __del__(self):
@@ -276,6 +412,129 @@ class CodeInterpreter(ABC):
         except Exception as e:
             logger.debug("exception=<%s> | platform cleanup during destruction skipped", str(e))
 
+    def dispatch_batch(self, actions: List[Any], stop_on_error: bool = True) -> Dict[str, Any]:
+        """Run an ordered batch of actions within a single tool call.
+
+        String fields may reference results of earlier steps as {{steps.N.<path>}}. Steps run in order through
+        dispatch(); platforms that can pipeline operations may override this.
+        """
+        steps: List[Dict[str, Any]] = []
+        failed = False
+
+        for index, action in enumerate(actions):
+            if failed and stop_on_error:
+                steps.append({"step": index, "type": action.type, "status": "skipped"})
+                continue
+
+            try:
+                action = self._resolve_references(action, steps)
+                result = self.dispatch(action)
+            except Exception as e:
+                logger.error(f"Batch step {index} failed: {str(e)}")
+                result = {"status": "error", "content": [{"text": f"Step {index} failed: {str(e)}"}]}
+
+            steps.append({"step": index, "type": action.type, **result})
+            failed = failed or result.get("status") != "success"
+
+        succeeded = sum(1 for step in steps if step["status"] == "success")
+        return {
+            "status": "error" if failed else "success",
+            "content": [
+                {"text": f"Batch completed: {succeeded} of {len(actions)} step(s) succeeded"},
+                {"json": {"steps": steps}},
+            ],
+        }
+
+    @staticmethod
+    def _resolve_references(action: Any, steps: List[Dict[str, Any]]) -> Any:
+        """Substitute {{steps.N.<path>}} references in an action's string fields with earlier results."""
+
+        def lookup(match: "re.Match[str]") -> str:
+            index = int(match.group(1))
+            if index >= len(steps) or steps[index]["status"] != "success":
+                raise ValueError(f"Reference to step {index}, which has not completed successfully")
+            value: Any = steps[index]
+            for key in match.group(2).split("."):
+                try:
+                    value = value[int(key)] if isinstance(value, list) else value[key]
+                except (KeyError, IndexError, ValueError, TypeError):
+                    raise ValueError(f"Reference '{match.group(0)}' does not match the result of step {index}")
+            return value if isinstance(value, str) else json.dumps(value)
+
+        def substitute(value: Any) -> Any:
+            if isinstance(value, str):
+                return _STEP_REFERENCE.sub(lookup, value)
+            if isinstance(value, list):
+                return [substitute(item) for item in value]
+            if isinstance(value, dict):
+                return {key: substitute(item) for key, item in value.items()}
+            return value
+
+        data = action.model_dump()
+        resolved = substitute(data)
+        return action if resolved == data else type(action).model_validate(resolved)
+
+    def _prevalidate(self, action: Any) -> Optional[Dict[str, Any]]:
+        """Check code locally before execution; returns an error result if a validator rejects it."""
+        code = getattr(action, "code", None)
+        if not code or not isinstance(action, (ExecuteCodeAction, StartJobAction)):
+            return None
+
+        for validator in self.validators.get(action.language, []):
+            error = validator(code)
+            if error:
+                logger.debug(f"Code rejected by local {action.language.value} validation")
+                return {
+                    "status": "error",
+                    "content": [{"text": f"Code was not executed, local validation failed:\n{error}"}],
+                }
+        return None
+
+    @staticmethod
+    def _render(result: Union[Dict[str, Any], ExecutionResult]) -> Dict[str, Any]:
+        """Render a structured execution result to the tool-result format (plain dicts pass through)."""
+        return result.to_tool_result() if isinstance(result, ExecutionResult) else result
+
+    def _unsupported(self, action: Any) -> Dict[str, Any]:
+        """Error result for optional actions a platform does not implement."""
+        return {
+            "status": "error",
+            "content": [{"text": f"Action '{action.type}' is not supported by {type(self).__name__}"}],
+        }
+
+    # Optional operations; platforms override the ones they support
+    def cancel_execution(self, action: CancelExecutionAction) -> Dict[str, Any]:
+        """Interrupt the running execution of a session without discarding the session."""
+        return self._unsupported(action)
+
+    def start_job(self, action: StartJobAction) -> Dict[str, Any]:
+        """Start code or a command as a background job."""
+        return self._unsupported(action)
+
+    def get_job(self, action: GetJobAction) -> Dict[str, Any]:
+        """Get the status and incremental output of a background job."""
+        return self._unsupported(action)
+
+    def cancel_job(self, action: CancelJobAction) -> Dict[str, Any]:
+        """Cancel a background job."""
+        return self._unsupported(action)
+
+    def checkpoint_session(self, action: CheckpointSessionAction) -> Dict[str, Any]:
+        """Save a session's interpreter state and selected files to a checkpoint."""
+        return self._unsupported(action)
+
+    def restore_session(self, action: RestoreSessionAction) -> Dict[str, Any]:
+        """Restore a checkpoint into a session."""
+        return self._unsupported(action)
+
+    def fork_session(self, action: ForkSessionAction) -> Dict[str, Any]:
+        """Clone a session's state and files into new sessions."""
+        return self._unsupported(action)
+
+    def sync_files(self, action: SyncFilesAction) -> Dict[str, Any]:
+        """Incrementally synchronize a local directory with a sandbox directory."""
+        return self._unsupported(action)
+
     # Abstract methods that must be implemented by subclasses
     @abstractmethod
     def start_platform(self) -> None:
@@ -293,13 +552,13 @@ class CodeInterpreter(ABC):
         ...
 
     @abstractmethod
-    def execute_code(self, action: ExecuteCodeAction) -> Dict[str, Any]:
-        """Execute code in a sandbox session."""
+    def execute_code(self, action: ExecuteCodeAction) -> Union[Dict[str, Any], ExecutionResult]:
+        """Execute code in a sandbox session, returning a tool result or a structured ExecutionResult."""
         ...
 
     @abstractmethod
-    def execute_command(self, action: ExecuteCommandAction) -> Dict[str, Any]:
-        """Execute a shell command in a sandbox session."""
+    def execute_command(self, action: ExecuteCommandAction) -> Union[Dict[str, Any], ExecutionResult]:
+        """Execute a shell command in a sandbox session, returning a tool result or a structured ExecutionResult."""
         ...
 
     @abstractmethod
@@ -0,0 +1,446 @@
+"""
+Sandbox Daemon
+
+A long-lived local process that owns one CodeInterpreter backend (its sandboxes,
+warm contexts, caches and scheduler) and serves its actions over HTTP on a Unix
+socket or a loopback TCP port. Worker processes use DaemonCodeInterpreter, a thin
+client that forwards every action to the daemon, so many lightweight agents on a
+host share a single pool and capacity limit.
+
+The Unix socket is owner-only; a TCP listener is reachable by every local user,
+so it requires a bearer token (STRANDS_SANDBOX_DAEMON_TOKEN on both sides).
+
+Run it with ``python -m strands_sandbox.daemon --socket /tmp/strands-sandbox.sock``.
+"""
+
+import argparse
+import hmac
+import http.client
+import json
+import logging
+import os
+import select
+import socket
+import socketserver
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from .code_interpreter import CodeInterpreter
+from .models import (
+    CodeInterpreterInput,
+    ExecuteCodeAction,
+    ExecuteCommandAction,
+    InitSessionAction,
+    LanguageType,
+    ListFilesAction,
+    ListLocalSessionsAction,
+    ReadFilesAction,
+    RemoveFilesAction,
+    SyncFilesAction,
+    WriteFilesAction,
+    decode_json_value,
+    dump_action,
+)
+
+logger = logging.getLogger(__name__)
+
+_DISPATCH_PATH = "/v1/dispatch"
+_INFO_PATH = "/v1/info"
+_TOKEN_ENV = "STRANDS_SANDBOX_DAEMON_TOKEN"
+
+
+class _DaemonRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler forwarding requests to the daemon's backend"""
+
+    protocol_version = "HTTP/1.1"
+    server: Any
+
+    def address_string(self) -> str:
+        # Unix socket peers have no host/port
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+    def _send_json(self, status: int, body: Any) -> None:
+        payload = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _authorized(self) -> bool:
+        """Check the bearer token when the daemon requires one, answering 401 otherwise"""
+        token = self.server.sandbox_daemon.token
+        if token is None:
+            return True
+        if hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {token}"):
+            return True
+        self._send_json(401, {"status": "error", "content": [{"text": "Missing or invalid daemon token"}]})
+        return False
+
+    def do_GET(self) -> None:
+        if not self._authorized():
+            return
+        if self.path != _INFO_PATH:
+            self._send_json(404, {"status": "error", "content": [{"text": f"Unknown path: {self.path}"}]})
+            return
+        self._send_json(200, self.server.sandbox_daemon.info())
+
+    def do_POST(self) -> None:
+        if not self._authorized():
+            return
+        if self.path != _DISPATCH_PATH:
+            self._send_json(404, {"status": "error", "content": [{"text": f"Unknown path: {self.path}"}]})
+            return
+
+        if self.server.sandbox_daemon._server is not self.server:
+            # Kept-alive connections outlive serve_forever; refuse work once the daemon is stopping
+            self.close_connection = True
+            self._send_json(503, {"status": "error", "content": [{"text": "Sandbox daemon is shutting down"}]})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            # Bytes travel tagged (see models.encode_json_value) and arrive as bytes again
+            request = CodeInterpreterInput.model_validate(decode_json_value(json.loads(self.rfile.read(length))))
+        except (ValueError, ValidationError) as e:
+            self._send_json(400, {"status": "error", "content": [{"text": f"Invalid request: {str(e)}"}]})
+            return
+
+        self._send_json(200, self.server.sandbox_daemon.handle(request))
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded HTTP server listening on a Unix domain socket"""
+
+    daemon_threads = True
+
+
+class SandboxDaemon:
+    """Serve one CodeInterpreter backend to many client processes"""
+
+    def __init__(
+        self,
+        backend: CodeInterpreter,
+        socket_path: Optional[str] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        token: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the daemon
+
+        Args:
+            backend: Code Interpreter owning the sandboxes, e.g. an E2BCodeInterpreter with a scheduler
+            socket_path: Unix socket to listen on (owner-only permissions); TCP is used if not provided
+            host: TCP host to bind when no socket path is given, default loopback
+            port: TCP port to bind when no socket path is given, default an ephemeral port
+            token: Bearer token clients must present, reads from STRANDS_SANDBOX_DAEMON_TOKEN env var if not
+                provided. Required for TCP, optional for the Unix socket
+        """
+        self.token = token or os.getenv(_TOKEN_ENV)
+        if not socket_path and not self.token:
+            raise ValueError(f"A TCP daemon requires a token. Set token parameter or {_TOKEN_ENV}")
+        self.backend = backend
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self._server: Optional[socketserver.BaseServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        """Address clients connect to: a socket path or http://host:port"""
+        if self.socket_path:
+            return self.socket_path
+        host, port = self._server.server_address[:2] if self._server else (self.host, self.port)
+        return f"http://{host}:{port}"
+
+    def _bind(self) -> None:
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            # Create the socket owner-only from the start instead of restricting it after bind
+            umask = os.umask(0o177)
+            try:
+                self._server = _UnixHTTPServer(self.socket_path, _DaemonRequestHandler)
+            finally:
+                os.umask(umask)
+        else:
+            self._server = ThreadingHTTPServer((self.host, self.port), _DaemonRequestHandler)
+            self._server.daemon_threads = True
+        self._server.sandbox_daemon = self  # type: ignore[attr-defined]
+        self.backend._start()
+        logger.info(f"Sandbox daemon serving {type(self.backend).__name__} on {self.address}")
+
+    def start(self) -> None:
+        """Start serving in a background thread"""
+        self._bind()
+        self._thread = threading.Thread(target=self._server.serve_forever, name="sandbox-daemon", daemon=True)
+        self._thread.start()
+
+    def serve_forever(self) -> None:
+        """Serve in the current thread until interrupted"""
+        self._bind()
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        """Stop serving and clean up the backend"""
+        if self._server is None:
+            return
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        self._server = None
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self.backend._cleanup()
+        logger.info("Sandbox daemon stopped")
+
+    def info(self) -> Dict[str, Any]:
+        """Backend description returned to clients"""
+        info: Dict[str, Any] = {
+            "backend": type(self.backend).__name__,
+            "languages": [language.value for language in self.backend.get_supported_languages()],
+        }
+        if hasattr(self.backend, "get_metrics"):
+            info["metrics"] = self.backend.get_metrics()
+        return info
+
+    def handle(self, request: CodeInterpreterInput) -> Dict[str, Any]:
+        """Run a validated request against the backend"""
+        actions = request.actions if request.actions is not None else [request.action]
+        if any(isinstance(action, SyncFilesAction) for action in actions):
+            # Local paths would resolve on the daemon's host, not the client's
+            return {"status": "error", "content": [{"text": "syncFiles is not available through the sandbox daemon"}]}
+        try:
+            if request.actions is not None:
+                return self.backend.dispatch_batch(request.actions, request.stop_on_error)
+            return self.backend.dispatch(request.action)
+        except Exception as e:
+            logger.error(f"Daemon request failed: {str(e)}")
+            return {"status": "error", "content": [{"text": f"Daemon request failed: {str(e)}"}]}
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket"""
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class DaemonCodeInterpreter(CodeInterpreter):
+    """Code Interpreter client forwarding actions to a SandboxDaemon"""
+
+    def __init__(
+        self,
+        address: Optional[str] = None,
+        timeout: Optional[float] = None,
+        languages: Optional[List[LanguageType]] = None,
+        token: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the client
+
+        Args:
+            address: Daemon socket path or http://host:port, reads from STRANDS_SANDBOX_DAEMON env var if not provided
+            timeout: Socket timeout in seconds for daemon requests, default none (wait for long executions)
+            languages: Languages to advertise, default asked from the daemon
+            token: Daemon bearer token, reads from STRANDS_SANDBOX_DAEMON_TOKEN env var if not provided
+        """
+        self.address = address or os.getenv("STRANDS_SANDBOX_DAEMON")
+        if not self.address:
+            raise ValueError("Daemon address not provided. Set address parameter or STRANDS_SANDBOX_DAEMON")
+        self.request_timeout = timeout
+        self.token = token or os.getenv(_TOKEN_ENV)
+
+        # One persistent connection per calling thread
+        self._local = threading.local()
+
+        # Languages must be known before the base class builds the tool description
+        self._languages = languages or self._fetch_languages()
+        super().__init__()
+
+        # Sessions live in the daemon's shared registry; keep this client's default session private to it
+        self.default_session = f"session-{uuid.uuid4().hex[:12]}"
+
+        logger.info(f"Initialized Daemon Code Interpreter: address={self.address}")
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and connection.sock is not None and select.select([connection.sock], [], [], 0)[0]:
+            # An idle connection only becomes readable when the daemon closed it; replace it before sending
+            self._close_connection()
+            connection = None
+        if connection is None:
+            if self.address.startswith(("http://", "https://")):
+                host = self.address.split("://", 1)[1].rstrip("/")
+                connection = http.client.HTTPConnection(host, timeout=self.request_timeout)
+            else:
+                connection = _UnixHTTPConnection(self.address, timeout=self.request_timeout)
+            self._local.connection = connection
+        return connection
+
+    def _close_connection(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Any:
+        """Send a request to the daemon, retrying once when it cannot have been executed"""
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        for attempt in range(2):
+            connection = self._connection()
+            sent = False
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                sent = True
+                response = connection.getresponse()
+                body = json.loads(response.read())
+                if response.status == 503 and not attempt:
+                    # Refused unexecuted by a stopping daemon; a restarted one may be listening on a new connection
+                    self._close_connection()
+                    continue
+                return body
+            except (ConnectionError, http.client.HTTPException):
+                self._close_connection()
+                # A request that was fully sent may have run; only reads are safe to send again
+                if attempt or (sent and method != "GET"):
+                    raise
+
+    def _fetch_languages(self) -> List[LanguageType]:
+        try:
+            return [LanguageType(language) for language in self._request("GET", _INFO_PATH)["languages"]]
+        except Exception as e:
+            logger.warning(f"Could not query daemon languages, advertising all: {e}")
+            return list(LanguageType)
+
+    def start_platform(self) -> None:
+        """Sandboxes are owned by the daemon"""
+        pass
+
+    def cleanup_platform(self) -> None:
+        """Close this thread's daemon connection; the daemon keeps its sandboxes"""
+        self._close_connection()
+
+    def get_supported_languages(self) -> List[LanguageType]:
+        """Languages served by the daemon"""
+        return self._languages
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Metrics of the daemon's backend"""
+        return self._request("GET", _INFO_PATH).get("metrics", {})
+
+    def _with_default_session(self, action: Any) -> Dict[str, Any]:
+        data = dump_action(action)
+        if "session_name" in data and not data["session_name"]:
+            data["session_name"] = self.default_session
+        return data
+
+    def dispatch(self, action: Any) -> Dict[str, Any]:
+        """Forward an action to the daemon"""
+        if not self._started:
+            self._start()
+
+        try:
+            return self._request("POST", _DISPATCH_PATH, {"action": self._with_default_session(action)})
+        except Exception as e:
+            logger.error(f"Daemon request failed: {str(e)}")
+            return {"status": "error", "content": [{"text": f"Daemon request failed: {str(e)}"}]}
+
+    def dispatch_batch(self, actions: List[Any], stop_on_error: bool = True) -> Dict[str, Any]:
+        """Forward a whole batch to the daemon in a single request"""
+        if not self._started:
+            self._start()
+
+        body = {"actions": [self._with_default_session(action) for action in actions], "stop_on_error": stop_on_error}
+        try:
+            return self._request("POST", _DISPATCH_PATH, body)
+        except Exception as e:
+            logger.error(f"Daemon request failed: {str(e)}")
+            return {"status": "error", "content": [{"text": f"Daemon request failed: {str(e)}"}]}
+
+    def init_session(self, action: InitSessionAction) -> Dict[str, Any]:
+        """Create a session in the daemon"""
+        return self.dispatch(action)
+
+    def list_local_sessions(self) -> Dict[str, Any]:
+        """List all sessions of the daemon"""
+        return self.dispatch(ListLocalSessionsAction(type="listLocalSessions"))
+
+    def execute_code(self, action: ExecuteCodeAction) -> Dict[str, Any]:
+        """Execute code through the daemon"""
+        return self.dispatch(action)
+
+    def execute_command(self, action: ExecuteCommandAction) -> Dict[str, Any]:
+        """Execute a command through the daemon"""
+        return self.dispatch(action)
+
+    def read_files(self, action: ReadFilesAction) -> Dict[str, Any]:
+        """Read files through the daemon"""
+        return self.dispatch(action)
+
+    def list_files(self, action: ListFilesAction) -> Dict[str, Any]:
+        """List files through the daemon"""
+        return self.dispatch(action)
+
+    def remove_files(self, action: RemoveFilesAction) -> Dict[str, Any]:
+        """Remove files through the daemon"""
+        return self.dispatch(action)
+
+    def write_files(self, action: WriteFilesAction) -> Dict[str, Any]:
+        """Write files through the daemon"""
+        return self.dispatch(action)
+
+
+def main() -> None:
+    """Run a daemon serving an E2BCodeInterpreter configured from the command line"""
+    from .e2bcodeinterpreter import E2BCodeInterpreter
+    from .scheduler import SandboxScheduler
+
+    parser = argparse.ArgumentParser(description="Serve a shared E2B sandbox pool to local agent processes")
+    parser.add_argument("--socket", help="Unix socket path to listen on")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host when no socket is given")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port when no socket is given")
+    parser.add_argument("--token", help=f"Bearer token clients must present (default ${_TOKEN_ENV}; required for TCP)")
+    parser.add_argument("--template", help="E2B template to create sandboxes from")
+    parser.add_argument("--sessions-per-sandbox", type=int, default=1, help="Sessions multiplexed per sandbox")
+    parser.add_argument("--max-sandboxes", type=int, default=20, help="Maximum concurrent sandboxes")
+    parser.add_argument("--max-executions", type=int, default=50, help="Maximum concurrent executions")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    backend = E2BCodeInterpreter(
+        persist_sessions=False,
+        template=args.template,
+        sessions_per_sandbox=args.sessions_per_sandbox,
+        scheduler=SandboxScheduler(max_sandboxes=args.max_sandboxes, max_executions=args.max_executions),
+    )
+    SandboxDaemon(backend, socket_path=args.socket, host=args.host, port=args.port, token=args.token).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
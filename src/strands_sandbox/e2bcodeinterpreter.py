@@ -5,27 +5,694 @@ Code Interpreter implementation using E2B (https://e2b.dev) as sandbox backend.
 Maintains a clean design focused on core functionality.
 """
 
+import base64
+import gzip
+import hashlib
+import io
+import json
 import logging
 import os
+import posixpath
+import re
+import shlex
+import tempfile
+import threading
+import time
 import uuid
-from typing import Any, Dict, List, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from fnmatch import fnmatch
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
-from e2b_code_interpreter import code_interpreter_sync
+from e2b_code_interpreter import CommandExitException, Template, TimeoutException, code_interpreter_sync
 
 from .code_interpreter import CodeInterpreter
+from .metrics import Metrics
 from .models import (
+    CancelExecutionAction,
+    CancelJobAction,
+    CheckpointSessionAction,
     ExecuteCodeAction,
     ExecuteCommandAction,
+    ExecutionError,
+    ExecutionResult,
+    ForkSessionAction,
+    GetJobAction,
     InitSessionAction,
     LanguageType,
     ListFilesAction,
     ReadFilesAction,
     RemoveFilesAction,
+    RestoreSessionAction,
+    SandboxEnvironment,
+    StartJobAction,
+    SyncFilesAction,
     WriteFilesAction,
+    encode_json_value,
 )
+from .scheduler import Priority, SandboxScheduler
 
 logger = logging.getLogger(__name__)
 
+# Working directory of the default code context
+_DEFAULT_CWD = "/home/user"
+
+# Parent directory of the per-session working directories of multiplexed sessions
+_SESSIONS_ROOT = "/home/user/sessions"
+
+# Language mapping: LanguageType -> E2B language
+_E2B_LANGUAGES = {
+    LanguageType.PYTHON: "python",
+    LanguageType.JAVASCRIPT: "js",
+    LanguageType.TYPESCRIPT: "ts",
+    LanguageType.R: "r",
+    LanguageType.JAVA: "java",
+    LanguageType.BASH: "bash",
+}
+
+# Standard display formats of an E2B execution result copied into ExecutionResult.results
+_RESULT_FORMATS = ("text", "html", "markdown", "svg", "png", "jpeg", "pdf", "latex", "json", "javascript", "data")
+
+# Bytes of an upload compressed on the host to estimate the size of the SDK's gzip encoding of all of it
+_COMPRESSION_SAMPLE = 256 * 1024
+
+# Output characters a background job keeps in memory; older output is dropped once exceeded
+_JOB_OUTPUT_LIMIT = 1024 * 1024
+
+# Seconds a finished background job stays available to getJob before it is evicted
+_JOB_RETENTION = 600
+
+# Seconds of recent sandbox metrics fetched for a resource sample (E2B collects one every few
+# seconds) and the most sandboxes sampled concurrently
+_METRICS_WINDOW = 60
+_METRICS_WORKERS = 8
+
+# Lifetime in seconds E2B gives a sandbox created without a timeout
+_E2B_DEFAULT_TIMEOUT = 300
+
+# Extra seconds the client waits beyond a command timeout, so the sandbox can kill it and report
+_COMMAND_TIMEOUT_GRACE = 30
+
+# Sandbox-side shell command runner used by execute_command. The command runs in its own
+# process group so that a timeout or an interrupt kills it together with its children,
+# while the output produced so far is still returned.
+_EXECUTE_COMMAND_CODE = """
+def _strands_execute_command(command, timeout):
+    import os, signal, subprocess
+    proc = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True, errors="replace", start_new_session=True)
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+        note, returncode = None, proc.returncode
+    except (subprocess.TimeoutExpired, KeyboardInterrupt) as e:
+        os.killpg(proc.pid, signal.SIGKILL)
+        stdout, stderr = proc.communicate()
+        if isinstance(e, subprocess.TimeoutExpired):
+            note, returncode = f"[timed out after {timeout}s]", 124
+        else:
+            note, returncode = "[cancelled]", 130
+    print(stdout, end='')
+    if stderr:
+        print('[stderr]', stderr, end='')
+    if note:
+        print(note)
+    return returncode
+"""
+
+# Interrupts kernels through the sandbox-local Jupyter server. Runs as a process (not a
+# cell) because the kernel to interrupt is busy. Without explicit IDs, every busy kernel
+# of the sandbox is interrupted.
+_INTERRUPT_CODE = """
+import json, urllib.request
+base = "http://localhost:8888/api/kernels"
+kernel_ids = json.loads({kernel_ids})
+exclude = json.loads({exclude})
+if kernel_ids is None:
+    kernel_ids = [k["id"] for k in json.load(urllib.request.urlopen(base))
+                  if k.get("execution_state") == "busy" and k["id"] not in exclude]
+for kernel_id in kernel_ids:
+    urllib.request.urlopen(urllib.request.Request(f"{{base}}/{{kernel_id}}/interrupt", data=b"", method="POST"))
+print(json.dumps(kernel_ids))
+"""
+
+# Sandbox-side session checkpointing. Runs in the session's own Python context so that
+# globals() is the user namespace. Variables are pickled one by one (cloudpickle when
+# available, so functions and classes defined in the session survive), oversized and
+# unpicklable ones are skipped, and modules are recorded by name to be re-imported.
+_CHECKPOINT_CODE = """
+def _strands_checkpoint(archive, paths, skip, max_bytes):
+    import io, json, os, pickle, tarfile, types
+    try:
+        import cloudpickle as pickler
+    except ImportError:
+        pickler = pickle
+    saved, skipped, modules = [], [], {}
+    with tarfile.open(archive, "w:gz", compresslevel=1) as tar:
+        for name, value in list(globals().items()):
+            if name.startswith("_") or name in skip or name in ("In", "Out", "exit", "quit", "get_ipython"):
+                continue
+            if isinstance(value, types.ModuleType):
+                modules[name] = value.__name__
+                continue
+            try:
+                data = pickler.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                skipped.append({"name": name, "reason": f"not picklable: {type(e).__name__}"})
+                continue
+            if len(data) > max_bytes:
+                skipped.append({"name": name, "reason": f"{len(data)} bytes exceeds limit"})
+                continue
+            info = tarfile.TarInfo(f"vars/{name}")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+            saved.append(name)
+        data = json.dumps(modules).encode()
+        info = tarfile.TarInfo("modules.json")
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+        for path in paths:
+            tar.add(path, arcname="root" + os.path.abspath(path) if os.path.isabs(path) else "files/" + path)
+    print(json.dumps({"variables": saved, "skipped": skipped, "modules": sorted(modules),
+                      "sizeBytes": os.path.getsize(archive)}))
+"""
+
+# Sandbox-side restore of a checkpoint archive into the current context's globals
+_RESTORE_CODE = """
+def _strands_restore(archive):
+    import importlib, json, os, pickle, tarfile
+    try:
+        import cloudpickle
+    except ImportError:
+        pass
+    restored, failed = [], []
+    with tarfile.open(archive, "r:gz") as tar:
+        for member in tar:
+            if member.name == "modules.json":
+                for name, module in json.load(tar.extractfile(member)).items():
+                    try:
+                        globals()[name] = importlib.import_module(module)
+                    except ImportError as e:
+                        failed.append({"name": name, "reason": str(e)})
+            elif member.name.startswith("vars/"):
+                name = member.name[len("vars/"):]
+                try:
+                    globals()[name] = pickle.load(tar.extractfile(member))
+                    restored.append(name)
+                except Exception as e:
+                    failed.append({"name": name, "reason": f"{type(e).__name__}: {e}"})
+            elif member.name.startswith("files/"):
+                member.name = member.name[len("files/"):]
+                tar.extract(member, ".")
+            elif member.name.startswith("root/"):
+                member.name = member.name[len("root/"):]
+                tar.extract(member, "/")
+    os.remove(archive)
+    print(json.dumps({"variables": restored, "failed": failed}))
+"""
+
+# Sandbox-side directory walker used by list_files. Defined as a function so a
+# single run_code call lists, filters and paginates without leaking globals.
+_LIST_FILES_CODE = """
+def _strands_list_files(root, recursive, max_depth, pattern, offset, limit):
+    import fnmatch, json, os, stat
+    entries, matched = [], 0
+    stack = [(root, "", 1)]
+    while stack and len(entries) <= limit:
+        directory, prefix, depth = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                items = sorted(it, key=lambda e: e.name)
+        except OSError:
+            if directory == root:
+                raise
+            continue
+        subdirs = []
+        for item in items:
+            rel = prefix + item.name
+            is_dir = item.is_dir(follow_symlinks=False)
+            if is_dir and recursive and (max_depth is None or depth < max_depth):
+                subdirs.append((item.path, rel + "/", depth + 1))
+            if pattern and not (fnmatch.fnmatch(item.name, pattern) or fnmatch.fnmatch(rel, pattern)):
+                continue
+            matched += 1
+            if matched <= offset:
+                continue
+            try:
+                st = item.stat(follow_symlinks=False)
+                entries.append({"name": rel, "type": "dir" if is_dir else "file", "size": st.st_size,
+                                "mtime": int(st.st_mtime), "mode": stat.filemode(st.st_mode)})
+            except OSError:
+                entries.append({"name": rel, "type": "dir" if is_dir else "file"})
+            if len(entries) > limit:
+                break
+        stack.extend(reversed(subdirs))
+    more = len(entries) > limit
+    print(json.dumps({"files": entries[:limit], "nextCursor": str(offset + limit) if more else None},
+                     separators=(",", ":")))
+"""
+
+# Sandbox-side batch reader used by read_files: reads only the requested slice
+# (byte range, line range or tail) of each file and caps it at max_bytes, so
+# large files never travel whole through the kernel.
+_READ_FILES_CODE = """
+def _strands_read_files(paths, offset, length, start_line, end_line, tail_lines, max_bytes, encoding, binary,
+                        threshold, codecs):
+    import base64, os
+    files = []
+    for path in paths:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            if tail_lines is not None:
+                pos, data = size, b""
+                while pos > 0 and data.count(b"\\n") <= tail_lines and len(data) <= max_bytes:
+                    step = min(65536, pos)
+                    pos -= step
+                    f.seek(pos)
+                    data = f.read(step) + data
+                data = b"".join(data.splitlines(True)[-tail_lines:])
+                truncated = len(data) > max_bytes
+                data = data[-max_bytes:]
+                start = size - len(data)
+            elif start_line is not None or end_line is not None:
+                chunks, total, start, truncated = [], 0, 0, False
+                for number, line in enumerate(f, 1):
+                    if number < (start_line or 1):
+                        start += len(line)
+                        continue
+                    if end_line is not None and number > end_line:
+                        break
+                    chunks.append(line)
+                    total += len(line)
+                    if total > max_bytes:
+                        truncated = True
+                        break
+                data = b"".join(chunks)[:max_bytes]
+            else:
+                end = size if length is None else min(size, offset + length)
+                f.seek(offset)
+                data = f.read(max(0, min(end - offset, max_bytes)))
+                truncated = end - offset > len(data)
+                start = offset
+        if binary:
+            content = base64.b64encode(data).decode("ascii")
+        else:
+            content = data.decode(encoding, errors="replace")
+            if truncated:
+                marker = f"[... truncated: {len(data)} of {size} bytes shown]"
+                content = marker + "\\n" + content if tail_lines is not None else content + "\\n" + marker
+        files.append({"path": path, "content": content, "size": size, "offset": start, "bytes": len(data),
+                      "truncated": truncated, "encoding": "base64" if binary else encoding})
+    _strands_emit(files, threshold, codecs)
+"""
+
+# Sandbox-side batch remover used by remove_files: expands globs, removes files
+# and (optionally) directory trees, and reports a status per requested path.
+_REMOVE_FILES_CODE = """
+def _strands_remove_files(paths, recursive):
+    import glob, json, os, shutil
+    results = []
+    for path in paths:
+        targets = sorted(glob.glob(path)) if glob.has_magic(path) else [path]
+        if not targets:
+            results.append({"path": path, "status": "error", "error": "No files matched"})
+            continue
+        for target in targets:
+            try:
+                if os.path.isdir(target) and not os.path.islink(target):
+                    if not recursive:
+                        raise IsADirectoryError(f"{target} is a directory (set recursive to remove it)")
+                    shutil.rmtree(target)
+                else:
+                    os.remove(target)
+                results.append({"path": target, "status": "removed"})
+            except OSError as e:
+                results.append({"path": target, "status": "error", "error": str(e)})
+    print(json.dumps(results, separators=(",", ":")))
+"""
+
+# Sandbox-side output compression. Payloads travel base64-encoded inside the JSON the
+# kernel prints; zstd is used when both ends have zstandard installed, gzip otherwise.
+# _strands_emit prints a helper's JSON document, wrapped in a compressed envelope once
+# it reaches the threshold.
+_COMPRESSION_CODE = """
+def _strands_compress(data, codecs):
+    import base64, gzip
+    if "zstd" in codecs:
+        try:
+            import zstandard
+            return "zstd", base64.b64encode(zstandard.ZstdCompressor().compress(data)).decode("ascii")
+        except ImportError:
+            pass
+    return "gzip", base64.b64encode(gzip.compress(data, 6)).decode("ascii")
+
+def _strands_emit(document, threshold, codecs):
+    import json
+    text = json.dumps(document, separators=(",", ":"))
+    data = text.encode("utf-8")
+    if threshold is not None and len(data) >= threshold:
+        codec, payload = _strands_compress(data, codecs)
+        text = json.dumps({"_strands_compressed": codec, "size": len(data), "payload": payload})
+    print(text)
+"""
+
+# Stand-in for _COMPRESSION_CODE when compression is disabled
+_PLAIN_EMIT_CODE = """
+def _strands_emit(document, threshold, codecs):
+    import json
+    print(json.dumps(document, separators=(",", ":")))
+"""
+
+# Sandbox-side loaders and dumpers used by push_data/pull_data. Data moves as a binary
+# file through the file API (Arrow IPC stream, Parquet or .npy), never through the
+# kernel's text output; Arrow IPC files are memory-mapped so loading them does not copy.
+_DATA_TRANSFER_CODE = """
+def _strands_describe_data(value):
+    if type(value).__module__.split(".")[0] == "numpy":
+        return {"type": "ndarray", "shape": list(value.shape), "dtype": str(value.dtype)}
+    # Arrow tables expose their names as column_names; their columns are the data itself
+    names = value.column_names if hasattr(value, "column_names") else value.columns
+    return {"type": type(value).__name__, "shape": [value.shape[0], value.shape[1]],
+            "columns": [str(column) for column in names[:100]]}
+
+def _strands_load_data(name, path, fmt, kind):
+    import json, os
+    try:
+        if fmt == "npy":
+            import numpy
+            value = numpy.load(path, allow_pickle=False)
+        else:
+            import pyarrow
+            if fmt == "parquet":
+                import pyarrow.parquet
+                value = pyarrow.parquet.read_table(path)
+            else:
+                import pyarrow.ipc
+                value = pyarrow.ipc.open_stream(pyarrow.memory_map(path)).read_all()
+            if kind == "pandas":
+                value = value.to_pandas()
+    finally:
+        os.remove(path)
+    globals()[name] = value
+    print(json.dumps(_strands_describe_data(value)))
+
+def _strands_dump_data(name, path, fmt):
+    import json, os
+    if name not in globals():
+        raise NameError(f"name '{name}' is not defined")
+    value = globals()[name]
+    kind = type(value).__module__.split(".")[0]
+    if kind == "numpy" and type(value).__name__ == "ndarray":
+        import numpy
+        with open(path, "wb") as f:
+            numpy.save(f, value, allow_pickle=False)
+        fmt = "npy"
+    elif (kind, type(value).__name__) in (("pandas", "DataFrame"), ("pyarrow", "Table")):
+        import pyarrow
+        table = pyarrow.Table.from_pandas(value) if kind == "pandas" else value
+        if fmt == "parquet":
+            import pyarrow.parquet
+            pyarrow.parquet.write_table(table, path)
+        else:
+            import pyarrow.ipc
+            with pyarrow.OSFile(path, "wb") as sink, pyarrow.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            fmt = "arrow"
+    else:
+        raise TypeError(f"'{name}' is a {type(value).__name__}, not a pandas DataFrame, NumPy array or Arrow table")
+    print(json.dumps({"format": fmt, "kind": kind, "bytes": os.path.getsize(path)}))
+"""
+
+# Sandbox-side loader of executeCode inputs, prepended to the user's cell as a single
+# line. It defines the variables from a JSON document encoded by encode_json_value:
+# {"$bytes": base64} objects become bytes and escaped "$$" keys lose one "$".
+# {source} is either the document as a string literal or an expression reading
+# (and removing) the file it was uploaded to.
+_INPUTS_LINE = (
+    "globals().update(__import__('json').loads({source}, object_hook=lambda o: __import__('base64').b64decode("
+    "o['$bytes']) if o.keys() == {{'$bytes'}} else {{(k[1:] if k.startswith('$$') else k): v for k, v in o.items()}}))"
+)
+_INPUTS_FILE_SOURCE = "(lambda p: (p.read_bytes(), p.unlink())[0])(__import__('pathlib').Path({path!r}))"
+
+# Input documents up to this size are embedded in the cell; larger ones are uploaded
+# so the kernel does not parse a large literal
+_INPUTS_INLINE_LIMIT = 64 * 1024
+
+# Sandbox directory holding data files in transit between the host and a session
+_DATA_TRANSFER_DIR = "/tmp/strands_data"
+
+# Sandbox-side helpers used by sync_files. _strands_hash_tree hashes a directory
+# tree in one call, caching digests by (size, mtime) in the session's interpreter
+# so unchanged files are not re-read; _strands_sync_remove deletes files that
+# disappeared from the source, prunes the directories they leave empty and reports
+# the files it could not delete. Symbolic links are not synced.
+_SYNC_FILES_CODE = """
+def _strands_sync_excluded(name, rel, exclude):
+    import fnmatch
+    return any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(rel, p) for p in exclude)
+
+def _strands_hash_tree(root, exclude):
+    import hashlib, json, os
+    cache = globals().setdefault("_strands_hash_cache", {})
+    root = os.path.abspath(root)
+    files = {}
+    for directory, dirs, names in os.walk(root):
+        prefix = os.path.relpath(directory, root).replace(os.sep, "/")
+        prefix = "" if prefix == "." else prefix + "/"
+        dirs[:] = [d for d in dirs if not _strands_sync_excluded(d, prefix + d, exclude)]
+        for name in names:
+            rel, path = prefix + name, os.path.join(directory, name)
+            if _strands_sync_excluded(name, rel, exclude) or os.path.islink(path) or not os.path.isfile(path):
+                continue
+            st = os.stat(path)
+            key = (st.st_size, st.st_mtime_ns)
+            cached = cache.get(path)
+            if cached is None or cached[0] != key:
+                digest = hashlib.sha256()
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+                cached = cache[path] = (key, digest.hexdigest())
+            files[rel] = cached[1]
+    print(json.dumps({"root": root, "exists": os.path.isdir(root), "files": files}, separators=(",", ":")))
+
+def _strands_sync_remove(root, rels):
+    import json, os
+    removed, failed = [], {}
+    for rel in rels:
+        path = os.path.join(root, rel)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            failed[rel] = str(e)
+            continue
+        removed.append(rel)
+        parent = os.path.dirname(path)
+        while parent != root and parent.startswith(root):
+            try:
+                os.rmdir(parent)
+            except OSError:
+                break
+            parent = os.path.dirname(parent)
+    print(json.dumps({"removed": removed, "failed": failed}))
+"""
+
+# Upper bound of file data sent in a single batched upload request
+_SYNC_BATCH_BYTES = 16 * 1024 * 1024
+
+
+def _sync_excluded(name: str, rel: str, exclude: List[str]) -> bool:
+    return any(fnmatch(name, pattern) or fnmatch(rel, pattern) for pattern in exclude)
+
+
+def _hash_local_tree(root: str, exclude: List[str], cache: Dict[str, Tuple[Tuple[int, int], str]]) -> Dict[str, str]:
+    """
+    Content hashes of a local directory tree (relative path -> sha256), reusing cached digests of unchanged files
+
+    Symbolic links are skipped, so only files inside the tree are read.
+    """
+    files = {}
+    for directory, dirs, names in os.walk(root):
+        prefix = os.path.relpath(directory, root).replace(os.sep, "/")
+        prefix = "" if prefix == "." else prefix + "/"
+        dirs[:] = [d for d in dirs if not _sync_excluded(d, prefix + d, exclude)]
+        for name in names:
+            rel, path = prefix + name, os.path.join(directory, name)
+            if _sync_excluded(name, rel, exclude) or os.path.islink(path) or not os.path.isfile(path):
+                continue
+            st = os.stat(path)
+            key = (st.st_size, st.st_mtime_ns)
+            cached = cache.get(path)
+            if cached is None or cached[0] != key:
+                digest = hashlib.sha256()
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+                cached = cache[path] = (key, digest.hexdigest())
+            files[rel] = cached[1]
+    return files
+
+
+def _outside_root(root: str, rel: str) -> bool:
+    """Whether a relative path resolves outside root, through '..' or a symbolic link on the way"""
+    path = os.path.realpath(os.path.join(root, rel))
+    return os.path.commonpath([path, root]) != root
+
+
+def _compression_codecs() -> List[str]:
+    """Codecs this host can decompress, preferred first"""
+    return ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Sandbox sent zstd-compressed data but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _serialize_data(data: Any, fmt: Optional[str]) -> Tuple[str, str, bytes]:
+    """Serialize a DataFrame, array or Arrow table to (format, kind, bytes) without importing unused libraries"""
+    kind, type_name = type(data).__module__.split(".")[0], type(data).__name__
+    if kind == "numpy" and type_name == "ndarray":
+        if fmt not in (None, "npy"):
+            raise ValueError(f"NumPy arrays are transferred as npy, not {fmt}")
+        import numpy
+
+        buffer = io.BytesIO()
+        numpy.save(buffer, data, allow_pickle=False)
+        return "npy", kind, buffer.getvalue()
+
+    if (kind, type_name) not in (("pandas", "DataFrame"), ("pyarrow", "Table")):
+        raise TypeError(f"Cannot transfer {type_name}; expected a pandas DataFrame, NumPy array or Arrow table")
+    if fmt not in (None, "arrow", "parquet"):
+        raise ValueError(f"Tables are transferred as arrow or parquet, not {fmt}")
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow is required to transfer DataFrames and Arrow tables") from None
+
+    table = pyarrow.Table.from_pandas(data) if kind == "pandas" else data
+    sink = pyarrow.BufferOutputStream()
+    if fmt == "parquet":
+        pyarrow.parquet.write_table(table, sink)
+    else:
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return fmt or "arrow", kind, sink.getvalue().to_pybytes()
+
+
+def _deserialize_data(data: bytearray, fmt: str, kind: str) -> Any:
+    """
+    Rebuild a value serialized by the sandbox, sharing memory with the downloaded buffer where the format allows
+
+    Arrow tables and NumPy arrays are views over the buffer; DataFrames are converted from Arrow by pandas.
+    """
+    if fmt == "npy":
+        import numpy
+        from numpy.lib import format as npy_format
+
+        stream = io.BytesIO(data)
+        version = npy_format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = npy_format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = npy_format.read_array_header_2_0(stream)
+        array = numpy.frombuffer(data, dtype=dtype, offset=stream.tell(), count=int(numpy.prod(shape)))
+        return array.reshape(shape, order="F" if fortran_order else "C")
+
+    import pyarrow
+
+    if fmt == "parquet":
+        import pyarrow.parquet
+
+        table = pyarrow.parquet.read_table(pyarrow.BufferReader(data))
+    else:
+        import pyarrow.ipc
+
+        table = pyarrow.ipc.open_stream(pyarrow.py_buffer(data)).read_all()
+    return table.to_pandas() if kind == "pandas" else table
+
+
+@dataclass
+class _Job:
+    """Background job state, updated by the thread that drives the job"""
+
+    job_id: str
+    kind: str
+    status: str = "running"
+    exit_code: Optional[int] = None
+    error: Optional[str] = None
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    context: Any = None
+    handle: Any = None
+    # Retained output; offsets count all output produced, including the dropped characters
+    chunks: Deque[str] = field(default_factory=deque)
+    retained: int = 0
+    dropped: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def append(self, text: str) -> None:
+        with self.lock:
+            self.chunks.append(text)
+            self.retained += len(text)
+            while self.retained > _JOB_OUTPUT_LIMIT:
+                excess = self.retained - _JOB_OUTPUT_LIMIT
+                if len(self.chunks[0]) > excess:
+                    self.chunks[0] = self.chunks[0][excess:]
+                else:
+                    excess = len(self.chunks.popleft())
+                self.retained -= excess
+                self.dropped += excess
+
+    def read(self, offset: int) -> Tuple[str, int, int]:
+        """Output from an offset, as (text, next offset, characters dropped before it could be read)"""
+        with self.lock:
+            output = "".join(self.chunks)
+            end = self.dropped + len(output)
+            return output[max(offset - self.dropped, 0):], end, max(min(self.dropped, end) - offset, 0)
+
+    def finish(self, status: str, exit_code: Optional[int] = None, error: Optional[str] = None) -> None:
+        # A cancelled job keeps its status when its runner returns afterwards
+        if self.status == "running":
+            self.status = status
+        self.exit_code = exit_code
+        self.error = error
+        self.finished_at = time.time()
+
+
+@dataclass
+class _PendingSandbox:
+    """Shared sandbox being created, with the sessions already placed on it"""
+
+    future: Future = field(default_factory=Future)
+    sessions: int = 1
+
+
+@dataclass
+class _SessionStats:
+    """Resource usage accounting of one session"""
+
+    created_at: float = field(default_factory=time.time)
+    last_used: Optional[float] = None
+    executions: int = 0
+    execution_seconds: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
 
 class E2BCodeInterpreter(CodeInterpreter):
     """E2B-based Code Interpreter implementation"""
@@ -38,6 +705,19 @@ class E2BCodeInterpreter(CodeInterpreter):
         auto_create: bool = True,
         persist_sessions: bool = True,
         timeout: int = 300,
+        template: Optional[str] = None,
+        environment: Optional[SandboxEnvironment] = None,
+        template_cache_path: Optional[str] = None,
+        sessions_per_sandbox: int = 1,
+        checkpoint_dir: Optional[str] = None,
+        scheduler: Optional[SandboxScheduler] = None,
+        tenant: str = "default",
+        priority: Priority = Priority.INTERACTIVE,
+        sync_root: Optional[str] = None,
+        prewarm: bool = False,
+        prewarm_session_names: Optional[List[str]] = None,
+        http2: Optional[bool] = None,
+        compression_threshold: Optional[int] = 64 * 1024,
     ) -> None:
         """
         Initialize E2B Code Interpreter
@@ -49,8 +729,34 @@ class E2BCodeInterpreter(CodeInterpreter):
             auto_create: Whether to auto-create sessions, default True
             persist_sessions: Whether to persist sessions (skip cleanup on destruction), default True
             timeout: Sandbox timeout in seconds, default 300
+            template: E2B template name or ID to create sandboxes from, optional (defaults to E2B code interpreter)
+            environment: Environment declaration prebuilt into a template on top of `template`, optional
+            template_cache_path: JSON file caching environment hash -> built template ID,
+                default ~/.cache/strands_sandbox/templates.json
+            sessions_per_sandbox: Maximum sessions multiplexed onto one sandbox, default 1 (one sandbox per session).
+                Above 1, each session gets its own interpreter contexts and working directory inside a shared
+                sandbox, and a new sandbox is created once all existing ones are full
+            checkpoint_dir: Local directory storing session checkpoints, default a new temporary directory
+            scheduler: Admission control shared with other interpreters, optional. Sandbox creation and
+                executions wait for capacity and fail with a clear error once its max_wait is exceeded
+            tenant: Tenant name used for fair queuing in the scheduler, default "default"
+            priority: Scheduling priority class of this interpreter, default interactive
+            sync_root: Local directory that syncFiles paths are resolved against and confined to, optional.
+                syncFiles gives the model read and write access to this directory and is disabled when it is not set
+            prewarm: Start creating the default session in the background at construction, default False.
+                The first call using it waits for the in-flight creation instead of starting another
+            prewarm_session_names: Named sessions to create in the background at construction as well, optional
+            http2: Use HTTP/2 (True) or HTTP/1.1 (False) for the interpreter's E2B API and sandbox file and
+                command calls, optional (default E2B_HTTP_VERSION, else HTTP/2). Code execution always uses
+                HTTP/1.1; connection pool limits are set process-wide by the SDK's E2B_MAX_CONNECTIONS,
+                E2B_MAX_KEEPALIVE_CONNECTIONS and E2B_KEEPALIVE_EXPIRY environment variables
+            compression_threshold: Size in bytes from which file payloads are compressed in transit, default 64 KiB.
+                None disables compression
         """
         super().__init__()
+        if sessions_per_sandbox < 1:
+            raise ValueError("sessions_per_sandbox must be at least 1")
+
         self.api_key = api_key or os.getenv("E2B_API_KEY")
         if not self.api_key:
             raise ValueError("E2B API Key not provided. Set api_key parameter or E2B_API_KEY environment variable")
@@ -60,67 +766,186 @@ class E2BCodeInterpreter(CodeInterpreter):
         self.auto_create = auto_create
         self.persist_sessions = persist_sessions
         self.timeout = timeout
+        self.sessions_per_sandbox = sessions_per_sandbox
+        self.checkpoint_dir = checkpoint_dir
+        self.scheduler = scheduler
+        self.tenant = tenant
+        self.priority = priority
+        self.sync_root = os.path.realpath(sync_root) if sync_root else None
+        self.http_version = None if http2 is None else "2" if http2 else "1.1"
+        self.compression_threshold = compression_threshold
+        self.template = template
+        self.environment = environment
+        self.template_cache_path = template_cache_path or os.path.join(
+            os.path.expanduser("~"), ".cache", "strands_sandbox", "templates.json"
+        )
+
+        # Template resolved from the environment declaration (built lazily on first sandbox creation)
+        self._resolved_template: Optional[str] = None
+        self._template_lock = threading.Lock()
 
         # Default session name
         self.default_session = f"session-{uuid.uuid4().hex[:12]}"
 
+        # Scheduler capacity held by live sandboxes: sandbox_id -> lease ID
+        self._sandbox_leases: Dict[str, str] = {}
+
         # Session storage: session_name -> Sandbox
         self._sessions: Dict[str, code_interpreter_sync.Sandbox] = {}
 
+        # Multiplexed sessions: session_name -> working directory
+        self._session_cwds: Dict[str, str] = {}
+        # Reused interpreter contexts: (session_name, language) -> Context
+        self._contexts: Dict[Tuple[str, str], Any] = {}
+        # Contexts being created: (session_name, language) -> Future of the context
+        self._context_futures: Dict[Tuple[str, str], Future] = {}
+        self._sessions_lock = threading.Lock()
+        # Shared sandboxes being created, and sessions placed on a sandbox but not attached yet
+        self._pending_sandboxes: List[_PendingSandbox] = []
+        self._reserved: Dict[str, int] = {}
+
+        self.metrics = Metrics()
+        # Called with (session_name, code, language) for every snippet run in a session's kernel
+        self.code_observer: Optional[Callable[[str, str, Optional[str]], None]] = None
+
+        # Background jobs: session_name -> job_id -> _Job
+        self._jobs: Dict[str, Dict[str, _Job]] = {}
+
+        # Usage accounting: session_name -> _SessionStats
+        self._stats: Dict[str, _SessionStats] = {}
+        self._stats_lock = threading.Lock()
+
+        # Local sync manifests: session_name -> local file path -> ((size, mtime_ns), sha256)
+        self._sync_manifests: Dict[str, Dict[str, Tuple[Tuple[int, int], str]]] = {}
+
+        # Background session creation: session_name -> in-flight creation; finished ones not yet used by a call
+        self.prewarm = prewarm
+        self.prewarm_session_names = list(prewarm_session_names or [])
+        self._prewarming: Dict[str, Future] = {}
+        self._prewarmed: set = set()
+        self._prewarm_lock = threading.Lock()
+        self._prewarm_executor: Optional[ThreadPoolExecutor] = None
+
         logger.info(
             f"Initialized E2B Code Interpreter: api_url={self.api_url or 'default'}, "
             f"auto_create={auto_create}, persist_sessions={persist_sessions}"
         )
 
+        # Overlap sandbox boot with whatever the caller does next (typically the first model inference)
+        if prewarm or self.prewarm_session_names:
+            self._start()
+
     def start_platform(self) -> None:
-        """E2B does not require platform-level initialization"""
-        pass
+        """Start pre-warming sessions if configured"""
+        names = ([self.default_session] if self.prewarm else []) + self.prewarm_session_names
+        if names:
+            self.prewarm_sessions(names)
+
+    def prewarm_sessions(self, session_names: Optional[List[str]] = None) -> None:
+        """
+        Start creating sessions in the background
+
+        Calls using one of these sessions wait for its in-flight creation instead of creating it again.
+
+        Args:
+            session_names: Sessions to create, default the default session
+        """
+        with self._prewarm_lock:
+            if self._prewarm_executor is None:
+                self._prewarm_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="e2b-prewarm")
+            for session_name in session_names or [self.default_session]:
+                if session_name in self._sessions or session_name in self._prewarming:
+                    continue
+                logger.info(f"Pre-warming session: {session_name}")
+                self._prewarming[session_name] = self._prewarm_executor.submit(self._prewarm_session, session_name)
+
+    def _prewarm_session(self, session_name: str) -> None:
+        """Create a session in the background; failures are left for the first call to retry"""
+        try:
+            with self.metrics.timer("session_prewarm"):
+                self._create_session(session_name)
+            self._prewarmed.add(session_name)
+        except Exception as e:
+            logger.warning(f"Pre-warming session '{session_name}' failed: {e}")
+
+    def _await_prewarm(self, session_name: str) -> bool:
+        """
+        Wait for an in-flight background creation of a session
+
+        Returns:
+            True if the session was pre-warmed and is used for the first time by the caller
+        """
+        with self._prewarm_lock:
+            future = self._prewarming.get(session_name)
+        if future is not None:
+            if not future.done():
+                self.metrics.increment("session_prewarm_waits")
+            future.result()
+            with self._prewarm_lock:
+                self._prewarming.pop(session_name, None)
+
+        with self._prewarm_lock:
+            if session_name in self._prewarmed:
+                self._prewarmed.discard(session_name)
+                return True
+        return False
 
     def cleanup_platform(self) -> None:
         """Clean up platform resources"""
         if not self._started:
             return
 
+        # Let in-flight background creations finish so their sandboxes are accounted for below
+        for session_name in list(self._prewarming):
+            self._await_prewarm(session_name)
+        self._prewarmed.clear()
+        with self._prewarm_lock:
+            if self._prewarm_executor is not None:
+                self._prewarm_executor.shutdown(wait=True)
+                self._prewarm_executor = None
+
         if not self.persist_sessions:
             logger.info("Cleaning up E2B sandbox resources")
-            for session_name, sandbox in list(self._sessions.items()):
+            sandboxes = {sandbox.sandbox_id: sandbox for sandbox in self._sessions.values()}
+            for sandbox_id, sandbox in sandboxes.items():
                 try:
-                    sandbox.kill()
-                    logger.debug(f"Closed session: {session_name}")
+                    self._kill_sandbox(sandbox)
+                    logger.debug(f"Closed sandbox: {sandbox_id}")
                 except Exception as e:
-                    logger.debug(f"Session {session_name} cleanup failed: {e}")
+                    logger.debug(f"Sandbox {sandbox_id} cleanup failed: {e}")
 
             self._sessions.clear()
+            self._session_cwds.clear()
+            self._contexts.clear()
+            self._context_futures.clear()
+            self._jobs.clear()
+            self._stats.clear()
+            self._sync_manifests.clear()
             logger.info("E2B platform cleanup completed")
         else:
             logger.debug("Skipping cleanup - sessions persisted (persist_sessions=True)")
+            # Persisted sandboxes are no longer managed here; hand their capacity back
+            if self.scheduler:
+                for lease in self._sandbox_leases.values():
+                    self.scheduler.release_sandbox(lease)
+            self._sandbox_leases.clear()
 
     def init_session(self, action: InitSessionAction) -> Dict[str, Any]:
         """Initialize a new E2B sandbox session"""
         session_name = action.session_name or self.default_session
 
-        if session_name in self._sessions:
+        # A pre-warmed session is handed to the first initSession asking for it
+        prewarmed = self._await_prewarm(session_name)
+        if session_name in self._sessions and not prewarmed:
             return {
                 "status": "error",
                 "content": [{"text": f"Session '{session_name}' already exists"}]
             }
 
         try:
-            logger.info(f"Creating E2B sandbox session: {session_name}")
-            
-            # Build creation parameters
-            create_kwargs = {'api_key': self.api_key}
-            if self.api_url:
-                create_kwargs['api_url'] = self.api_url
-            if self.domain:
-                create_kwargs['domain'] = self.domain
-            if self.timeout:
-                create_kwargs['timeout'] = self.timeout
-            
-            sandbox = code_interpreter_sync.Sandbox.create(**create_kwargs)
-            self._sessions[session_name] = sandbox
-
-            logger.info(f"Session created successfully: {session_name} (ID: {sandbox.sandbox_id})")
+            if not prewarmed:
+                self._create_session(session_name)
+            sandbox = self._sessions[session_name]
 
             return {
                 "status": "success",
@@ -130,6 +955,7 @@ class E2BCodeInterpreter(CodeInterpreter):
                             "sessionName": session_name,
                             "description": action.description,
                             "sessionId": sandbox.sandbox_id,
+                            "workingDirectory": self._session_cwds.get(session_name),
                         }
                     }
                 ],
@@ -142,14 +968,410 @@ class E2BCodeInterpreter(CodeInterpreter):
                 "content": [{"text": f"Failed to create session '{session_name}': {str(e)}"}],
             }
 
+    def _create_session(self, session_name: str) -> code_interpreter_sync.Sandbox:
+        """Create a session on a dedicated or shared sandbox"""
+        logger.info(f"Creating E2B sandbox session: {session_name}")
+
+        if self.sessions_per_sandbox > 1:
+            sandbox = self._attach_shared_session(session_name)
+        else:
+            sandbox = self._create_sandbox()
+            with self._sessions_lock:
+                self._sessions[session_name] = sandbox
+
+        self._stats[session_name] = _SessionStats()
+
+        logger.info(f"Session created successfully: {session_name} (ID: {sandbox.sandbox_id})")
+        return sandbox
+
+    def _attach_shared_session(self, session_name: str) -> code_interpreter_sync.Sandbox:
+        """
+        Place a multiplexed session on a sandbox with free capacity
+
+        Picks the first sandbox hosting fewer than sessions_per_sandbox sessions and spills
+        over to a newly created sandbox when all are full. The session gets its own working
+        directory; its interpreter contexts are created on first use.
+        """
+        # Reserve a place under the lock; sandbox creation and setup happen outside it
+        pending, creator = None, False
+        with self._sessions_lock:
+            load: Dict[str, int] = dict(self._reserved)
+            candidates: Dict[str, code_interpreter_sync.Sandbox] = {}
+            for name in self._session_cwds:
+                sandbox = self._sessions[name]
+                load[sandbox.sandbox_id] = load.get(sandbox.sandbox_id, 0) + 1
+                candidates[sandbox.sandbox_id] = sandbox
+
+            sandbox = next(
+                (sb for sb_id, sb in candidates.items() if load[sb_id] < self.sessions_per_sandbox), None
+            )
+            if sandbox is not None:
+                self._reserved[sandbox.sandbox_id] = self._reserved.get(sandbox.sandbox_id, 0) + 1
+            else:
+                pending = next(
+                    (p for p in self._pending_sandboxes if p.sessions < self.sessions_per_sandbox), None
+                )
+                if pending is not None:
+                    pending.sessions += 1
+                else:
+                    pending = _PendingSandbox()
+                    self._pending_sandboxes.append(pending)
+                    creator = True
+
+        if sandbox is None:
+            if creator:
+                logger.debug(f"All shared sandboxes full, creating a new one for session '{session_name}'")
+                try:
+                    sandbox = self._create_sandbox()
+                except Exception as e:
+                    with self._sessions_lock:
+                        self._pending_sandboxes.remove(pending)
+                    pending.future.set_exception(e)
+                    raise
+                with self._sessions_lock:
+                    self._pending_sandboxes.remove(pending)
+                    self._reserved[sandbox.sandbox_id] = self._reserved.get(sandbox.sandbox_id, 0) + pending.sessions
+                pending.future.set_result(sandbox)
+            else:
+                sandbox = pending.future.result()
+
+        cwd = None
+        try:
+            safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", session_name)
+            if safe_name != session_name:
+                safe_name += "-" + hashlib.sha1(session_name.encode("utf-8")).hexdigest()[:8]
+            sandbox.files.make_dir(f"{_SESSIONS_ROOT}/{safe_name}")
+            cwd = f"{_SESSIONS_ROOT}/{safe_name}"
+            return sandbox
+        finally:
+            # Publish the session and drop its reservation in one step
+            with self._sessions_lock:
+                self._reserved[sandbox.sandbox_id] -= 1
+                if not self._reserved[sandbox.sandbox_id]:
+                    del self._reserved[sandbox.sandbox_id]
+                if cwd is not None:
+                    self._sessions[session_name] = sandbox
+                    self._session_cwds[session_name] = cwd
+
+    def _get_context(self, session_name: str, language: str) -> Any:
+        """Get the interpreter context of a session for a language, creating and caching it on first use"""
+        key = (session_name, language)
+        with self._sessions_lock:
+            context = self._contexts.get(key)
+            if context is not None:
+                self.metrics.increment("context_reuse")
+                return context
+
+            # Only the first caller creates the context; concurrent callers wait for it
+            future = self._context_futures.get(key)
+            creator = future is None
+            if creator:
+                future = self._context_futures[key] = Future()
+                sandbox = self._sessions[session_name]
+                cwd = self._session_cwds.get(session_name)
+
+        if not creator:
+            return future.result()
+
+        logger.debug(f"Creating {language} context for session '{session_name}'")
+        try:
+            with self.metrics.timer("context_create"):
+                context = sandbox.create_code_context(cwd=cwd, language=language)
+        except Exception as e:
+            with self._sessions_lock:
+                if self._context_futures.get(key) is future:
+                    del self._context_futures[key]
+            future.set_exception(e)
+            raise
+
+        with self._sessions_lock:
+            # Contexts dropped while this one was being created are not cached
+            if self._context_futures.get(key) is future:
+                del self._context_futures[key]
+                self._contexts[key] = context
+        future.set_result(context)
+        return context
+
+    def _drop_contexts(self, session_name: str) -> None:
+        """Forget the cached contexts of a session (e.g. after its sandbox was replaced)"""
+        with self._sessions_lock:
+            for key in [key for key in self._contexts if key[0] == session_name]:
+                del self._contexts[key]
+            for key in [key for key in self._context_futures if key[0] == session_name]:
+                del self._context_futures[key]
+
+    def _run_code(
+        self,
+        session_name: str,
+        code: str,
+        language: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+        context: Any = None,
+        slot: Any = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run code in the session's cached context for the language (kwargs are passed to run_code)
+
+        When a timings dict is given, it receives the seconds spent queuing for an execution slot ("queue")
+        and running ("execution"), also when the execution raises. A given context is used instead of the
+        cached one, and a given slot (an execution slot the caller already holds) instead of acquiring one.
+        """
+        with ExitStack() as held:
+            if slot is not None:
+                # Released with the execution, whatever happens from here on
+                held.push(slot)
+            sandbox = self._sessions[session_name]
+            if self.code_observer is not None:
+                self.code_observer(session_name, code, language)
+            queued = time.perf_counter()
+            if slot is None:
+                held.enter_context(self._execution_slot())
+            execution = None
+            start = time.perf_counter()
+            try:
+                if context is not None:
+                    execution = sandbox.run_code(code, context=context, **kwargs)
+                elif session_name not in self._session_cwds and language in (None, "python"):
+                    # A dedicated sandbox's default Python context is already warm
+                    execution = sandbox.run_code(code, **kwargs)
+                else:
+                    execution = sandbox.run_code(
+                        code, context=self._get_context(session_name, language or "python"), **kwargs
+                    )
+                return execution
+            finally:
+                elapsed = time.perf_counter() - start
+                if timings is not None:
+                    timings["queue"] = start - queued
+                    timings["execution"] = elapsed
+                self._record_usage(
+                    session_name,
+                    seconds=elapsed,
+                    bytes_in=len(code.encode("utf-8")),
+                    bytes_out=self._execution_size(execution),
+                )
+
+    @staticmethod
+    def _execution_size(execution: Any) -> int:
+        """Approximate size in bytes of the output returned by an execution"""
+        if execution is None:
+            return 0
+        size = 0
+        if execution.logs:
+            size += sum(len(line.encode("utf-8")) for line in execution.logs.stdout + execution.logs.stderr)
+        for result in execution.results or []:
+            if result is not None and result.text:
+                size += len(result.text.encode("utf-8"))
+        return size
+
+    def _record_usage(
+        self, session_name: str, seconds: float = 0.0, bytes_in: int = 0, bytes_out: int = 0, executions: int = 1
+    ) -> None:
+        """Add an operation to the session's usage accounting"""
+        with self._stats_lock:
+            stats = self._stats.setdefault(session_name, _SessionStats())
+            stats.last_used = time.time()
+            stats.executions += executions
+            stats.execution_seconds += seconds
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+
+    def _interrupt(self, session_name: str) -> List[str]:
+        """
+        Interrupt whatever the session is running, keeping its state
+
+        A dedicated sandbox only runs this session, so all of its busy kernels are
+        interrupted except those of background jobs. A multiplexed session only
+        interrupts its own contexts.
+
+        Returns:
+            IDs of the interrupted kernels
+        """
+        kernel_ids = None
+        if session_name in self._session_cwds:
+            kernel_ids = [context.id for (name, _), context in self._contexts.items() if name == session_name]
+            if not kernel_ids:
+                return []
+        # Background jobs run in their own contexts and are only stopped by cancelJob
+        jobs = [job.context.id for job in self._jobs.get(session_name, {}).values() if job.context is not None]
+        return self._interrupt_kernels(self._sessions[session_name], kernel_ids, exclude=jobs)
+
+    @staticmethod
+    def _interrupt_kernels(
+        sandbox: code_interpreter_sync.Sandbox, kernel_ids: Optional[List[str]], exclude: Optional[List[str]] = None
+    ) -> List[str]:
+        """Interrupt the given kernels of a sandbox (all busy kernels not in exclude when None)"""
+        code = _INTERRUPT_CODE.format(
+            kernel_ids=repr(json.dumps(kernel_ids)), exclude=repr(json.dumps(exclude or []))
+        )
+        result = sandbox.commands.run(f"python3 -c {shlex.quote(code)}", timeout=30)
+        return json.loads(result.stdout)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return interpreter metrics (context creation/reuse, transfer compression and other timings)"""
+        snapshot = self.metrics.snapshot()
+        counters = snapshot["counters"]
+        if counters.get("compression_bytes_compressed"):
+            snapshot["compressionRatio"] = counters["compression_bytes_raw"] / counters["compression_bytes_compressed"]
+        return snapshot
+
+    def _api_params(self) -> Dict[str, Any]:
+        """Connection parameters shared by sandbox and template API calls, selecting the same connection pool"""
+        params: Dict[str, Any] = {'api_key': self.api_key}
+        if self.http_version:
+            params['http_version'] = self.http_version
+        if self.api_url:
+            params['api_url'] = self.api_url
+        if self.domain:
+            params['domain'] = self.domain
+        return params
+
+    def _create_sandbox(self) -> code_interpreter_sync.Sandbox:
+        """Create a sandbox from the configured template and connection parameters"""
+        create_kwargs = self._api_params()
+        if self.timeout:
+            create_kwargs['timeout'] = self.timeout
+
+        template = self._resolve_template()
+        if template:
+            create_kwargs['template'] = template
+
+        lease = None
+        if self.scheduler:
+            # E2B kills the sandbox once its timeout is over, so its capacity lapses with it
+            lease = self.scheduler.acquire_sandbox(
+                self.tenant, self.priority, lifetime=self.timeout or _E2B_DEFAULT_TIMEOUT
+            )
+        try:
+            with self.metrics.timer("sandbox_create"):
+                sandbox = code_interpreter_sync.Sandbox.create(**create_kwargs)
+        except Exception:
+            if self.scheduler:
+                self.scheduler.release_sandbox(lease)
+            raise
+        if lease is not None:
+            self._sandbox_leases[sandbox.sandbox_id] = lease
+        return sandbox
+
+    def _kill_sandbox(self, sandbox: code_interpreter_sync.Sandbox) -> None:
+        """Kill a sandbox and return its scheduler capacity"""
+        try:
+            sandbox.kill()
+        finally:
+            lease = self._sandbox_leases.pop(sandbox.sandbox_id, None)
+            if self.scheduler and lease is not None:
+                self.scheduler.release_sandbox(lease)
+
+    def _execution_slot(self) -> Any:
+        """Context holding a scheduler execution slot (no-op without a scheduler)"""
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.execution(self.tenant, self.priority)
+
+    def _resolve_template(self) -> Optional[str]:
+        """
+        Resolve the template to create sandboxes from
+
+        Without an environment declaration this is the configured template. Otherwise the
+        declaration is mapped to a prebuilt template, looked up by its hash in memory, then
+        in the on-disk cache, then by name on E2B, and only built when none of those hit.
+        """
+        if self.environment is None:
+            return self.template
+
+        with self._template_lock:
+            if self._resolved_template:
+                return self._resolved_template
+
+            base_template = self.template or code_interpreter_sync.Sandbox.default_template
+            fingerprint = self.environment.fingerprint(base_template)
+            cache = self._load_template_cache()
+
+            template_id = cache.get(fingerprint)
+            if template_id:
+                logger.debug(f"Using cached template {template_id} for environment {fingerprint[:12]}")
+            else:
+                template_id = self._build_template(base_template, fingerprint)
+                cache[fingerprint] = template_id
+                self._save_template_cache(cache)
+
+            self._resolved_template = template_id
+            return template_id
+
+    def _build_template(self, base_template: str, fingerprint: str) -> str:
+        """Build (or reuse an already built) E2B template for the environment declaration"""
+        name = f"strands-env-{fingerprint[:16]}"
+        if Template.exists(name, **self._api_params()):
+            logger.info(f"Reusing existing template '{name}'")
+            return name
+
+        logger.info(f"Building template '{name}' from '{base_template}'")
+        builder = Template().from_template(base_template)
+        if self.environment.apt_packages:
+            builder = builder.apt_install(self.environment.apt_packages)
+        if self.environment.requirements:
+            builder = builder.pip_install(self.environment.requirements)
+        if self.environment.setup_script:
+            builder = builder.run_cmd(self.environment.setup_script)
+
+        build_info = Template.build(builder, name, **self._api_params())
+        logger.info(f"Template built: {name} (ID: {build_info.template_id})")
+        return build_info.template_id
+
+    def _load_template_cache(self) -> Dict[str, str]:
+        """Load the environment hash -> template ID cache"""
+        try:
+            with open(self.template_cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_template_cache(self, cache: Dict[str, str]) -> None:
+        """Persist the environment hash -> template ID cache"""
+        try:
+            os.makedirs(os.path.dirname(self.template_cache_path), exist_ok=True)
+            with open(self.template_cache_path, "w") as f:
+                json.dump(cache, f, indent=2)
+        except OSError as e:
+            logger.debug(f"Template cache write skipped: {e}")
+
     def list_local_sessions(self) -> Dict[str, Any]:
-        """List all local sessions"""
+        """List all local sessions with their usage accounting"""
+        # Background creations add sessions concurrently, so work on a snapshot
+        with self._sessions_lock:
+            sessions = list(self._sessions.items())
+
+        # One resource sample per sandbox, shared by the sessions multiplexed onto it
+        sandboxes = {sandbox.sandbox_id: sandbox for _, sandbox in sessions}
+        samples: Dict[str, Optional[Dict[str, Any]]] = {}
+        if sandboxes:
+            # Each sample is an API round-trip, so sandboxes are sampled concurrently
+            workers = min(len(sandboxes), _METRICS_WORKERS)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="e2b-metrics") as executor:
+                samples = dict(zip(sandboxes, executor.map(self._sample_resources, sandboxes.values())))
+
         sessions_info = []
-        for name, sandbox in self._sessions.items():
-            sessions_info.append({
-                "sessionName": name,
-                "sessionId": sandbox.sandbox_id,
-            })
+        totals = {"executions": 0, "executionSeconds": 0.0, "bytesIn": 0, "bytesOut": 0}
+        with self._stats_lock:
+            for name, sandbox in sessions:
+                stats = self._stats.get(name) or _SessionStats()
+                sessions_info.append({
+                    "sessionName": name,
+                    "sessionId": sandbox.sandbox_id,
+                    "createdAt": stats.created_at,
+                    "lastUsed": stats.last_used,
+                    "executions": stats.executions,
+                    "executionSeconds": round(stats.execution_seconds, 3),
+                    "bytesIn": stats.bytes_in,
+                    "bytesOut": stats.bytes_out,
+                    "resources": samples.get(sandbox.sandbox_id),
+                })
+                totals["executions"] += stats.executions
+                totals["executionSeconds"] += stats.execution_seconds
+                totals["bytesIn"] += stats.bytes_in
+                totals["bytesOut"] += stats.bytes_out
+        totals["executionSeconds"] = round(totals["executionSeconds"], 3)
 
         return {
             "status": "success",
@@ -157,12 +1379,34 @@ class E2BCodeInterpreter(CodeInterpreter):
                 {
                     "json": {
                         "sessions": sessions_info,
-                        "totalSessions": len(sessions_info)
+                        "totalSessions": len(sessions_info),
+                        "totalSandboxes": len(samples),
+                        "totals": totals,
                     }
                 }
             ],
         }
 
+    @staticmethod
+    def _sample_resources(sandbox: code_interpreter_sync.Sandbox) -> Optional[Dict[str, Any]]:
+        """Latest CPU/memory sample of a sandbox, None when metrics are unavailable"""
+        try:
+            # Only the latest sample is used, so skip the sandbox's full history
+            metrics = sandbox.get_metrics(start=datetime.now(timezone.utc) - timedelta(seconds=_METRICS_WINDOW))
+        except Exception as e:
+            logger.debug(f"Metrics unavailable for sandbox {sandbox.sandbox_id}: {e}")
+            return None
+        if not metrics:
+            return None
+        latest = metrics[-1]
+        return {
+            "cpuCount": latest.cpu_count,
+            "cpuUsedPct": latest.cpu_used_pct,
+            "memUsedBytes": latest.mem_used,
+            "memTotalBytes": latest.mem_total,
+            "sampledAt": latest.timestamp.timestamp(),
+        }
+
     def _ensure_session(self, session_name: Optional[str]) -> tuple[str, Optional[Dict[str, Any]]]:
         """
         Ensure session exists
@@ -175,6 +1419,7 @@ class E2BCodeInterpreter(CodeInterpreter):
         """
         target_session = session_name or self.default_session
 
+        self._await_prewarm(target_session)
         if target_session in self._sessions:
             return target_session, None
 
@@ -211,69 +1456,65 @@ class E2BCodeInterpreter(CodeInterpreter):
 
         try:
             # Restart sandbox if context needs to be cleared
-            if action.clear_context:
+            if action.clear_context and session_name in self._session_cwds:
+                # Shared sandbox: only reset this session's interpreter contexts
+                logger.debug("Clearing context, restarting session contexts")
+                for (name, _), context in list(self._contexts.items()):
+                    if name == session_name:
+                        sandbox.restart_code_context(context)
+            elif action.clear_context:
                 logger.debug("Clearing context, restarting sandbox")
-                sandbox.kill()
-                
-                create_kwargs = {'api_key': self.api_key}
-                if self.api_url:
-                    create_kwargs['api_url'] = self.api_url
-                if self.domain:
-                    create_kwargs['domain'] = self.domain
-                if self.timeout:
-                    create_kwargs['timeout'] = self.timeout
-                
-                sandbox = code_interpreter_sync.Sandbox.create(**create_kwargs)
-                self._sessions[session_name] = sandbox
+                self._kill_sandbox(sandbox)
+                self._drop_contexts(session_name)
+                # Jobs ran in the killed sandbox
+                for job in self._jobs.pop(session_name, {}).values():
+                    job.finish("cancelled", error="Session context was cleared")
+                sandbox = self._create_sandbox()
+                with self._sessions_lock:
+                    self._sessions[session_name] = sandbox
+
+            e2b_language = _E2B_LANGUAGES.get(action.language, "python")
+            code, inputs_size = action.code, 0
+            if action.inputs:
+                loader, inputs_size = self._inputs_loader(session_name, action.inputs)
+                if code.lstrip().startswith("%%"):
+                    # A cell magic has to open its cell, so the loader runs on its own
+                    execution = self._run_code(session_name, loader)
+                    if execution.error:
+                        raise RuntimeError(f"Failed to load inputs: {execution.error.value}")
+                else:
+                    code = f"{loader}\n{code}"
+
+            # Execute code in the session's reused context for the language, keeping
+            # streamed output so a timed-out execution can still report it
+            result = ExecutionResult(
+                kind="code", timeout=action.timeout, bytes_in=len(action.code.encode("utf-8")) + inputs_size
+            )
+            timings: Dict[str, float] = {}
+            try:
+                execution = self._run_code(
+                    session_name,
+                    code,
+                    language=e2b_language,
+                    timings=timings,
+                    timeout=action.timeout,
+                    on_stdout=lambda message: result.stdout.append(message.line),
+                    on_stderr=lambda message: result.stderr.append(message.line),
+                )
+            except TimeoutException:
+                if action.timeout is None:
+                    raise
+                logger.warning(f"Execution in session '{session_name}' timed out after {action.timeout}s")
+                try:
+                    self._interrupt(session_name)
+                except Exception as e:
+                    logger.error(f"Failed to interrupt session '{session_name}': {e}")
+                result.timed_out = True
+                return self._finish_result(result, timings)
 
-            # Language mapping: LanguageType -> E2B language
-            language_map = {
-                LanguageType.PYTHON: "python",
-                LanguageType.JAVASCRIPT: "js",
-                LanguageType.TYPESCRIPT: "ts",
-                LanguageType.R: "r",
-                LanguageType.JAVA: "java",
-                LanguageType.BASH: "bash",
-            }
-            
-            e2b_language = language_map.get(action.language, "python")
-            
-            # Execute code (pass language parameter)
-            execution = sandbox.run_code(action.code, language=e2b_language)
-
-            # Collect output
-            output_parts = []
-            
-            # Add stdout
-            if execution.logs and execution.logs.stdout:
-                output_parts.extend([line.rstrip() for line in execution.logs.stdout if line.strip()])
-            
-            # Add stderr
-            if execution.logs and execution.logs.stderr:
-                stderr_lines = [line.rstrip() for line in execution.logs.stderr if line.strip()]
-                if stderr_lines:
-                    output_parts.append("[stderr]")
-                    output_parts.extend(stderr_lines)
-            
-            # Add results (if any and not None)
-            if execution.results:
-                for result in execution.results:
-                    if result is not None and result.text:
-                        output_parts.append(f"=> {result.text}")
-
-            output = "\n".join(output_parts) if output_parts else "(no output)"
-
-            # Check for errors
-            if execution.error:
-                return {
-                    "status": "error",
-                    "content": [{"text": f"Execution error: {execution.error.name}\n{execution.error.value}"}]
-                }
-
-            return {
-                "status": "success",
-                "content": [{"text": output}]
-            }
+            self._fill_result(result, execution)
+            result.cancelled = result.error is not None and result.error.name == "KeyboardInterrupt"
+            return self._finish_result(result, timings)
 
         except Exception as e:
             logger.error(f"Code execution failed: {str(e)}")
@@ -282,88 +1523,522 @@ class E2BCodeInterpreter(CodeInterpreter):
                 "content": [{"text": f"Code execution failed: {str(e)}"}]
             }
 
+    def _inputs_loader(self, session_name: str, inputs: Dict[str, Any]) -> Tuple[str, int]:
+        """
+        Build the line that defines executeCode inputs as variables of the session's Python namespace
+
+        The line runs in the same cell as the user's code, so inputs cost no extra execution. Small documents are
+        embedded in it; larger ones are uploaded through the file API and read by the line. Returns the line and
+        the size in bytes of the document.
+        """
+        document = json.dumps(encode_json_value(inputs), separators=(",", ":"))
+        payload = document.encode("utf-8")
+
+        if len(payload) <= _INPUTS_INLINE_LIMIT:
+            source = repr(document)
+        else:
+            path = f"{_DATA_TRANSFER_DIR}/{uuid.uuid4().hex}.json"
+            with self.metrics.timer("inputs_upload"):
+                self._sessions[session_name].files.write(path, payload, gzip=self._gzip_upload([payload]))
+            source = _INPUTS_FILE_SOURCE.format(path=path)
+
+        self._record_usage(session_name, bytes_in=len(payload), executions=0)
+        self.metrics.increment("inputs_bytes", len(payload))
+        return _INPUTS_LINE.format(source=source), len(payload)
+
+    @staticmethod
+    def _fill_result(result: ExecutionResult, execution: Any) -> None:
+        """Copy output, rich results and error of an E2B execution into a structured result"""
+        if execution.logs:
+            result.stdout = list(execution.logs.stdout)
+            result.stderr = list(execution.logs.stderr)
+        for item in execution.results or []:
+            if item is None:
+                continue
+            # Charts are parsed objects and are left out; the standard formats are strings or plain dicts
+            data = {name: getattr(item, name, None) for name in _RESULT_FORMATS}
+            data = {name: value for name, value in data.items() if value}
+            # Non-standard MIME types (Plotly figures, widget views) only exist in extra
+            data.update(getattr(item, "extra", None) or {})
+            if data:
+                result.results.append(data)
+        if execution.error:
+            result.error = ExecutionError(
+                name=execution.error.name,
+                value=execution.error.value,
+                traceback=getattr(execution.error, "traceback", None),
+            )
+
+    def _finish_result(self, result: ExecutionResult, timings: Dict[str, float]) -> ExecutionResult:
+        """Attach timings and sizes to a result and record them in the metrics"""
+        result.queue_seconds = timings.get("queue", 0.0)
+        result.execution_seconds = timings.get("execution", 0.0)
+        result.bytes_out = sum(len(line.encode("utf-8")) for line in result.stdout + result.stderr) + sum(
+            len(json.dumps(item, default=str)) for item in result.results
+        )
+        self.metrics.record_time(f"execute_{result.kind}", result.execution_seconds)
+        if not result.success:
+            self.metrics.increment(f"execute_{result.kind}_failed")
+        return result
+
     def execute_command(self, action: ExecuteCommandAction) -> Dict[str, Any]:
         """Execute shell command"""
         session_name, error = self._ensure_session(action.session_name)
         if error:
             return error
 
-        sandbox = self._sessions[session_name]
         logger.debug(f"Executing command in session '{session_name}'")
 
         try:
-            # Use run_code to execute shell command
-            code = f"""
-import subprocess
-result = subprocess.run({repr(action.command)}, shell=True, capture_output=True, text=True)
-print(result.stdout, end='')
-if result.stderr:
-    print('[stderr]', result.stderr, end='')
-result.returncode
-"""
-            execution = sandbox.run_code(code)
-
-            # Collect output
-            output_parts = []
-            if execution.logs and execution.logs.stdout:
-                output_parts.extend([line.rstrip() for line in execution.logs.stdout if line.strip()])
-            
-            output = "\n".join(output_parts) if output_parts else "(no output)"
-            
-            # Get exit code
+            # Use run_code to execute shell command; the sandbox enforces the timeout
+            code = _EXECUTE_COMMAND_CODE + f"_strands_execute_command({repr(action.command)}, {action.timeout})"
+            run_timeout = action.timeout + _COMMAND_TIMEOUT_GRACE if action.timeout else None
+            timings: Dict[str, float] = {}
+            execution = self._run_code(session_name, code, timings=timings, timeout=run_timeout)
+
+            result = ExecutionResult(
+                kind="command", timeout=action.timeout, bytes_in=len(action.command.encode("utf-8"))
+            )
+            self._fill_result(result, execution)
+
+            # The helper returns the exit code as the cell result; stderr is already folded into stdout
             exit_code = 0
-            if execution.results and len(execution.results) > 0:
-                result = execution.results[0]
-                if result and result.text:
-                    try:
-                        exit_code = int(result.text)
-                    except (ValueError, TypeError):
-                        exit_code = 0
+            if result.results:
+                try:
+                    exit_code = int(result.results.pop(0).get("text", 0))
+                except (ValueError, TypeError):
+                    exit_code = 0
+            result.exit_code = exit_code
+            result.timed_out = exit_code == 124 and action.timeout is not None
+            return self._finish_result(result, timings)
+
+        except Exception as e:
+            logger.error(f"Command execution failed: {str(e)}")
+            return {
+                "status": "error",
+                "content": [{"text": f"Command execution failed: {str(e)}"}]
+            }
 
-            if execution.error or exit_code != 0:
+    def cancel_execution(self, action: CancelExecutionAction) -> Dict[str, Any]:
+        """Interrupt the running execution of a session"""
+        session_name = action.session_name or self.default_session
+        if session_name not in self._sessions:
+            return {
+                "status": "error",
+                "content": [{"text": f"Session '{session_name}' not found"}]
+            }
+
+        try:
+            interrupted = self._interrupt(session_name)
+            logger.info(f"Interrupted {len(interrupted)} kernel(s) in session '{session_name}'")
+            return {
+                "status": "success",
+                "content": [{"json": {"sessionName": session_name, "interrupted": len(interrupted)}}]
+            }
+
+        except Exception as e:
+            logger.error(f"Cancellation failed: {str(e)}")
+            return {
+                "status": "error",
+                "content": [{"text": f"Cancellation failed: {str(e)}"}]
+            }
+
+    def start_job(self, action: StartJobAction) -> Dict[str, Any]:
+        """Start a background job"""
+        session_name, error = self._ensure_session(action.session_name)
+        if error:
+            return error
+
+        sandbox = self._sessions[session_name]
+        cwd = self._session_cwds.get(session_name)
+        job = _Job(job_id=f"job-{uuid.uuid4().hex[:12]}", kind="code" if action.code is not None else "command")
+        logger.debug(f"Starting {job.kind} job {job.job_id} in session '{session_name}'")
+
+        # The job holds an execution slot until its runner finishes
+        slot = self._execution_slot()
+        try:
+            slot.__enter__()
+        except Exception as e:
+            logger.error(f"Failed to start job: {str(e)}")
+            return {
+                "status": "error",
+                "content": [{"text": f"Failed to start job: {str(e)}"}]
+            }
+
+        try:
+            if action.code is not None:
+                # Dedicated context so the session's own context stays free while the job runs
+                language = _E2B_LANGUAGES.get(action.language, "python")
+                job.context = sandbox.create_code_context(cwd=cwd, language=language)
+                runner = threading.Thread(
+                    target=self._run_code_job,
+                    args=(session_name, sandbox, job, action.code, language, slot),
+                    daemon=True,
+                )
+            else:
+                job.handle = sandbox.commands.run(action.command, background=True, cwd=cwd, timeout=0)
+                runner = threading.Thread(target=self._run_command_job, args=(job, slot), daemon=True)
+
+            self._evict_jobs(session_name)
+            self._jobs.setdefault(session_name, {})[job.job_id] = job
+            runner.start()
+
+            return {
+                "status": "success",
+                "content": [{"json": {"jobId": job.job_id, "sessionName": session_name, "kind": job.kind}}]
+            }
+
+        except Exception as e:
+            slot.__exit__(None, None, None)
+            logger.error(f"Failed to start job: {str(e)}")
+            return {
+                "status": "error",
+                "content": [{"text": f"Failed to start job: {str(e)}"}]
+            }
+
+    def _run_code_job(
+        self,
+        session_name: str,
+        sandbox: code_interpreter_sync.Sandbox,
+        job: _Job,
+        code: str,
+        language: str,
+        slot: Any,
+    ) -> None:
+        """Drive a code job to completion, streaming its output into the job, then release its execution slot"""
+        try:
+            # The slot taken by start_job is released by _run_code when the execution ends
+            execution = self._run_code(
+                session_name,
+                code,
+                language=language,
+                context=job.context,
+                slot=slot,
+                timeout=0,
+                on_stdout=lambda message: job.append(message.line),
+                on_stderr=lambda message: job.append(f"[stderr] {message.line}"),
+            )
+            for result in execution.results:
+                if result is not None and result.text:
+                    job.append(f"=> {result.text}\n")
+            if execution.error:
+                job.finish("failed", error=f"{execution.error.name}: {execution.error.value}")
+            else:
+                job.finish("completed")
+        except Exception as e:
+            job.finish("failed", error=str(e))
+        finally:
+            try:
+                sandbox.remove_code_context(job.context)
+            except Exception as e:
+                logger.debug(f"Job context cleanup failed: {e}")
+
+    @staticmethod
+    def _run_command_job(job: _Job, slot: Any) -> None:
+        """Drive a command job to completion, streaming its output into the job, then release its execution slot"""
+        try:
+            result = job.handle.wait(
+                on_stdout=job.append,
+                on_stderr=lambda text: job.append(f"[stderr] {text}"),
+            )
+            job.finish("completed", exit_code=result.exit_code)
+        except CommandExitException as e:
+            job.finish("failed", exit_code=e.exit_code, error=e.error)
+        except Exception as e:
+            job.finish("failed", error=str(e))
+        finally:
+            slot.__exit__(None, None, None)
+
+    def _find_job(self, session_name: Optional[str], job_id: str) -> tuple[str, Optional[_Job]]:
+        """Look up a job of a session"""
+        target_session = session_name or self.default_session
+        self._evict_jobs(target_session)
+        return target_session, self._jobs.get(target_session, {}).get(job_id)
+
+    def _evict_jobs(self, session_name: str) -> None:
+        """Forget jobs of a session that finished more than _JOB_RETENTION seconds ago"""
+        jobs = self._jobs.get(session_name, {})
+        expired = time.time() - _JOB_RETENTION
+        for job_id in [job_id for job_id, job in jobs.items() if job.finished_at and job.finished_at < expired]:
+            del jobs[job_id]
+
+    def get_job(self, action: GetJobAction) -> Dict[str, Any]:
+        """Get status and incremental output of a background job"""
+        session_name, job = self._find_job(action.session_name, action.job_id)
+        if job is None:
+            return {
+                "status": "error",
+                "content": [{"text": f"Job '{action.job_id}' not found in session '{session_name}'"}]
+            }
+
+        output, next_offset, skipped = job.read(action.offset)
+        finished_at = job.finished_at or time.time()
+        if job.status != "running" and next_offset == action.offset + skipped + len(output):
+            # A finished job read to the end is not needed anymore
+            self._jobs.get(session_name, {}).pop(job.job_id, None)
+        return {
+            "status": "success",
+            "content": [
+                {
+                    "json": {
+                        "jobId": job.job_id,
+                        "kind": job.kind,
+                        "jobStatus": job.status,
+                        "exitCode": job.exit_code,
+                        "error": job.error,
+                        "elapsedSeconds": round(finished_at - job.started_at, 3),
+                        "output": output,
+                        "nextOffset": next_offset,
+                        "skippedChars": skipped,
+                    }
+                }
+            ]
+        }
+
+    def cancel_job(self, action: CancelJobAction) -> Dict[str, Any]:
+        """Cancel a background job"""
+        session_name, job = self._find_job(action.session_name, action.job_id)
+        if job is None:
+            return {
+                "status": "error",
+                "content": [{"text": f"Job '{action.job_id}' not found in session '{session_name}'"}]
+            }
+
+        if job.status != "running":
+            return {
+                "status": "success",
+                "content": [{"json": {"jobId": job.job_id, "jobStatus": job.status}}]
+            }
+
+        try:
+            job.status = "cancelled"
+            if job.handle is not None:
+                job.handle.kill()
+            else:
+                self._interrupt_kernels(self._sessions[session_name], [job.context.id])
+
+            logger.info(f"Cancelled job {job.job_id} in session '{session_name}'")
+            return {
+                "status": "success",
+                "content": [{"json": {"jobId": job.job_id, "jobStatus": job.status}}]
+            }
+
+        except Exception as e:
+            logger.error(f"Job cancellation failed: {str(e)}")
+            return {
+                "status": "error",
+                "content": [{"text": f"Job cancellation failed: {str(e)}"}]
+            }
+
+    def _checkpoint_path(self, checkpoint_id: str) -> str:
+        """Local archive path of a checkpoint"""
+        if self.checkpoint_dir is None:
+            self.checkpoint_dir = tempfile.mkdtemp(prefix="strands-checkpoints-")
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        return os.path.join(self.checkpoint_dir, f"{checkpoint_id}.tar.gz")
+
+    def checkpoint_session(self, action: CheckpointSessionAction) -> Dict[str, Any]:
+        """Checkpoint a session's variables and files"""
+        session_name = action.session_name or self.default_session
+        if session_name not in self._sessions:
+            return {
+                "status": "error",
+                "content": [{"text": f"Session '{session_name}' not found"}]
+            }
+
+        sandbox = self._sessions[session_name]
+        checkpoint_id = f"ckpt-{uuid.uuid4().hex[:12]}"
+        remote_archive = f"/tmp/{checkpoint_id}.tar.gz"
+        logger.debug(f"Checkpointing session '{session_name}' as {checkpoint_id}")
+
+        try:
+            code = _CHECKPOINT_CODE + (
+                f"_strands_checkpoint({repr(remote_archive)}, {repr(action.paths)}, "
+                f"{repr(action.skip_variables)}, {action.max_variable_bytes})"
+            )
+            execution = self._run_code(session_name, code)
+
+            if execution.error:
                 return {
                     "status": "error",
-                    "content": [{"text": f"Command execution failed (exit code: {exit_code}):\n{output}"}]
+                    "content": [{"text": f"Failed to checkpoint session: {execution.error.value}"}]
                 }
 
+            summary = self._parse_json_output(execution)
+
+            # Stream the archive to the local checkpoint store
+            with open(self._checkpoint_path(checkpoint_id), "wb") as f:
+                for chunk in sandbox.files.read(remote_archive, format="stream"):
+                    f.write(chunk)
+            sandbox.files.remove(remote_archive)
+            self._record_usage(session_name, bytes_out=summary["sizeBytes"], executions=0)
+
+            logger.info(f"Checkpoint {checkpoint_id} saved ({summary['sizeBytes']} bytes)")
             return {
                 "status": "success",
-                "content": [{"text": output}]
+                "content": [{"json": {"checkpointId": checkpoint_id, "sessionName": session_name, **summary}}]
             }
 
         except Exception as e:
-            logger.error(f"Command execution failed: {str(e)}")
+            logger.error(f"Checkpoint failed: {str(e)}")
             return {
                 "status": "error",
-                "content": [{"text": f"Command execution failed: {str(e)}"}]
+                "content": [{"text": f"Checkpoint failed: {str(e)}"}]
             }
 
+    def restore_session(self, action: RestoreSessionAction) -> Dict[str, Any]:
+        """Restore a checkpoint into a session"""
+        archive = self._checkpoint_path(action.checkpoint_id)
+        if not re.fullmatch(r"ckpt-[0-9a-f]+", action.checkpoint_id) or not os.path.exists(archive):
+            return {
+                "status": "error",
+                "content": [{"text": f"Checkpoint '{action.checkpoint_id}' not found"}]
+            }
+
+        session_name = action.session_name or self.default_session
+        if session_name not in self._sessions:
+            if not self.auto_create:
+                return {
+                    "status": "error",
+                    "content": [{"text": f"Session '{session_name}' not found. Create it first using initSession"}]
+                }
+            result = self.init_session(
+                InitSessionAction(
+                    type="initSession",
+                    session_name=session_name,
+                    description=f"Restored from {action.checkpoint_id}",
+                )
+            )
+            if result.get("status") != "success":
+                return result
+
+        sandbox = self._sessions[session_name]
+        # Unique per restore: several sessions may restore in parallel into one shared sandbox
+        remote_archive = f"/tmp/{action.checkpoint_id}-{uuid.uuid4().hex[:8]}.tar.gz"
+        logger.debug(f"Restoring {action.checkpoint_id} into session '{session_name}'")
+
+        try:
+            with open(archive, "rb") as f:
+                sandbox.files.write(remote_archive, f)
+            self._record_usage(session_name, bytes_in=os.path.getsize(archive), executions=0)
+
+            code = _RESTORE_CODE + f"_strands_restore({repr(remote_archive)})"
+            execution = self._run_code(session_name, code)
+
+            if execution.error:
+                return {
+                    "status": "error",
+                    "content": [{"text": f"Failed to restore checkpoint: {execution.error.value}"}]
+                }
+
+            summary = self._parse_json_output(execution)
+            return {
+                "status": "success",
+                "content": [
+                    {"json": {"checkpointId": action.checkpoint_id, "sessionName": session_name, **summary}}
+                ]
+            }
+
+        except Exception as e:
+            logger.error(f"Restore failed: {str(e)}")
+            return {
+                "status": "error",
+                "content": [{"text": f"Restore failed: {str(e)}"}]
+            }
+
+    def fork_session(self, action: ForkSessionAction) -> Dict[str, Any]:
+        """Clone a session into new sessions via a checkpoint restored in parallel"""
+        source = action.session_name or self.default_session
+        if source not in self._sessions:
+            return {
+                "status": "error",
+                "content": [{"text": f"Session '{source}' not found"}]
+            }
+
+        names = action.session_names or [f"{source}-fork-{uuid.uuid4().hex[:6]}" for _ in range(action.count)]
+        existing = [name for name in names if name in self._sessions]
+        if existing or len(set(names)) != len(names):
+            return {
+                "status": "error",
+                "content": [{"text": f"Fork session names must be new and unique: {', '.join(existing or names)}"}]
+            }
+
+        checkpoint = self.checkpoint_session(
+            CheckpointSessionAction(
+                type="checkpointSession",
+                session_name=source,
+                paths=action.paths,
+                skip_variables=action.skip_variables,
+            )
+        )
+        if checkpoint.get("status") != "success":
+            return checkpoint
+        checkpoint_id = checkpoint["content"][0]["json"]["checkpointId"]
+
+        logger.info(f"Forking session '{source}' into {len(names)} session(s)")
+
+        def restore(name: str) -> Dict[str, Any]:
+            # Forks are new sessions by definition, so they are created whatever auto_create says
+            result = self.init_session(
+                InitSessionAction(type="initSession", session_name=name, description=f"Forked from {source}")
+            )
+            if result.get("status") != "success":
+                return result
+            return self.restore_session(
+                RestoreSessionAction(type="restoreSession", session_name=name, checkpoint_id=checkpoint_id)
+            )
+
+        # Restores are sandbox creations plus uploads; run a few at a time
+        with ThreadPoolExecutor(max_workers=min(len(names), 8)) as pool:
+            results = list(pool.map(restore, names))
+
+        forks = []
+        for name, result in zip(names, results):
+            fork = {"sessionName": name, "status": result.get("status")}
+            if result.get("status") != "success":
+                fork["error"] = result["content"][0].get("text")
+            forks.append(fork)
+        failed = sum(1 for fork in forks if fork["status"] != "success")
+
+        return {
+            "status": "error" if failed == len(forks) else "success",
+            "content": [
+                {
+                    "json": {
+                        "sourceSession": source,
+                        "checkpointId": checkpoint_id,
+                        "forks": forks,
+                        "failed": failed,
+                    }
+                }
+            ]
+        }
+
     def read_files(self, action: ReadFilesAction) -> Dict[str, Any]:
-        """Read files"""
+        """Read files, or slices of them"""
         session_name, error = self._ensure_session(action.session_name)
         if error:
             return error
 
-        sandbox = self._sessions[session_name]
         logger.debug(f"Reading {len(action.paths)} file(s) from session '{session_name}'")
 
         try:
-            files_content = []
-            for path in action.paths:
-                # Use run_code to read file
-                code = f"open({repr(path)}).read()"
-                execution = sandbox.run_code(code)
-                
-                if execution.error:
-                    return {
-                        "status": "error",
-                        "content": [{"text": f"Failed to read file {path}: {execution.error.value}"}]
-                    }
-                
-                content = ""
-                if execution.results and execution.results[0]:
-                    content = execution.results[0].text or ""
-                files_content.append({"path": path, "content": content})
+            # Slice and cap all files in a single sandbox round-trip
+            code = _READ_FILES_CODE + (
+                f"_strands_read_files({repr(action.paths)}, {action.offset}, {action.length}, {action.start_line}, "
+                f"{action.end_line}, {action.tail_lines}, {action.max_bytes}, {repr(action.encoding)}, "
+                f"{action.binary}, {self.compression_threshold}, {_compression_codecs()})"
+            )
+            helpers = _COMPRESSION_CODE if self.compression_threshold is not None else _PLAIN_EMIT_CODE
+            execution = self._run_code(session_name, helpers + code)
+
+            if execution.error:
+                return {
+                    "status": "error",
+                    "content": [{"text": f"Failed to read files: {execution.error.value}"}]
+                }
+
+            files_content = self._unpack_output(self._parse_json_output(execution))
 
             return {
                 "status": "success",
@@ -387,19 +2062,16 @@ result.returncode
         logger.debug(f"Writing {len(action.content)} file(s) to session '{session_name}'")
 
         try:
-            for file_content in action.content:
-                # Use run_code to write file
-                code = f"""
-with open({repr(file_content.path)}, 'w') as f:
-    f.write({repr(file_content.text)})
-"""
-                execution = sandbox.run_code(code)
-                
-                if execution.error:
-                    return {
-                        "status": "error",
-                        "content": [{"text": f"Failed to write file {file_content.path}: {execution.error.value}"}]
-                    }
+            # Write all files in one file API request, gzip-encoded once the batch is large;
+            # relative paths resolve against the session's working directory like the kernel's
+            cwd = self._session_cwds.get(session_name) or _DEFAULT_CWD
+            files = [
+                {"path": posixpath.join(cwd, file_content.path), "data": file_content.text.encode("utf-8")}
+                for file_content in action.content
+            ]
+            total = sum(len(file["data"]) for file in files)
+            sandbox.files.write_files(files, gzip=self._gzip_upload([file["data"] for file in files]))
+            self._record_usage(session_name, bytes_in=total, executions=0)
 
             return {
                 "status": "success",
@@ -419,36 +2091,43 @@ with open({repr(file_content.path)}, 'w') as f:
         if error:
             return error
 
-        sandbox = self._sessions[session_name]
         logger.debug(f"Listing directory '{action.path}' in session '{session_name}'")
 
         try:
-            # Use run_code to list files
-            code = f"""
-import os
-import json
-files = []
-for item in os.listdir({repr(action.path)}):
-    full_path = os.path.join({repr(action.path)}, item)
-    files.append({{'name': item, 'type': 'dir' if os.path.isdir(full_path) else 'file'}})
-json.dumps(files)
-"""
-            execution = sandbox.run_code(code)
-            
+            offset = int(action.cursor) if action.cursor else 0
+        except ValueError:
+            return {
+                "status": "error",
+                "content": [{"text": f"Invalid cursor: {action.cursor}"}]
+            }
+
+        try:
+            # List, filter and paginate in a single sandbox round-trip
+            code = _LIST_FILES_CODE + (
+                f"_strands_list_files({repr(action.path)}, {action.recursive}, {action.max_depth}, "
+                f"{repr(action.pattern)}, {offset}, {action.limit})"
+            )
+            execution = self._run_code(session_name, code)
+
             if execution.error:
                 return {
                     "status": "error",
                     "content": [{"text": f"Failed to list files: {execution.error.value}"}]
                 }
-            
-            file_list = []
-            if execution.results and execution.results[0]:
-                import json
-                file_list = json.loads(execution.results[0].text)
+
+            listing = self._parse_json_output(execution)
 
             return {
                 "status": "success",
-                "content": [{"json": {"path": action.path, "files": file_list}}]
+                "content": [
+                    {
+                        "json": {
+                            "path": action.path,
+                            "files": listing["files"],
+                            "nextCursor": listing["nextCursor"],
+                        }
+                    }
+                ]
             }
 
         except Exception as e:
@@ -464,33 +2143,334 @@ json.dumps(files)
         if error:
             return error
 
+        logger.debug(f"Removing {len(action.paths)} path(s) from session '{session_name}'")
+
+        try:
+            # Remove all paths in a single sandbox round-trip
+            code = _REMOVE_FILES_CODE + f"_strands_remove_files({repr(action.paths)}, {action.recursive})"
+            execution = self._run_code(session_name, code)
+
+            if execution.error:
+                return {
+                    "status": "error",
+                    "content": [{"text": f"Failed to remove files: {execution.error.value}"}]
+                }
+
+            results = self._parse_json_output(execution)
+            removed = sum(1 for r in results if r["status"] == "removed")
+            failed = len(results) - removed
+
+            return {
+                "status": "error" if failed else "success",
+                "content": [
+                    {"text": f"Removed {removed} path(s), {failed} failed"},
+                    {"json": {"results": results}},
+                ]
+            }
+
+        except Exception as e:
+            logger.error(f"File removal failed: {str(e)}")
+            return {
+                "status": "error",
+                "content": [{"text": f"File removal failed: {str(e)}"}]
+            }
+
+    def sync_files(self, action: SyncFilesAction) -> Dict[str, Any]:
+        """Incrementally synchronize a local directory with a sandbox directory"""
+        if self.sync_root is None:
+            return {
+                "status": "error",
+                "content": [{"text": "syncFiles is disabled: the interpreter has no sync_root configured"}]
+            }
+        local_root = os.path.realpath(os.path.join(self.sync_root, action.local_path))
+        if os.path.commonpath([local_root, self.sync_root]) != self.sync_root:
+            return {
+                "status": "error",
+                "content": [{"text": f"Local path '{action.local_path}' is outside the sync root"}]
+            }
+        if action.direction == "upload" and not os.path.isdir(local_root):
+            return {
+                "status": "error",
+                "content": [{"text": f"Local directory '{action.local_path}' not found"}]
+            }
+
+        session_name, error = self._ensure_session(action.session_name)
+        if error:
+            return error
+
         sandbox = self._sessions[session_name]
-        logger.debug(f"Removing {len(action.paths)} file(s) from session '{session_name}'")
+        logger.debug(f"Syncing ({action.direction}) '{action.local_path}' <-> '{action.remote_path}' in '{session_name}'")
 
         try:
-            for path in action.paths:
-                # Use run_code to remove file
-                code = f"import os; os.remove({repr(path)})"
-                execution = sandbox.run_code(code)
-                
-                if execution.error:
+            # Hash the sandbox side in a single round-trip
+            code = _SYNC_FILES_CODE + f"_strands_hash_tree({repr(action.remote_path)}, {repr(action.exclude)})"
+            execution = self._run_code(session_name, code)
+
+            if execution.error:
+                return {
+                    "status": "error",
+                    "content": [{"text": f"Failed to hash sandbox files: {execution.error.value}"}]
+                }
+
+            remote = self._parse_json_output(execution)
+            remote_root, remote_files = remote["root"], remote["files"]
+            if action.direction == "download" and not remote["exists"]:
+                return {
+                    "status": "error",
+                    "content": [{"text": f"Sandbox directory '{action.remote_path}' not found"}]
+                }
+            manifest = self._sync_manifests.setdefault(session_name, {})
+            local_files = _hash_local_tree(local_root, action.exclude, manifest) if os.path.isdir(local_root) else {}
+
+            if action.direction == "upload":
+                source, destination = local_files, remote_files
+            else:
+                source, destination = remote_files, local_files
+            changed = sorted(rel for rel, digest in source.items() if destination.get(rel) != digest)
+            delete = action.delete if action.delete is not None else action.direction == "upload"
+            deleted = sorted(rel for rel in destination if rel not in source) if delete else []
+            if deleted and not source:
+                # An empty source is far more likely a wrong path than a request to wipe the destination
+                return {
+                    "status": "error",
+                    "content": [
+                        {
+                            "text": f"Refusing to delete all {len(deleted)} destination file(s): the source "
+                            f"directory is empty. Check the paths or pass delete=false"
+                        }
+                    ]
+                }
+
+            if action.direction == "download":
+                escaping = [rel for rel in changed + deleted if _outside_root(local_root, rel)]
+                if escaping:
                     return {
                         "status": "error",
-                        "content": [{"text": f"Failed to remove file {path}: {execution.error.value}"}]
+                        "content": [
+                            {
+                                "text": f"Refusing to sync {len(escaping)} path(s) that resolve outside the local "
+                                f"directory: {', '.join(escaping[:10])}"
+                            }
+                        ]
                     }
 
-            return {
-                "status": "success",
-                "content": [{"text": f"Successfully removed {len(action.paths)} file(s)"}]
+            transferred = 0
+            delete_failed: Dict[str, str] = {}
+            if action.direction == "upload":
+                # Batch uploads into few requests instead of one per file
+                batch: List[Dict[str, Any]] = []
+                batch_bytes = 0
+                for rel in changed:
+                    with open(os.path.join(local_root, rel), "rb") as f:
+                        data = f.read()
+                    batch.append({"path": f"{remote_root}/{rel}", "data": data})
+                    batch_bytes += len(data)
+                    if batch_bytes >= _SYNC_BATCH_BYTES:
+                        sandbox.files.write_files(batch, gzip=self._gzip_upload([file["data"] for file in batch]))
+                        transferred += batch_bytes
+                        batch, batch_bytes = [], 0
+                if batch:
+                    sandbox.files.write_files(batch, gzip=self._gzip_upload([file["data"] for file in batch]))
+                    transferred += batch_bytes
+
+                if deleted:
+                    code = _SYNC_FILES_CODE + f"_strands_sync_remove({repr(remote_root)}, {repr(deleted)})"
+                    execution = self._run_code(session_name, code)
+                    if execution.error:
+                        return {
+                            "status": "error",
+                            "content": [{"text": f"Failed to delete sandbox files: {execution.error.value}"}]
+                        }
+                    outcome = self._parse_json_output(execution)
+                    deleted, delete_failed = outcome["removed"], outcome["failed"]
+                self._record_usage(session_name, bytes_in=transferred, executions=0)
+            else:
+                def download(rel: str) -> int:
+                    data = sandbox.files.read(
+                        f"{remote_root}/{rel}", format="bytes", gzip=self.compression_threshold is not None
+                    )
+                    path = os.path.join(local_root, rel)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, "wb") as f:
+                        f.write(data)
+                    return len(data)
+
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    transferred = sum(executor.map(download, changed))
+
+                for rel in deleted:
+                    path = os.path.join(local_root, rel)
+                    os.remove(path)
+                    manifest.pop(path, None)
+                    parent = os.path.dirname(path)
+                    while parent != local_root and not os.listdir(parent):
+                        os.rmdir(parent)
+                        parent = os.path.dirname(parent)
+                self._record_usage(session_name, bytes_out=transferred, executions=0)
+
+            self.metrics.increment(f"sync_bytes_{action.direction}", transferred)
+            logger.info(
+                f"Synced {len(changed)} changed and {len(deleted)} deleted file(s) ({transferred} bytes) "
+                f"for session '{session_name}'"
+            )
+            summary = {
+                "direction": action.direction,
+                "localPath": action.local_path,
+                "remotePath": remote_root,
+                "transferred": changed,
+                "deleted": deleted,
+                "unchanged": len(source) - len(changed),
+                "bytesTransferred": transferred,
             }
+            if delete_failed:
+                summary["deleteFailed"] = delete_failed
+                return {
+                    "status": "error",
+                    "content": [
+                        {"text": f"Failed to delete {len(delete_failed)} sandbox file(s)"},
+                        {"json": summary},
+                    ]
+                }
+            return {"status": "success", "content": [{"json": summary}]}
 
         except Exception as e:
-            logger.error(f"File removal failed: {str(e)}")
+            logger.error(f"File sync failed: {str(e)}")
             return {
                 "status": "error",
-                "content": [{"text": f"File removal failed: {str(e)}"}]
+                "content": [{"text": f"File sync failed: {str(e)}"}]
             }
 
+    def push_data(
+        self, name: str, data: Any, session_name: Optional[str] = None, format: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Assign a pandas DataFrame, NumPy array or Arrow table to a variable of a session's Python namespace
+
+        The value travels as a binary file (Arrow IPC stream by default, Parquet or .npy) instead of source code
+        or text, and arrives with its original type.
+
+        Args:
+            name: Variable name to assign in the session
+            data: pandas DataFrame, NumPy array or pyarrow Table
+            session_name: Target session, uses the default session if not provided
+            format: "arrow" (default for tables) or "parquet" (smaller, slower to encode); arrays always use "npy"
+
+        Returns:
+            Description of the loaded variable (type, shape, dtype or columns) and the bytes transferred
+        """
+        if not name.isidentifier():
+            raise ValueError(f"'{name}' is not a valid variable name")
+        fmt, kind, payload = _serialize_data(data, format)
+
+        session_name, error = self._ensure_session(session_name)
+        if error:
+            raise RuntimeError(error["content"][0]["text"])
+
+        sandbox = self._sessions[session_name]
+        path = f"{_DATA_TRANSFER_DIR}/{uuid.uuid4().hex}.{fmt}"
+        start = time.perf_counter()
+        sandbox.files.write(path, payload, gzip=self._gzip_upload([payload]))
+
+        code = _DATA_TRANSFER_CODE + f"_strands_load_data({repr(name)}, {repr(path)}, {repr(fmt)}, {repr(kind)})"
+        execution = self._run_code(session_name, code)
+        if execution.error:
+            raise RuntimeError(f"Failed to load '{name}' in session '{session_name}': {execution.error.value}")
+
+        self._record_usage(session_name, bytes_in=len(payload), executions=0)
+        self.metrics.increment("data_push_bytes", len(payload))
+        self.metrics.record_time("data_push", time.perf_counter() - start)
+        logger.debug(f"Pushed {len(payload)} bytes ({fmt}) to '{name}' in session '{session_name}'")
+        return {**self._parse_json_output(execution), "name": name, "format": fmt, "bytes": len(payload)}
+
+    def pull_data(self, name: str, session_name: Optional[str] = None, format: Optional[str] = None) -> Any:
+        """
+        Fetch a pandas DataFrame, NumPy array or Arrow table held in a session variable
+
+        The value travels as a binary file and keeps its type. Arrays and Arrow tables are zero-copy views over
+        the downloaded buffer.
+
+        Args:
+            name: Variable name in the session
+            session_name: Source session, uses the default session if not provided
+            format: "arrow" (default for tables) or "parquet" (smaller, slower to encode); arrays always use "npy"
+        """
+        session_name, error = self._ensure_session(session_name)
+        if error:
+            raise RuntimeError(error["content"][0]["text"])
+
+        sandbox = self._sessions[session_name]
+        path = f"{_DATA_TRANSFER_DIR}/{uuid.uuid4().hex}"
+        start = time.perf_counter()
+        code = (
+            _DATA_TRANSFER_CODE
+            + f"import os\nos.makedirs({repr(_DATA_TRANSFER_DIR)}, exist_ok=True)\n"
+            + f"_strands_dump_data({repr(name)}, {repr(path)}, {repr(format or 'arrow')})"
+        )
+        execution = self._run_code(session_name, code)
+        if execution.error:
+            raise RuntimeError(f"Failed to export '{name}' from session '{session_name}': {execution.error.value}")
+
+        info = self._parse_json_output(execution)
+        try:
+            payload = sandbox.files.read(path, format="bytes", gzip=self._compress_transfer(info["bytes"]))
+        finally:
+            try:
+                sandbox.files.remove(path)
+            except Exception as e:
+                logger.debug(f"Removing data file {path} failed: {e}")
+
+        self._record_usage(session_name, bytes_out=len(payload), executions=0)
+        self.metrics.increment("data_pull_bytes", len(payload))
+        self.metrics.record_time("data_pull", time.perf_counter() - start)
+        logger.debug(f"Pulled {len(payload)} bytes ({info['format']}) from '{name}' in session '{session_name}'")
+        return _deserialize_data(payload, info["format"], info["kind"])
+
+    def _compress_transfer(self, size: int) -> bool:
+        """Whether a file API transfer of this size should be gzip-encoded"""
+        return self.compression_threshold is not None and size >= self.compression_threshold
+
+    def _gzip_upload(self, payloads: List[bytes]) -> bool:
+        """
+        Whether an upload should be gzip-encoded, counting its raw and compressed size when it is
+
+        The SDK compresses the request itself, so the compressed size is estimated from the
+        ratio of up to _COMPRESSION_SAMPLE bytes compressed here.
+        """
+        total = sum(len(payload) for payload in payloads)
+        if not self._compress_transfer(total):
+            return False
+
+        sample = bytearray()
+        for payload in payloads:
+            sample += payload[:_COMPRESSION_SAMPLE - len(sample)]
+            if len(sample) >= _COMPRESSION_SAMPLE:
+                break
+        if sample:
+            self._record_compression("gzip", total, round(total * len(gzip.compress(sample)) / len(sample)))
+        return True
+
+    @staticmethod
+    def _parse_json_output(execution: Any) -> Any:
+        """Parse the JSON document printed to stdout by sandbox-side helper code"""
+        stdout = "".join(execution.logs.stdout) if execution.logs else ""
+        return json.loads(stdout)
+
+    def _unpack_output(self, document: Any) -> Any:
+        """Decompress a helper document sent in a compressed envelope by _strands_emit"""
+        if not isinstance(document, dict) or "_strands_compressed" not in document:
+            return document
+
+        codec = document["_strands_compressed"]
+        packed = base64.b64decode(document["payload"])
+        self._record_compression(codec, document["size"], len(packed))
+        return json.loads(_decompress(codec, packed))
+
+    def _record_compression(self, codec: str, raw_bytes: int, compressed_bytes: int) -> None:
+        """Count one compressed transfer and its sizes"""
+        self.metrics.increment(f"compression_{codec}")
+        self.metrics.increment("compression_bytes_raw", raw_bytes)
+        self.metrics.increment("compression_bytes_compressed", compressed_bytes)
+
     @staticmethod
     def get_supported_languages() -> List[LanguageType]:
         """Return list of supported programming languages"""
@@ -0,0 +1,53 @@
+"""
+Lightweight in-process metrics for code interpreter backends.
+
+Backends record counters and timings here so callers can inspect where time is
+spent (sandbox creation, context creation, execution, ...) without extra dependencies.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+
+class Metrics:
+    """Thread-safe counters and timing aggregates keyed by metric name"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Add value to a counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def record_time(self, name: str, seconds: float) -> None:
+        """Record one timing sample"""
+        with self._lock:
+            timing = self._timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            timing["count"] += 1
+            timing["total"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and record it under name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_time(name, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of all counters and timings"""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "timings": {
+                    name: {**timing, "avg": timing["total"] / timing["count"] if timing["count"] else 0.0}
+                    for name, timing in self._timings.items()
+                },
+            }
@@ -5,10 +5,52 @@ This module contains all the Pydantic models used for type-safe action definitio
 with discriminated unions, ensuring required fields are present for each action type.
 """
 
+import base64
+import hashlib
+import json
 from enum import Enum
-from typing import List, Literal, Optional, Union
+from typing import Annotated, Any, Dict, List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+
+# Tag of bytes values in JSON, {"$bytes": base64}. Dict keys starting with "$" are escaped with one more "$",
+# so a user dict can never be mistaken for the tag
+_BYTES_TAG = "$bytes"
+
+
+def encode_json_value(value: Any) -> Any:
+    """JSON-safe copy of a value that keeps bytes apart from strings; the inverse of decode_json_value"""
+    if isinstance(value, (bytes, bytearray)):
+        return {_BYTES_TAG: base64.b64encode(value).decode("ascii")}
+    if isinstance(value, dict):
+        return {
+            (f"${key}" if isinstance(key, str) and key.startswith("$") else key): encode_json_value(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [encode_json_value(item) for item in value]
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def decode_json_value(value: Any) -> Any:
+    """Restore a value encoded by encode_json_value"""
+    if isinstance(value, dict):
+        if value.keys() == {_BYTES_TAG}:
+            return base64.b64decode(value[_BYTES_TAG])
+        return {
+            (key[1:] if key.startswith("$$") else key): decode_json_value(item) for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [decode_json_value(item) for item in value]
+    return value
+
+
+def dump_action(action: BaseModel) -> Dict[str, Any]:
+    """Lossless JSON form of an action; bytes inputs stay bytes when read back with decode_json_value"""
+    return encode_json_value(action.model_dump())
 
 
 class LanguageType(str, Enum):
@@ -30,8 +72,32 @@ class FileContent(BaseModel):
     text: str = Field(description="Text content for the file")
 
 
+class SandboxEnvironment(BaseModel):
+    """Declarative sandbox environment (packages and setup steps) that backends prebuild into a reusable template,
+    so sessions start with dependencies already installed instead of running setup commands on every session."""
+
+    requirements: List[str] = Field(default_factory=list, description="pip requirement specifiers to install")
+    apt_packages: List[str] = Field(default_factory=list, description="System packages to install with apt-get")
+    setup_script: Optional[str] = Field(default=None, description="Shell script run after package installation")
+
+    def fingerprint(self, base_template: str) -> str:
+        """Stable hash of the declaration and its base template, used as the template cache key."""
+        payload = json.dumps({"base": base_template, **self.model_dump()}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BaseAction(BaseModel):
+    """Fields shared by all actions."""
+
+    idempotency_key: Optional[str] = Field(
+        default=None,
+        description="Optional key identifying this request. Retrying with the same key returns the stored result of "
+        "the first successful attempt instead of running the action again",
+    )
+
+
 # Action-specific Pydantic models using discriminated unions
-class InitSessionAction(BaseModel):
+class InitSessionAction(BaseAction):
     """Create a new isolated code execution environment. Use this when starting a new coding task, data analysis
     project, or when you need a fresh sandbox environment. Each session maintains its own state, variables,
     and file system."""
@@ -43,14 +109,14 @@ class InitSessionAction(BaseModel):
     )
 
 
-class ListLocalSessionsAction(BaseModel):
+class ListLocalSessionsAction(BaseAction):
     """View all active code interpreter sessions managed by this tool instance. Use this to see what sessions are
     available, check their status, or find the session name you need for other operations."""
 
     type: Literal["listLocalSessions"] = Field(description="List all local sessions managed by this tool instance")
 
 
-class ExecuteCodeAction(BaseModel):
+class ExecuteCodeAction(BaseAction):
     """Execute code in a specific programming language within an existing session. Use this for running Python
     scripts, JavaScript/TypeScript code, data analysis, calculations, or any programming task. The session maintains
     state between executions."""
@@ -65,9 +131,29 @@ class ExecuteCodeAction(BaseModel):
     code: str = Field(description="Required code to execute")
     language: LanguageType = Field(default=LanguageType.PYTHON, description="Programming language for code execution")
     clear_context: bool = Field(default=False, description="Whether to clear the execution context before running code")
+    timeout: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Maximum execution time in seconds. On expiry the code is interrupted and partial output is "
+        "returned; session state and files are kept.",
+    )
+    inputs: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Variables defined in the session before the code runs, by name (Python only). Values are "
+        "JSON; bytes values from Python callers arrive as bytes. Pass data here instead of embedding it in code.",
+    )
+
+    @model_validator(mode="after")
+    def _check_inputs(self) -> "ExecuteCodeAction":
+        if self.inputs and self.language != LanguageType.PYTHON:
+            raise ValueError("inputs are only supported for Python code")
+        for name in self.inputs:
+            if not name.isidentifier():
+                raise ValueError(f"Input name '{name}' is not a valid variable name")
+        return self
 
 
-class ExecuteCommandAction(BaseModel):
+class ExecuteCommandAction(BaseAction):
     """Execute shell/terminal commands within the sandbox environment. Use this for system operations like installing
     packages, running scripts, file management, or any command-line tasks that need to be performed in the session."""
 
@@ -78,11 +164,137 @@ class ExecuteCommandAction(BaseModel):
     )
 
     command: str = Field(description="Required shell command to execute")
+    timeout: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Maximum execution time in seconds. On expiry the command is killed and partial output is returned.",
+    )
+
+
+class CancelExecutionAction(BaseAction):
+    """Interrupt code or a command currently running in a session. Use this to stop a runaway or hung execution
+    without losing the session: variables, files and the sandbox itself are kept, and the interrupted call returns
+    the output produced so far."""
+
+    type: Literal["cancelExecution"] = Field(description="Interrupt the running execution of a session")
+
+    session_name: Optional[str] = Field(
+        default=None, description="Session name. If not provided, uses the default session."
+    )
+
+
+class StartJobAction(BaseAction):
+    """Start code or a shell command as a background job and return immediately with a job ID. Use this for
+    long-running work such as model training or scraping, then poll it with getJob while doing other steps.
+    Code jobs run in their own interpreter context, sharing the session's files but not its variables."""
+
+    type: Literal["startJob"] = Field(description="Start a background job in the code interpreter")
+
+    session_name: Optional[str] = Field(
+        default=None, description="Session name. If not provided, uses the default session."
+    )
+
+    code: Optional[str] = Field(default=None, description="Code to run in the background (exclusive with command)")
+    command: Optional[str] = Field(
+        default=None, description="Shell command to run in the background (exclusive with code)"
+    )
+    language: LanguageType = Field(default=LanguageType.PYTHON, description="Programming language of code jobs")
+
+    @model_validator(mode="after")
+    def _check_code_or_command(self) -> "StartJobAction":
+        if (self.code is None) == (self.command is None):
+            raise ValueError("Exactly one of 'code' or 'command' must be provided")
+        return self
+
+
+class GetJobAction(BaseAction):
+    """Check the status of a background job and fetch its output. Pass the returned nextOffset as offset on the next
+    call to receive only output produced since then. Only the most recent output is kept (skippedChars reports what
+    was dropped before it was read), and a finished job is forgotten once its output has been read to the end."""
+
+    type: Literal["getJob"] = Field(description="Get status and output of a background job")
+
+    session_name: Optional[str] = Field(
+        default=None, description="Session name. If not provided, uses the default session."
+    )
+
+    job_id: str = Field(description="Job ID returned by startJob")
+    offset: int = Field(default=0, ge=0, description="Output offset to read from (nextOffset of the previous call)")
+
+
+class CancelJobAction(BaseAction):
+    """Stop a running background job. Output produced so far remains available through getJob."""
+
+    type: Literal["cancelJob"] = Field(description="Cancel a background job")
+
+    session_name: Optional[str] = Field(
+        default=None, description="Session name. If not provided, uses the default session."
+    )
+
+    job_id: str = Field(description="Job ID returned by startJob")
+
 
+class CheckpointSessionAction(BaseAction):
+    """Save a session's interpreter state (picklable Python variables and imported modules) plus selected files to a
+    checkpoint. Use this before risky steps or when a session may expire, so expensive intermediate results can be
+    restored with restoreSession instead of recomputed."""
 
-class ReadFilesAction(BaseModel):
+    type: Literal["checkpointSession"] = Field(description="Checkpoint a session's variables and files")
+
+    session_name: Optional[str] = Field(
+        default=None, description="Session name. If not provided, uses the default session."
+    )
+
+    paths: List[str] = Field(default_factory=list, description="Files or directories to include in the checkpoint")
+    skip_variables: List[str] = Field(default_factory=list, description="Variable names to leave out")
+    max_variable_bytes: int = Field(
+        default=512 * 1024 * 1024, gt=0, description="Variables whose pickled size exceeds this are skipped"
+    )
+
+
+class RestoreSessionAction(BaseAction):
+    """Restore a checkpoint created by checkpointSession into a session, recreating its variables, imports and
+    files. The target session is created if it does not exist."""
+
+    type: Literal["restoreSession"] = Field(description="Restore a checkpoint into a session")
+
+    session_name: Optional[str] = Field(
+        default=None, description="Target session name. If not provided, uses the default session."
+    )
+
+    checkpoint_id: str = Field(description="Checkpoint ID returned by checkpointSession")
+
+
+class ForkSessionAction(BaseAction):
+    """Clone a prepared session into one or more new sessions that start with the same variables and files. Use this
+    to explore alternatives (parameters, fix attempts) in parallel from an expensive warm state instead of rebuilding
+    it in each session."""
+
+    type: Literal["forkSession"] = Field(description="Clone a session into new sessions")
+
+    session_name: Optional[str] = Field(
+        default=None, description="Source session name. If not provided, uses the default session."
+    )
+
+    count: int = Field(default=1, ge=1, le=20, description="Number of copies to create")
+    session_names: Optional[List[str]] = Field(
+        default=None,
+        max_length=20,
+        description="Names for the new sessions (overrides count, at most 20). Generated when not provided.",
+    )
+    paths: List[str] = Field(
+        default_factory=list,
+        description="Files or directories to copy, relative to the session working directory. Only variables are "
+        "copied when empty",
+    )
+    skip_variables: List[str] = Field(default_factory=list, description="Variable names not to copy")
+
+
+class ReadFilesAction(BaseAction):
     """Read the contents of one or more files from the sandbox file system. Use this to examine data files,
-    configuration files, code files, or any other files that have been created or uploaded to the session."""
+    configuration files, code files, or any other files that have been created or uploaded to the session.
+    Large files can be read partially by byte range (offset/length), line range (start_line/end_line) or the last
+    lines (tail_lines); output beyond max_bytes per file is cut off and marked as truncated."""
 
     type: Literal["readFiles"] = Field(description="Read files from the code interpreter")
 
@@ -91,9 +303,27 @@ class ReadFilesAction(BaseModel):
     )
 
     paths: List[str] = Field(description="List of file paths to read")
-
-
-class ListFilesAction(BaseModel):
+    offset: int = Field(default=0, ge=0, description="Byte offset to start reading from")
+    length: Optional[int] = Field(default=None, ge=0, description="Number of bytes to read from offset")
+    start_line: Optional[int] = Field(default=None, ge=1, description="First line to read (1-based)")
+    end_line: Optional[int] = Field(default=None, ge=1, description="Last line to read (inclusive)")
+    tail_lines: Optional[int] = Field(default=None, ge=1, description="Read only the last N lines")
+    max_bytes: int = Field(default=1024 * 1024, ge=1, description="Maximum bytes returned per file, default 1 MiB")
+    encoding: str = Field(default="utf-8", description="Text encoding; undecodable bytes are replaced")
+    binary: bool = Field(default=False, description="Return content base64-encoded instead of decoded text")
+
+    @model_validator(mode="after")
+    def _check_ranges(self) -> "ReadFilesAction":
+        line_range = self.start_line is not None or self.end_line is not None
+        byte_range = self.offset > 0 or self.length is not None
+        if sum([line_range, byte_range, self.tail_lines is not None]) > 1:
+            raise ValueError("Use only one of a byte range (offset/length), a line range or tail_lines")
+        if self.start_line is not None and self.end_line is not None and self.end_line < self.start_line:
+            raise ValueError("end_line must not be before start_line")
+        return self
+
+
+class ListFilesAction(BaseAction):
     """Browse and list files and directories within the sandbox file system. Use this to explore the directory
     structure, find files, or understand what's available in the session before reading or manipulating files."""
 
@@ -104,11 +334,23 @@ class ListFilesAction(BaseModel):
     )
 
     path: str = Field(default=".", description="Directory path to list (defaults to current directory)")
+    recursive: bool = Field(default=False, description="Whether to descend into subdirectories")
+    max_depth: Optional[int] = Field(
+        default=None, ge=1, description="Maximum directory depth when recursive (1 = direct children only)"
+    )
+    pattern: Optional[str] = Field(
+        default=None, description="Glob pattern (e.g. '*.py') matched against the entry name or relative path"
+    )
+    limit: int = Field(default=500, ge=1, description="Maximum number of entries returned per page")
+    cursor: Optional[str] = Field(
+        default=None, description="Cursor returned as 'nextCursor' by a previous call, to fetch the next page"
+    )
 
 
-class RemoveFilesAction(BaseModel):
+class RemoveFilesAction(BaseAction):
     """Delete one or more files from the sandbox file system. Use this to clean up temporary files, remove outdated
-    data, or manage storage space within the session. Be careful as this permanently removes files."""
+    data, or manage storage space within the session. Paths may be glob patterns, and directories are removed when
+    recursive is set. Be careful as this permanently removes files."""
 
     type: Literal["removeFiles"] = Field(description="Remove files from the code interpreter")
 
@@ -116,10 +358,11 @@ class RemoveFilesAction(BaseModel):
         default=None, description="Session name. If not provided, uses the default session."
     )
 
-    paths: List[str] = Field(description="Required list of file paths to remove")
+    paths: List[str] = Field(description="Required list of file paths or glob patterns (e.g. 'build/*.o') to remove")
+    recursive: bool = Field(default=False, description="Whether to remove directories and their contents")
 
 
-class WriteFilesAction(BaseModel):
+class WriteFilesAction(BaseAction):
     """Create or update multiple files in the sandbox file system with specified content. Use this to save data,
     create configuration files, write code files, or store any text-based content that your code execution will need."""
 
@@ -132,14 +375,136 @@ class WriteFilesAction(BaseModel):
     content: List[FileContent] = Field(description="Required list of file content to write")
 
 
-class CodeInterpreterInput(BaseModel):
-    action: Union[
+class SyncFilesAction(BaseAction):
+    """Synchronize a local directory with a sandbox directory. Content hashes are compared on both sides and only
+    added or changed files are transferred; files missing from the source can be deleted at the destination. Use
+    this instead of writeFiles/readFiles when iterating on a whole project."""
+
+    type: Literal["syncFiles"] = Field(description="Synchronize a directory between the host and the sandbox")
+
+    session_name: Optional[str] = Field(
+        default=None, description="Session name. If not provided, uses the default session."
+    )
+
+    local_path: str = Field(description="Local directory, relative to the interpreter's sync root")
+    remote_path: str = Field(default=".", description="Sandbox directory, relative to the session working directory")
+    direction: Literal["upload", "download"] = Field(
+        default="upload", description="'upload' copies local changes to the sandbox, 'download' the reverse"
+    )
+    delete: Optional[bool] = Field(
+        default=None,
+        description="Delete destination files that no longer exist at the source. Defaults to true for uploads and "
+        "false for downloads",
+    )
+    exclude: List[str] = Field(
+        default_factory=list, description="Glob patterns of file or directory names to skip (e.g. '.git', '*.pyc')"
+    )
+
+
+Action = Annotated[
+    Union[
         InitSessionAction,
         ListLocalSessionsAction,
         ExecuteCodeAction,
         ExecuteCommandAction,
+        CancelExecutionAction,
+        StartJobAction,
+        GetJobAction,
+        CancelJobAction,
+        CheckpointSessionAction,
+        RestoreSessionAction,
+        ForkSessionAction,
         ReadFilesAction,
         ListFilesAction,
         RemoveFilesAction,
         WriteFilesAction,
-    ] = Field(discriminator="type")
+        SyncFilesAction,
+    ],
+    Field(discriminator="type"),
+]
+
+
+class CodeInterpreterInput(BaseModel):
+    action: Optional[Action] = Field(default=None, description="Single action to perform")
+    actions: Optional[List[Action]] = Field(
+        default=None,
+        description="Ordered batch of actions run in one call instead of 'action'. String fields may reference the "
+        "result of an earlier step as {{steps.N.<path>}}, e.g. {{steps.0.content.0.json.jobId}}",
+    )
+    stop_on_error: bool = Field(
+        default=True, description="For batches: skip the remaining steps after the first failed step"
+    )
+
+    @model_validator(mode="after")
+    def _check_action_or_actions(self) -> "CodeInterpreterInput":
+        if (self.action is None) == (self.actions is None):
+            raise ValueError("Exactly one of 'action' or 'actions' must be provided")
+        if self.actions is not None and not self.actions:
+            raise ValueError("'actions' must contain at least one action")
+        return self
+
+
+# Structured results returned by backends and rendered to the tool-result format on demand
+class ExecutionError(BaseModel):
+    """Error raised by executed code"""
+
+    name: str = Field(description="Error type, e.g. 'ZeroDivisionError'")
+    value: str = Field(description="Error message")
+    traceback: Optional[str] = Field(default=None, description="Raw traceback")
+
+
+class ExecutionResult(BaseModel):
+    """Outcome of a code or command execution, keeping output streams, rich results, errors and timings apart."""
+
+    kind: Literal["code", "command"] = Field(default="code", description="What was executed")
+    stdout: List[str] = Field(default_factory=list, description="Standard output lines")
+    stderr: List[str] = Field(default_factory=list, description="Standard error lines")
+    results: List[Dict[str, Any]] = Field(
+        default_factory=list, description="Rich results by format, e.g. {'text': ..., 'png': <base64>}"
+    )
+    error: Optional[ExecutionError] = Field(default=None, description="Error raised by the executed code")
+    exit_code: Optional[int] = Field(default=None, description="Exit code of a command")
+    timeout: Optional[float] = Field(default=None, description="Timeout the execution ran under, in seconds")
+    timed_out: bool = Field(default=False, description="Whether the execution hit its timeout and was interrupted")
+    cancelled: bool = Field(default=False, description="Whether the execution was interrupted on request")
+    queue_seconds: float = Field(default=0.0, description="Time spent waiting for execution capacity")
+    execution_seconds: float = Field(default=0.0, description="Wall time of the execution itself")
+    bytes_in: int = Field(default=0, description="Bytes of code sent to the sandbox")
+    bytes_out: int = Field(default=0, description="Bytes of output received from the sandbox")
+
+    @property
+    def success(self) -> bool:
+        return not (self.error or self.timed_out or self.cancelled or self.exit_code)
+
+    def output_text(self) -> str:
+        """Render stdout, stderr and text results as text"""
+        output_parts = [line.rstrip() for line in self.stdout if line.strip()]
+
+        stderr_lines = [line.rstrip() for line in self.stderr if line.strip()]
+        if stderr_lines:
+            output_parts.append("[stderr]")
+            output_parts.extend(stderr_lines)
+
+        for result in self.results:
+            if result.get("text"):
+                output_parts.append(f"=> {result['text']}")
+
+        return "\n".join(output_parts) if output_parts else "(no output)"
+
+    def to_tool_result(self) -> Dict[str, Any]:
+        """Render as a strands tool result"""
+        if self.kind == "command" and not self.success:
+            # Command output already carries timeout/cancellation notes
+            text = f"Command execution failed (exit code: {self.exit_code}):\n{self.output_text()}"
+        elif self.timed_out:
+            text = (
+                f"Execution timed out after {self.timeout}s and was interrupted (session state preserved). "
+                f"Partial output:\n{self.output_text()}"
+            )
+        elif self.cancelled:
+            text = f"Execution cancelled (session state preserved). Partial output:\n{self.output_text()}"
+        elif self.error:
+            text = f"Execution error: {self.error.name}\n{self.error.value}"
+        else:
+            text = self.output_text()
+        return {"status": "success" if self.success else "error", "content": [{"text": text}]}
@@ -0,0 +1,274 @@
+"""
+Record/Replay Code Interpreters
+
+RecordingCodeInterpreter wraps any backend and appends every action it serves,
+together with the result, the time the backend took and, for backends that
+expose a code_observer hook, the code they ran in the sandbox while serving the
+action on the calling thread, to a gzip-compressed JSON Lines file. Code run on
+other threads (background jobs, fork restores, pre-warming) is not recorded. ReplayCodeInterpreter serves such a recording without any
+sandbox, optionally reproducing the recorded latencies, so full agent flows can
+be benchmarked repeatably and offline.
+"""
+
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+from .code_interpreter import CodeInterpreter
+from .models import (
+    ExecuteCodeAction,
+    ExecuteCommandAction,
+    InitSessionAction,
+    LanguageType,
+    ListFilesAction,
+    ListLocalSessionsAction,
+    ReadFilesAction,
+    RemoveFilesAction,
+    WriteFilesAction,
+    dump_action,
+)
+
+logger = logging.getLogger(__name__)
+
+_RECORDING_VERSION = 1
+
+
+def _action_key(action: Dict[str, Any]) -> str:
+    """Canonical form of a serialized action, used to match replayed actions"""
+    return json.dumps(action, sort_keys=True, separators=(",", ":"))
+
+
+class RecordingCodeInterpreter(CodeInterpreter):
+    """Code Interpreter that records every interaction with a backend"""
+
+    def __init__(self, backend: CodeInterpreter, path: str) -> None:
+        """
+        Initialize the recorder
+
+        Args:
+            backend: Code Interpreter that actually serves the actions
+            path: Recording file to create (gzip-compressed JSON Lines, overwritten if it exists)
+        """
+        # The backend must be known before the base class builds the tool description
+        self._backend = backend
+        super().__init__()
+
+        self.path = path
+        self._file: Optional[Any] = None
+        self._lock = threading.Lock()
+
+        # Code the backend runs while serving an action, collected per dispatching thread
+        self._generated = threading.local()
+        if hasattr(backend, "code_observer"):
+            backend.code_observer = self._observe_code
+
+        logger.info(f"Recording {type(backend).__name__} interactions to {path}")
+
+    def start_platform(self) -> None:
+        """Open the recording and start the backend"""
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._write(
+            {
+                "version": _RECORDING_VERSION,
+                "backend": type(self._backend).__name__,
+                "languages": [language.value for language in self._backend.get_supported_languages()],
+                "recordedAt": time.time(),
+            }
+        )
+        self._backend._start()
+
+    def cleanup_platform(self) -> None:
+        """Clean up the backend and close the recording"""
+        try:
+            self._backend._cleanup()
+        finally:
+            with self._lock:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+
+    def get_supported_languages(self) -> List[LanguageType]:
+        """Languages of the recorded backend"""
+        return self._backend.get_supported_languages()
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(json.dumps(entry, default=str) + "\n")
+            # Flush per entry so a crashed run still leaves a usable recording
+            self._file.flush()
+
+    def _observe_code(self, session_name: str, code: str, language: Optional[str]) -> None:
+        """Collect code the backend runs for the action being dispatched on this thread"""
+        generated = getattr(self._generated, "code", None)
+        if generated is not None:
+            generated.append({"sessionName": session_name, "language": language or "python", "code": code})
+
+    def dispatch(self, action: Any) -> Dict[str, Any]:
+        """Forward an action to the backend and record it"""
+        if not self._started:
+            self._start()
+
+        self._generated.code = []
+        start = time.perf_counter()
+        try:
+            result = self._backend.dispatch(action)
+        finally:
+            elapsed = time.perf_counter() - start
+            generated, self._generated.code = self._generated.code, None
+
+        entry = {
+            "action": dump_action(action),
+            "result": result,
+            "elapsedSeconds": round(elapsed, 6),
+        }
+        if generated:
+            entry["generatedCode"] = generated
+        self._write(entry)
+        return result
+
+    def init_session(self, action: InitSessionAction) -> Dict[str, Any]:
+        """Create a session through the backend"""
+        return self.dispatch(action)
+
+    def list_local_sessions(self) -> Dict[str, Any]:
+        """List sessions through the backend"""
+        return self.dispatch(ListLocalSessionsAction(type="listLocalSessions"))
+
+    def execute_code(self, action: ExecuteCodeAction) -> Dict[str, Any]:
+        """Execute code through the backend"""
+        return self.dispatch(action)
+
+    def execute_command(self, action: ExecuteCommandAction) -> Dict[str, Any]:
+        """Execute a command through the backend"""
+        return self.dispatch(action)
+
+    def read_files(self, action: ReadFilesAction) -> Dict[str, Any]:
+        """Read files through the backend"""
+        return self.dispatch(action)
+
+    def list_files(self, action: ListFilesAction) -> Dict[str, Any]:
+        """List files through the backend"""
+        return self.dispatch(action)
+
+    def remove_files(self, action: RemoveFilesAction) -> Dict[str, Any]:
+        """Remove files through the backend"""
+        return self.dispatch(action)
+
+    def write_files(self, action: WriteFilesAction) -> Dict[str, Any]:
+        """Write files through the backend"""
+        return self.dispatch(action)
+
+
+class ReplayCodeInterpreter(CodeInterpreter):
+    """Code Interpreter that serves a recording made by RecordingCodeInterpreter"""
+
+    def __init__(self, path: str, simulate_latency: bool = False, latency_scale: float = 1.0) -> None:
+        """
+        Initialize the replayer
+
+        Args:
+            path: Recording file written by RecordingCodeInterpreter
+            simulate_latency: Sleep for the recorded backend time before returning each result, default False
+            latency_scale: Factor applied to recorded latencies when simulating them, default 1.0
+        """
+        self.path = path
+        self.simulate_latency = simulate_latency
+        self.latency_scale = latency_scale
+
+        # Identical actions are answered in the order they were recorded
+        self._entries: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._languages: List[LanguageType] = []
+        self._lock = threading.Lock()
+        self._load()
+
+        # The recording must be loaded before the base class builds the tool description
+        super().__init__()
+
+        logger.info(f"Replaying {sum(len(queue) for queue in self._entries.values())} recorded action(s) from {path}")
+
+    def _load(self) -> None:
+        """Read the recording into per-action queues"""
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != _RECORDING_VERSION:
+                raise ValueError(f"Unsupported recording version: {header.get('version')}")
+            self._languages = [LanguageType(language) for language in header["languages"]]
+
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self._entries[_action_key(entry["action"])].append(entry)
+
+    def start_platform(self) -> None:
+        """Nothing to start; the recording was loaded at construction"""
+
+    def cleanup_platform(self) -> None:
+        """Nothing to clean up"""
+
+    def get_supported_languages(self) -> List[LanguageType]:
+        """Languages of the recorded backend"""
+        return self._languages
+
+    def remaining(self) -> int:
+        """Number of recorded actions not replayed yet"""
+        with self._lock:
+            return sum(len(queue) for queue in self._entries.values())
+
+    def dispatch(self, action: Any) -> Dict[str, Any]:
+        """Return the recorded result of an action"""
+        if not self._started:
+            self._start()
+
+        with self._lock:
+            queue = self._entries.get(_action_key(dump_action(action)))
+            entry = queue.popleft() if queue else None
+
+        if entry is None:
+            logger.warning(f"No recorded result for {type(action).__name__}")
+            return {
+                "status": "error",
+                "content": [{"text": f"No recorded result left for action '{action.type}' in {self.path}"}],
+            }
+
+        if self.simulate_latency:
+            time.sleep(entry["elapsedSeconds"] * self.latency_scale)
+        return entry["result"]
+
+    def init_session(self, action: InitSessionAction) -> Dict[str, Any]:
+        """Create a session from the recording"""
+        return self.dispatch(action)
+
+    def list_local_sessions(self) -> Dict[str, Any]:
+        """List sessions from the recording"""
+        return self.dispatch(ListLocalSessionsAction(type="listLocalSessions"))
+
+    def execute_code(self, action: ExecuteCodeAction) -> Dict[str, Any]:
+        """Execute code from the recording"""
+        return self.dispatch(action)
+
+    def execute_command(self, action: ExecuteCommandAction) -> Dict[str, Any]:
+        """Execute a command from the recording"""
+        return self.dispatch(action)
+
+    def read_files(self, action: ReadFilesAction) -> Dict[str, Any]:
+        """Read files from the recording"""
+        return self.dispatch(action)
+
+    def list_files(self, action: ListFilesAction) -> Dict[str, Any]:
+        """List files from the recording"""
+        return self.dispatch(action)
+
+    def remove_files(self, action: RemoveFilesAction) -> Dict[str, Any]:
+        """Remove files from the recording"""
+        return self.dispatch(action)
+
+    def write_files(self, action: WriteFilesAction) -> Dict[str, Any]:
+        """Write files from the recording"""
+        return self.dispatch(action)
@@ -0,0 +1,379 @@
+"""
+Router Code Interpreter
+
+Composes several CodeInterpreter backends behind a single tool. Each session is
+placed on one backend by policy (language support, load, observed session
+creation latency) and pinned there for its lifetime; new sessions fail over to the next backend when
+one is degraded or full, e.g. bursting from a local backend to E2B.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from .code_interpreter import CodeInterpreter
+from .models import (
+    CancelExecutionAction,
+    CancelJobAction,
+    CheckpointSessionAction,
+    ExecuteCodeAction,
+    ExecuteCommandAction,
+    ForkSessionAction,
+    GetJobAction,
+    InitSessionAction,
+    LanguageType,
+    ListFilesAction,
+    ListLocalSessionsAction,
+    ReadFilesAction,
+    RemoveFilesAction,
+    RestoreSessionAction,
+    StartJobAction,
+    WriteFilesAction,
+)
+
+logger = logging.getLogger(__name__)
+
+# Actions that only make sense on an existing session and must never place a new one
+_EXISTING_SESSION_ACTIONS = (
+    GetJobAction,
+    CancelJobAction,
+    CancelExecutionAction,
+    CheckpointSessionAction,
+    ForkSessionAction,
+)
+
+
+@dataclass
+class _BackendState:
+    """Routing state of one backend"""
+
+    name: str
+    backend: CodeInterpreter
+    max_sessions: Optional[int] = None
+    sessions: int = 0
+    in_flight: int = 0
+    latency: Optional[float] = None
+    consecutive_failures: int = 0
+    degraded_until: float = 0.0
+
+    def healthy(self) -> bool:
+        return time.time() >= self.degraded_until
+
+    def full(self) -> bool:
+        return self.max_sessions is not None and self.sessions >= self.max_sessions
+
+    def score(self) -> float:
+        # Unmeasured backends score 0 so they are tried (in declaration order) before being ranked
+        return (self.latency or 0.0) * (1 + self.in_flight)
+
+
+class RouterCodeInterpreter(CodeInterpreter):
+    """Code Interpreter that routes sessions across several backends"""
+
+    def __init__(
+        self,
+        backends: Sequence[CodeInterpreter],
+        max_sessions: Optional[Sequence[Optional[int]]] = None,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        latency_smoothing: float = 0.2,
+    ) -> None:
+        """
+        Initialize the router
+
+        Args:
+            backends: Backends in order of preference
+            max_sessions: Per-backend session capacity (None = unlimited), aligned with backends, optional.
+                A full backend only receives new sessions when no other backend can take them
+            failure_threshold: Consecutive failures after which a backend is marked degraded, default 3
+            cooldown: Seconds a degraded backend is skipped for new sessions, default 30
+            latency_smoothing: Weight of the newest sample in the moving average of session creation latency,
+                default 0.2
+        """
+        if not backends:
+            raise ValueError("At least one backend is required")
+        if max_sessions is not None and len(max_sessions) != len(backends):
+            raise ValueError("max_sessions must have one entry per backend")
+
+        # Backends must be known before the base class builds the tool description
+        self._backends = [
+            _BackendState(
+                name=f"{type(backend).__name__}-{index}",
+                backend=backend,
+                max_sessions=max_sessions[index] if max_sessions else None,
+            )
+            for index, backend in enumerate(backends)
+        ]
+        super().__init__()
+
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.latency_smoothing = latency_smoothing
+        self.default_session = f"session-{uuid.uuid4().hex[:12]}"
+
+        # Session pins: session_name -> backend state; checkpoint_id -> backend state
+        self._pins: Dict[str, _BackendState] = {}
+        self._checkpoints: Dict[str, _BackendState] = {}
+        self._lock = threading.Lock()
+        # Serializes placement of each session so concurrent first calls land on one backend
+        self._placement_locks: Dict[str, threading.Lock] = {}
+
+        logger.info(f"Initialized Router Code Interpreter over {len(self._backends)} backend(s)")
+
+    def start_platform(self) -> None:
+        """Start all backends"""
+        for state in self._backends:
+            state.backend._start()
+
+    def cleanup_platform(self) -> None:
+        """Clean up all backends"""
+        for state in self._backends:
+            try:
+                state.backend._cleanup()
+            except Exception as e:
+                logger.debug(f"Backend {state.name} cleanup failed: {e}")
+            state.sessions = 0
+        self._pins.clear()
+        self._placement_locks.clear()
+        self._checkpoints.clear()
+
+    def get_supported_languages(self) -> List[LanguageType]:
+        """Union of the languages supported by the backends"""
+        languages: List[LanguageType] = []
+        for state in self._backends:
+            for language in state.backend.get_supported_languages():
+                if language not in languages:
+                    languages.append(language)
+        return languages
+
+    def backend_stats(self) -> List[Dict[str, Any]]:
+        """Routing state of each backend"""
+        with self._lock:
+            return [
+                {
+                    "backend": state.name,
+                    "sessions": state.sessions,
+                    "maxSessions": state.max_sessions,
+                    "inFlight": state.in_flight,
+                    "latencySeconds": state.latency,
+                    "healthy": state.healthy(),
+                    "consecutiveFailures": state.consecutive_failures,
+                }
+                for state in self._backends
+            ]
+
+    def _candidates(self, language: Optional[LanguageType]) -> List[_BackendState]:
+        """Healthy backends able to host a new session, best first"""
+        with self._lock:
+            candidates = [
+                state
+                for state in self._backends
+                if state.healthy()
+                and (language is None or language in state.backend.get_supported_languages())
+            ]
+            # Stable sort: free capacity first, then load-weighted latency, then declaration order
+            return sorted(candidates, key=lambda state: (state.full(), state.score()))
+
+    def _forward(self, state: _BackendState, action: Any, measure: bool = False) -> Dict[str, Any]:
+        """Run an action on a backend, tracking load and, when measure is set, latency"""
+        with self._lock:
+            state.in_flight += 1
+        start = time.perf_counter()
+        try:
+            result = state.backend.dispatch(action)
+        except Exception as e:
+            logger.error(f"Backend {state.name} raised: {e}")
+            result = {"status": "error", "content": [{"text": f"Backend {state.name} failed: {str(e)}"}]}
+        else:
+            # Only successful session creation is measured: user code runtime says nothing about the backend
+            elapsed = time.perf_counter() - start
+            if measure and result.get("status") == "success":
+                with self._lock:
+                    if state.latency is None:
+                        state.latency = elapsed
+                    else:
+                        state.latency += self.latency_smoothing * (elapsed - state.latency)
+        finally:
+            with self._lock:
+                state.in_flight -= 1
+        return result
+
+    def _record_failure(self, state: _BackendState) -> None:
+        """Count a failed session placement, degrading the backend past the threshold"""
+        with self._lock:
+            state.consecutive_failures += 1
+            if state.consecutive_failures >= self.failure_threshold:
+                state.degraded_until = time.time() + self.cooldown
+                logger.warning(f"Backend {state.name} degraded for {self.cooldown}s")
+
+    def _record_success(self, state: _BackendState) -> None:
+        with self._lock:
+            state.consecutive_failures = 0
+
+    def _pin(self, session_name: str, state: _BackendState) -> None:
+        with self._lock:
+            if session_name not in self._pins:
+                state.sessions += 1
+            self._pins[session_name] = state
+
+    def _unpin(self, session_name: str) -> None:
+        """Forget a session that no longer exists on its backend, freeing its capacity"""
+        with self._lock:
+            state = self._pins.pop(session_name, None)
+            if state is not None:
+                state.sessions -= 1
+
+    def _placement_lock(self, session_name: str) -> threading.Lock:
+        with self._lock:
+            return self._placement_locks.setdefault(session_name, threading.Lock())
+
+    def _place_session(
+        self, session_name: str, description: str, language: Optional[LanguageType]
+    ) -> tuple[Optional[_BackendState], Dict[str, Any]]:
+        """Create a session on the best backend, failing over to the next candidates"""
+        candidates = self._candidates(language)
+        if not candidates:
+            return None, {
+                "status": "error",
+                "content": [{"text": f"No healthy backend available for session '{session_name}'"}],
+            }
+
+        result: Dict[str, Any] = {}
+        for state in candidates:
+            init = InitSessionAction(type="initSession", session_name=session_name, description=description)
+            result = self._forward(state, init, measure=True)
+            if result.get("status") == "success":
+                self._record_success(state)
+                self._pin(session_name, state)
+                logger.info(f"Session '{session_name}' placed on backend {state.name}")
+                return state, result
+            logger.warning(f"Backend {state.name} could not create session '{session_name}', failing over")
+            self._record_failure(state)
+        return None, result
+
+    def dispatch(self, action: Any) -> Dict[str, Any]:
+        """Route an action to the backend its session is pinned to"""
+        if not self._started:
+            self._start()
+
+        if isinstance(action, ListLocalSessionsAction):
+            return self.list_local_sessions()
+
+        session_name = getattr(action, "session_name", None) or self.default_session
+        action = action.model_copy(update={"session_name": session_name})
+
+        if isinstance(action, InitSessionAction):
+            with self._placement_lock(session_name):
+                if session_name in self._pins:
+                    return {"status": "error", "content": [{"text": f"Session '{session_name}' already exists"}]}
+                return self._place_session(session_name, action.description, None)[1]
+
+        state = self._pins.get(session_name)
+        if state is None and isinstance(action, _EXISTING_SESSION_ACTIONS):
+            return {"status": "error", "content": [{"text": f"Session '{session_name}' not found"}]}
+        if state is None:
+            with self._placement_lock(session_name):
+                # Another call may have placed the session while this one waited
+                state = self._pins.get(session_name)
+                if state is None:
+                    state, error = self._place_for(session_name, action)
+                    if state is None:
+                        return error
+
+        result = self._forward(state, action)
+
+        if self._session_lost(session_name, result):
+            logger.info(f"Session '{session_name}' no longer exists on backend {state.name}, unpinning it")
+            self._unpin(session_name)
+        elif result.get("status") == "success":
+            if isinstance(action, CheckpointSessionAction):
+                self._checkpoints[result["content"][0]["json"]["checkpointId"]] = state
+            elif isinstance(action, ForkSessionAction):
+                for fork in result["content"][0]["json"]["forks"]:
+                    if fork["status"] == "success":
+                        self._pin(fork["sessionName"], state)
+        return result
+
+    def _place_for(self, session_name: str, action: Any) -> tuple[Optional[_BackendState], Dict[str, Any]]:
+        """Pin a session that is first used by action, placing it on a backend when it is new"""
+        if isinstance(action, RestoreSessionAction) and action.checkpoint_id in self._checkpoints:
+            # Checkpoints live on the backend that took them
+            state = self._checkpoints[action.checkpoint_id]
+            self._pin(session_name, state)
+            return state, {}
+
+        # Reject invalid code before placement would create a session for it
+        rejected = self._prevalidate(action)
+        if rejected:
+            return None, rejected
+        language = action.language if isinstance(action, (ExecuteCodeAction, StartJobAction)) else None
+        return self._place_session(session_name, "Auto-created session", language)
+
+    @staticmethod
+    def _session_lost(session_name: str, result: Dict[str, Any]) -> bool:
+        """Whether a backend answered that the session does not exist (e.g. after the backend was restarted)"""
+        if result.get("status") != "error" or not result.get("content"):
+            return False
+        return str(result["content"][0].get("text", "")).startswith(f"Session '{session_name}' not found")
+
+    def init_session(self, action: InitSessionAction) -> Dict[str, Any]:
+        """Create a session on the best backend"""
+        return self.dispatch(action)
+
+    def list_local_sessions(self) -> Dict[str, Any]:
+        """List sessions of all backends, tagged with the backend hosting them, and unpin sessions that ended"""
+        sessions = []
+        for state in self._backends:
+            # Sessions pinned before the listing must appear in it; later pins may not yet
+            with self._lock:
+                pinned = [name for name, pin in self._pins.items() if pin is state]
+            result = self._forward(state, ListLocalSessionsAction(type="listLocalSessions"))
+            if result.get("status") != "success":
+                continue
+            listed = set()
+            for session in result["content"][0]["json"]["sessions"]:
+                listed.add(session.get("sessionName"))
+                sessions.append({**session, "backend": state.name})
+            for name in pinned:
+                if name not in listed:
+                    self._unpin(name)
+
+        return {
+            "status": "success",
+            "content": [
+                {
+                    "json": {
+                        "sessions": sessions,
+                        "totalSessions": len(sessions),
+                        "backends": self.backend_stats(),
+                    }
+                }
+            ],
+        }
+
+    def execute_code(self, action: ExecuteCodeAction) -> Dict[str, Any]:
+        """Execute code on the session's backend"""
+        return self.dispatch(action)
+
+    def execute_command(self, action: ExecuteCommandAction) -> Dict[str, Any]:
+        """Execute a command on the session's backend"""
+        return self.dispatch(action)
+
+    def read_files(self, action: ReadFilesAction) -> Dict[str, Any]:
+        """Read files on the session's backend"""
+        return self.dispatch(action)
+
+    def list_files(self, action: ListFilesAction) -> Dict[str, Any]:
+        """List files on the session's backend"""
+        return self.dispatch(action)
+
+    def remove_files(self, action: RemoveFilesAction) -> Dict[str, Any]:
+        """Remove files on the session's backend"""
+        return self.dispatch(action)
+
+    def write_files(self, action: WriteFilesAction) -> Dict[str, Any]:
+        """Write files on the session's backend"""
+        return self.dispatch(action)
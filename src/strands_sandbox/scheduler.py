@@ -0,0 +1,227 @@
+"""
+Admission control for sandbox capacity.
+
+A SandboxScheduler caps the number of live sandboxes and in-flight executions
+across every interpreter that shares it. Requests over capacity wait in a queue
+ordered by priority class (interactive before batch) and served round-robin
+across tenants within a class, so a burst from one agent cannot starve others
+and the process stays at the quota ceiling instead of failing all at once.
+
+Sandbox capacity can be held under a lease that lapses on its own once the
+sandbox's lifetime is over, so sandboxes the provider kills on timeout stop
+counting against the cap even when nobody releases them.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Deque, Dict, Iterator, Optional
+
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(str, Enum):
+    """Scheduling priority classes, served in declaration order."""
+
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+class SchedulerTimeoutError(Exception):
+    """Raised when a request waited longer than allowed for sandbox capacity."""
+
+
+class _Ticket:
+    """A queued request, granted by a releasing holder"""
+
+    __slots__ = ("granted",)
+
+    def __init__(self) -> None:
+        self.granted = False
+
+
+class _CapacityPool:
+    """Counting semaphore with priority classes and per-tenant round-robin queues"""
+
+    def __init__(self, name: str, capacity: int, metrics: Metrics) -> None:
+        if capacity < 1:
+            raise ValueError(f"{name} capacity must be at least 1")
+        self.name = name
+        self.capacity = capacity
+        self.in_use = 0
+        self._metrics = metrics
+        self._cond = threading.Condition()
+        self._queues: Dict[Priority, "OrderedDict[str, Deque[_Ticket]]"] = {
+            priority: OrderedDict() for priority in Priority
+        }
+        # Held capacity that lapses by itself: lease_id -> expiry (time.monotonic())
+        self._leases: Dict[str, float] = {}
+
+    def queued(self) -> int:
+        with self._cond:
+            return sum(len(q) for tenants in self._queues.values() for q in tenants.values())
+
+    def used(self) -> int:
+        with self._cond:
+            self._expire_leases()
+            return self.in_use
+
+    def acquire(
+        self, tenant: str, priority: Priority, timeout: Optional[float], lease: Optional[float] = None
+    ) -> Optional[str]:
+        """Take one unit of capacity, returning a lease ID when it should lapse after lease seconds"""
+        start = time.perf_counter()
+        with self._cond:
+            self._expire_leases()
+            if self.in_use < self.capacity and not any(self._queues.values()):
+                self.in_use += 1
+                self._metrics.record_time(f"queue_wait.{self.name}", 0.0)
+                return self._grant_lease(lease)
+
+            ticket = _Ticket()
+            self._queues[priority].setdefault(tenant, deque()).append(ticket)
+            deadline = None if timeout is None else start + timeout
+            while not ticket.granted:
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    self._discard(ticket, tenant, priority)
+                    self._metrics.increment(f"rejected.{self.name}")
+                    raise SchedulerTimeoutError(
+                        f"Timed out after {timeout}s waiting for {self.name} capacity "
+                        f"({self.in_use}/{self.capacity} in use, tenant '{tenant}', priority '{priority.value}')"
+                    )
+                self._cond.wait(self._wait_time(remaining))
+                self._expire_leases()
+
+            self._metrics.record_time(f"queue_wait.{self.name}", time.perf_counter() - start)
+            return self._grant_lease(lease)
+
+    def release(self, lease_id: Optional[str] = None) -> None:
+        """Return one unit of capacity; a lapsed or already released lease is ignored"""
+        with self._cond:
+            if lease_id is not None and self._leases.pop(lease_id, None) is None:
+                return
+            self._release()
+
+    def _release(self) -> None:
+        self.in_use = max(0, self.in_use - 1)
+        while self.in_use < self.capacity:
+            ticket = self._next_ticket()
+            if ticket is None:
+                break
+            ticket.granted = True
+            self.in_use += 1
+        self._cond.notify_all()
+
+    def _grant_lease(self, lease: Optional[float]) -> Optional[str]:
+        if lease is None:
+            return None
+        lease_id = uuid.uuid4().hex
+        self._leases[lease_id] = time.monotonic() + lease
+        return lease_id
+
+    def _expire_leases(self) -> None:
+        now = time.monotonic()
+        for lease_id, expiry in list(self._leases.items()):
+            if expiry <= now:
+                del self._leases[lease_id]
+                self._metrics.increment(f"lease_expired.{self.name}")
+                self._release()
+
+    def _wait_time(self, remaining: Optional[float]) -> Optional[float]:
+        """Seconds to wait for a release, waking up when the next lease lapses"""
+        if not self._leases:
+            return remaining
+        until_expiry = max(0.0, min(self._leases.values()) - time.monotonic())
+        return until_expiry if remaining is None else min(remaining, until_expiry)
+
+    def _next_ticket(self) -> Optional[_Ticket]:
+        for priority in Priority:
+            tenants = self._queues[priority]
+            if tenants:
+                # Serve the first tenant, then move it to the back for round-robin fairness
+                tenant, queue = tenants.popitem(last=False)
+                ticket = queue.popleft()
+                if queue:
+                    tenants[tenant] = queue
+                return ticket
+        return None
+
+    def _discard(self, ticket: _Ticket, tenant: str, priority: Priority) -> None:
+        queue = self._queues[priority].get(tenant)
+        if queue is not None:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[priority][tenant]
+
+
+class SandboxScheduler:
+    """Process-wide cap on live sandboxes and in-flight executions, shared by interpreters"""
+
+    def __init__(self, max_sandboxes: int = 20, max_executions: int = 50, max_wait: Optional[float] = 60.0) -> None:
+        """
+        Initialize the scheduler
+
+        Args:
+            max_sandboxes: Maximum number of live sandboxes, default 20
+            max_executions: Maximum number of concurrently running executions, default 50
+            max_wait: Default maximum seconds a request waits for capacity (None waits forever), default 60
+        """
+        self.max_wait = max_wait
+        self.metrics = Metrics()
+        self._sandboxes = _CapacityPool("sandbox", max_sandboxes, self.metrics)
+        self._executions = _CapacityPool("execution", max_executions, self.metrics)
+
+    def acquire_sandbox(
+        self,
+        tenant: str = "default",
+        priority: Priority = Priority.INTERACTIVE,
+        timeout: Optional[float] = None,
+        lifetime: Optional[float] = None,
+    ) -> Optional[str]:
+        """
+        Reserve capacity for one live sandbox; pair with release_sandbox when it is killed
+
+        With a lifetime (the sandbox timeout), the reservation is a lease that lapses once the provider has
+        killed the sandbox, and its ID is returned to pass to release_sandbox.
+        """
+        return self._sandboxes.acquire(
+            tenant, Priority(priority), timeout if timeout is not None else self.max_wait, lease=lifetime
+        )
+
+    def release_sandbox(self, lease_id: Optional[str] = None) -> None:
+        """Return the capacity of a sandbox that is no longer live (no-op for a lease that already lapsed)"""
+        self._sandboxes.release(lease_id)
+
+    @contextmanager
+    def execution(
+        self, tenant: str = "default", priority: Priority = Priority.INTERACTIVE, timeout: Optional[float] = None
+    ) -> Iterator[None]:
+        """Hold one execution slot for the duration of the block"""
+        self._executions.acquire(tenant, Priority(priority), timeout if timeout is not None else self.max_wait)
+        try:
+            yield
+        finally:
+            self._executions.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current utilisation, queue lengths and queue-time metrics"""
+        return {
+            "sandboxes": {
+                "inUse": self._sandboxes.used(),
+                "capacity": self._sandboxes.capacity,
+                "queued": self._sandboxes.queued(),
+            },
+            "executions": {
+                "inUse": self._executions.in_use,
+                "capacity": self._executions.capacity,
+                "queued": self._executions.queued(),
+            },
+            **self.metrics.snapshot(),
+        }
@@ -0,0 +1,112 @@
+"""
+Local pre-validation of code before it is sent to a sandbox.
+
+Validators are cheap syntax checks run on the host. A validator takes the code and
+returns an error message, or None when the code may be executed. Checks that need
+an external tool (node, bash, esbuild) are only registered when the tool is installed.
+"""
+
+import ast
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import traceback
+import warnings
+from typing import Callable, Dict, List, Optional
+
+from .models import LanguageType
+
+Validator = Callable[[str], Optional[str]]
+
+# IPython-only lines (shell escapes, magics, assignments from either, help queries like obj? and ??obj)
+# that plain Python rejects
+_IPYTHON_LINE = re.compile(r"^\s*(?:[!%]|[\w.,\s]+=\s*[!%]|\?{1,2}[\w.*]+\s*$|[\w.*]+(?:\(\))?\?{1,2}\s*$)")
+
+# Checker output lines that carry no diagnostic (node stack frames and version banner)
+_CHECKER_NOISE = re.compile(r"^\s+at |^Node\.js v")
+
+# Seconds an external syntax checker may take before the code is passed through unchecked
+_CHECKER_TIMEOUT = 5
+
+
+def _compile(code: str) -> Optional[SyntaxError]:
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            compile(code, "<cell>", "exec", flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT, dont_inherit=True)
+    except SyntaxError as e:
+        return e
+    return None
+
+
+def check_python(code: str) -> Optional[str]:
+    """Compile Python code, accepting top-level await and IPython syntax as the kernel does"""
+    error = _compile(code)
+    if error is None:
+        return None
+
+    if code.lstrip().startswith("%%"):
+        # A cell magic decides how the whole cell is interpreted; leave the verdict to the kernel
+        return None
+
+    lines = code.splitlines()
+    if any(_IPYTHON_LINE.match(line) for line in lines):
+        # Check the rest of the code with IPython-only lines blanked out, keeping line numbers
+        stripped = [
+            line[: len(line) - len(line.lstrip())] + "pass" if _IPYTHON_LINE.match(line) else line for line in lines
+        ]
+        error = _compile("\n".join(stripped))
+        if error is None:
+            return None
+    return "".join(traceback.format_exception_only(type(error), error)).rstrip()
+
+
+def external_checker(command: List[str], suffix: str, expressions: bool = False) -> Validator:
+    """
+    Validator running a syntax-check command on the code written to a temporary file
+
+    With expressions, code the checker rejects as a script is accepted when it checks as a parenthesized
+    expression, since REPL kernels evaluate a bare expression like {a: 1} as an object rather than a block.
+    """
+
+    def check(code: str) -> Optional[str]:
+        error = run(code)
+        if error and expressions and run(f"(\n{code}\n)") is None:
+            return None
+        return error
+
+    def run(code: str) -> Optional[str]:
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(code)
+            completed = subprocess.run(
+                [*command, path], capture_output=True, text=True, timeout=_CHECKER_TIMEOUT
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            # A checker that cannot run must not block execution
+            return None
+        finally:
+            os.remove(path)
+        if completed.returncode != 0:
+            output = (completed.stderr or completed.stdout).replace(path, "<cell>")
+            # Drop checker stack frames and version banners, keeping the diagnostic itself
+            lines = [line for line in output.splitlines() if not _CHECKER_NOISE.match(line)]
+            return "\n".join(lines).strip()
+        return None
+
+    return check
+
+
+def default_validators() -> Dict[LanguageType, List[Validator]]:
+    """Validators for each language, including external checkers installed on this host"""
+    validators: Dict[LanguageType, List[Validator]] = {LanguageType.PYTHON: [check_python]}
+    if shutil.which("node"):
+        validators[LanguageType.JAVASCRIPT] = [external_checker(["node", "--check"], ".js", expressions=True)]
+    if shutil.which("esbuild"):
+        validators[LanguageType.TYPESCRIPT] = [external_checker(["esbuild", "--log-level=error"], ".ts", expressions=True)]
+    if shutil.which("bash"):
+        validators[LanguageType.BASH] = [external_checker(["bash", "-n"], ".sh")]
+    return validators
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+from strands_sandbox.e2bcodeinterpreter import E2BCodeInterpreter
+from strands_sandbox.models import ForkSessionAction, RestoreSessionAction
+
+CHECKPOINT_ID = "ckpt-0123456789ab"
+
+
+def _interpreter(tmp_path, auto_create):
+    interpreter = E2BCodeInterpreter(api_key="test", auto_create=auto_create, checkpoint_dir=str(tmp_path))
+    (tmp_path / f"{CHECKPOINT_ID}.tar.gz").write_bytes(b"archive")
+    created = []
+
+    def init_session(action):
+        created.append(action.session_name)
+        interpreter._sessions[action.session_name] = SimpleNamespace(files=SimpleNamespace(write=lambda path, data: None))
+        return {"status": "success", "content": []}
+
+    def checkpoint_session(action):
+        interpreter.checkpointed_paths = action.paths
+        return {"status": "success", "content": [{"json": {"checkpointId": CHECKPOINT_ID}}]}
+
+    interpreter.init_session = init_session
+    interpreter.checkpoint_session = checkpoint_session
+    interpreter._run_code = lambda session_name, code, **kwargs: SimpleNamespace(
+        error=None, logs=SimpleNamespace(stdout=['{"variables": 1}'])
+    )
+    return interpreter, created
+
+
+def test_restore_creates_a_missing_session_with_auto_create(tmp_path):
+    interpreter, created = _interpreter(tmp_path, auto_create=True)
+
+    result = interpreter.restore_session(
+        RestoreSessionAction(type="restoreSession", session_name="new", checkpoint_id=CHECKPOINT_ID)
+    )
+
+    assert result["status"] == "success"
+    assert created == ["new"]
+
+
+def test_restore_does_not_create_sessions_without_auto_create(tmp_path):
+    interpreter, created = _interpreter(tmp_path, auto_create=False)
+
+    result = interpreter.restore_session(
+        RestoreSessionAction(type="restoreSession", session_name="new", checkpoint_id=CHECKPOINT_ID)
+    )
+
+    assert result["status"] == "error"
+    assert "not found" in result["content"][0]["text"]
+    assert created == []
+
+
+def test_fork_creates_its_sessions_without_auto_create(tmp_path):
+    interpreter, created = _interpreter(tmp_path, auto_create=False)
+    interpreter._sessions["main"] = SimpleNamespace()
+
+    result = interpreter.fork_session(
+        ForkSessionAction(type="forkSession", session_name="main", session_names=["a", "b"])
+    )
+
+    assert result["status"] == "success"
+    assert result["content"][0]["json"]["failed"] == 0
+    assert sorted(created) == ["a", "b"]
+    # Without explicit paths only variables are copied
+    assert interpreter.checkpointed_paths == []
@@ -0,0 +1,200 @@
+from typing import Any, Dict, List
+
+from strands_sandbox.code_interpreter import CodeInterpreter
+from strands_sandbox.models import LanguageType
+
+
+class StubCodeInterpreter(CodeInterpreter):
+    """Code Interpreter answering from memory: executeCode echoes its code, "fail" fails"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.validators = {}
+        self.calls: List[Any] = []
+
+    def start_platform(self) -> None:
+        pass
+
+    def cleanup_platform(self) -> None:
+        pass
+
+    def get_supported_languages(self) -> List[LanguageType]:
+        return [LanguageType.PYTHON]
+
+    def execute_code(self, action: Any) -> Dict[str, Any]:
+        self.calls.append(action)
+        if action.code == "fail":
+            return {"status": "error", "content": [{"text": "failed"}]}
+        return {
+            "status": "success",
+            "content": [{"text": action.code}, {"json": {"call": len(self.calls), "items": ["a", "b"]}}],
+        }
+
+    def init_session(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"text": "session"}]}
+
+    def execute_command(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"text": action.command}]}
+
+    def read_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"json": {"files": []}}]}
+
+    def list_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"json": {"files": []}}]}
+
+    def remove_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"text": "removed"}]}
+
+    def write_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"text": "written"}]}
+
+    def list_local_sessions(self) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"json": {"sessions": []}}]}
+
+
+def _code(code: str, **fields: Any) -> Dict[str, Any]:
+    return {"type": "executeCode", "code": code, "language": "python", **fields}
+
+
+def _run(interpreter: CodeInterpreter, **payload: Any) -> Dict[str, Any]:
+    return interpreter.code_interpreter(payload)
+
+
+def _steps(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return result["content"][1]["json"]["steps"]
+
+
+def test_batch_runs_steps_in_order():
+    interpreter = StubCodeInterpreter()
+
+    result = _run(interpreter, actions=[_code("one"), _code("two")])
+
+    assert result["status"] == "success"
+    assert result["content"][0]["text"] == "Batch completed: 2 of 2 step(s) succeeded"
+    assert [step["content"][0]["text"] for step in _steps(result)] == ["one", "two"]
+    assert [call.code for call in interpreter.calls] == ["one", "two"]
+
+
+def test_batch_resolves_references_to_earlier_steps():
+    interpreter = StubCodeInterpreter()
+
+    result = _run(
+        interpreter,
+        actions=[
+            _code("first"),
+            _code("after {{steps.0.content.0.text}} / {{ steps.0.content.1.json.items.1 }}"),
+            _code("{{steps.0.content.1.json}}"),
+        ],
+    )
+
+    assert result["status"] == "success"
+    assert interpreter.calls[1].code == "after first / b"
+    # Non-string values are substituted as JSON
+    assert interpreter.calls[2].code == '{"call": 1, "items": ["a", "b"]}'
+
+
+def test_batch_rejects_forward_and_out_of_range_references():
+    interpreter = StubCodeInterpreter()
+
+    result = _run(
+        interpreter,
+        actions=[_code("{{steps.1.content.0.text}}"), _code("{{steps.5.content.0.text}}")],
+        stop_on_error=False,
+    )
+
+    steps = _steps(result)
+    assert result["status"] == "error"
+    assert all(step["status"] == "error" for step in steps)
+    assert "has not completed successfully" in steps[0]["content"][0]["text"]
+    assert interpreter.calls == []
+
+
+def test_batch_rejects_reference_paths_missing_from_the_result():
+    interpreter = StubCodeInterpreter()
+
+    result = _run(interpreter, actions=[_code("one"), _code("{{steps.0.content.7.text}}")])
+
+    assert _steps(result)[1]["status"] == "error"
+    assert "does not match the result of step 0" in _steps(result)[1]["content"][0]["text"]
+
+
+def test_batch_stops_on_error_by_default():
+    interpreter = StubCodeInterpreter()
+
+    result = _run(interpreter, actions=[_code("fail"), _code("two")])
+
+    assert result["status"] == "error"
+    assert [step["status"] for step in _steps(result)] == ["error", "skipped"]
+    assert [call.code for call in interpreter.calls] == ["fail"]
+
+
+def test_batch_continues_after_errors_when_asked():
+    interpreter = StubCodeInterpreter()
+
+    result = _run(interpreter, actions=[_code("fail"), _code("two")], stop_on_error=False)
+
+    assert result["status"] == "error"
+    assert result["content"][0]["text"] == "Batch completed: 1 of 2 step(s) succeeded"
+    assert [step["status"] for step in _steps(result)] == ["error", "success"]
+
+
+def test_batch_references_to_failed_steps_are_errors():
+    interpreter = StubCodeInterpreter()
+
+    result = _run(interpreter, actions=[_code("fail"), _code("{{steps.0.content.0.text}}")], stop_on_error=False)
+
+    assert [step["status"] for step in _steps(result)] == ["error", "error"]
+    assert [call.code for call in interpreter.calls] == ["fail"]
+
+
+def test_idempotency_key_replays_the_stored_result():
+    interpreter = StubCodeInterpreter()
+
+    first = _run(interpreter, action=_code("one", idempotency_key="k"))
+    second = _run(interpreter, action=_code("one", idempotency_key="k"))
+
+    assert second == first
+    assert len(interpreter.calls) == 1
+
+
+def test_replayed_results_are_copies():
+    interpreter = StubCodeInterpreter()
+
+    first = _run(interpreter, action=_code("one", idempotency_key="k"))
+    first["content"][0]["text"] = "changed by the caller"
+    second = _run(interpreter, action=_code("one", idempotency_key="k"))
+    second["content"].clear()
+    third = _run(interpreter, action=_code("one", idempotency_key="k"))
+
+    assert third["content"][0]["text"] == "one"
+    assert len(interpreter.calls) == 1
+
+
+def test_failed_results_are_not_stored():
+    interpreter = StubCodeInterpreter()
+
+    _run(interpreter, action=_code("fail", idempotency_key="k"))
+    _run(interpreter, action=_code("fail", idempotency_key="k"))
+
+    assert len(interpreter.calls) == 2
+
+
+def test_idempotency_keys_are_scoped_per_session():
+    interpreter = StubCodeInterpreter()
+
+    _run(interpreter, action=_code("one", idempotency_key="k", session_name="a"))
+    _run(interpreter, action=_code("one", idempotency_key="k", session_name="b"))
+
+    assert len(interpreter.calls) == 2
+
+
+def test_oldest_idempotency_keys_are_evicted():
+    interpreter = StubCodeInterpreter()
+
+    for index in range(interpreter.idempotency_limit + 1):
+        _run(interpreter, action=_code("one", idempotency_key=f"k{index}"))
+    _run(interpreter, action=_code("one", idempotency_key="k1"))
+    assert len(interpreter.calls) == interpreter.idempotency_limit + 1
+
+    _run(interpreter, action=_code("one", idempotency_key="k0"))
+    assert len(interpreter.calls) == interpreter.idempotency_limit + 2
@@ -0,0 +1,134 @@
+import os
+import stat
+from typing import Any, Dict, List
+
+import pytest
+
+from strands_sandbox.code_interpreter import CodeInterpreter
+from strands_sandbox.daemon import DaemonCodeInterpreter, SandboxDaemon
+from strands_sandbox.models import LanguageType
+
+
+class EchoBackend(CodeInterpreter):
+    """In-memory backend echoing what it receives"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.validators = {}
+        self.received: List[Any] = []
+
+    def start_platform(self) -> None:
+        pass
+
+    def cleanup_platform(self) -> None:
+        pass
+
+    def get_supported_languages(self) -> List[LanguageType]:
+        return [LanguageType.PYTHON, LanguageType.BASH]
+
+    def execute_code(self, action: Any) -> Dict[str, Any]:
+        self.received.append(action)
+        return {"status": "success", "content": [{"text": f"{action.session_name}: {action.code}"}]}
+
+    def execute_command(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"text": action.command}]}
+
+    def init_session(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"text": "session"}]}
+
+    def read_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"json": {"files": []}}]}
+
+    def list_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"json": {"files": []}}]}
+
+    def remove_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"text": "removed"}]}
+
+    def write_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"text": "written"}]}
+
+    def list_local_sessions(self) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"json": {"sessions": []}}]}
+
+
+@pytest.fixture
+def unix_daemon(tmp_path):
+    backend = EchoBackend()
+    daemon = SandboxDaemon(backend, socket_path=str(tmp_path / "daemon.sock"))
+    daemon.start()
+    yield daemon, backend
+    daemon.shutdown()
+
+
+def _code(code: str, **fields: Any) -> Dict[str, Any]:
+    return {"action": {"type": "executeCode", "code": code, "language": "python", **fields}}
+
+
+def test_unix_socket_is_owner_only(unix_daemon):
+    daemon, _ = unix_daemon
+
+    assert stat.S_IMODE(os.stat(daemon.socket_path).st_mode) == 0o600
+
+
+def test_client_forwards_actions_with_a_private_default_session(unix_daemon):
+    daemon, backend = unix_daemon
+    client = DaemonCodeInterpreter(daemon.address)
+
+    result = client.code_interpreter(_code("1 + 1"))
+
+    assert result == {"status": "success", "content": [{"text": f"{client.default_session}: 1 + 1"}]}
+    assert client.get_supported_languages() == [LanguageType.PYTHON, LanguageType.BASH]
+
+
+def test_bytes_inputs_arrive_as_bytes(unix_daemon):
+    daemon, backend = unix_daemon
+    client = DaemonCodeInterpreter(daemon.address)
+    inputs = {"blob": b"\xff\x00", "text": "\xff", "tagged": {"$bytes": "AA=="}}
+
+    client.code_interpreter(_code("x", inputs=inputs))
+
+    assert backend.received[0].inputs == inputs
+
+
+def test_batches_are_forwarded_in_one_request(unix_daemon):
+    daemon, backend = unix_daemon
+    client = DaemonCodeInterpreter(daemon.address)
+
+    result = client.code_interpreter({"actions": [_code("a")["action"], _code("b")["action"]]})
+
+    assert result["status"] == "success"
+    assert [action.code for action in backend.received] == ["a", "b"]
+
+
+def test_sync_files_is_refused(unix_daemon, tmp_path):
+    daemon, _ = unix_daemon
+    client = DaemonCodeInterpreter(daemon.address)
+
+    result = client.code_interpreter({"action": {"type": "syncFiles", "local_path": str(tmp_path)}})
+
+    assert result["status"] == "error"
+    assert "not available through the sandbox daemon" in result["content"][0]["text"]
+
+
+def test_tcp_requires_a_token(monkeypatch):
+    monkeypatch.delenv("STRANDS_SANDBOX_DAEMON_TOKEN", raising=False)
+
+    with pytest.raises(ValueError):
+        SandboxDaemon(EchoBackend())
+
+
+def test_tcp_rejects_wrong_tokens(monkeypatch):
+    monkeypatch.delenv("STRANDS_SANDBOX_DAEMON_TOKEN", raising=False)
+    daemon = SandboxDaemon(EchoBackend(), token="secret")
+    daemon.start()
+    try:
+        good = DaemonCodeInterpreter(daemon.address, token="secret")
+        bad = DaemonCodeInterpreter(daemon.address, token="wrong", languages=[LanguageType.PYTHON])
+
+        assert good.code_interpreter(_code("1"))["status"] == "success"
+        rejected = bad.code_interpreter(_code("1"))
+        assert rejected["status"] == "error"
+        assert rejected["content"][0]["text"] == "Missing or invalid daemon token"
+    finally:
+        daemon.shutdown()
@@ -0,0 +1,45 @@
+from e2b_code_interpreter.models import Execution, ExecutionError as E2BExecutionError, Logs, Result
+
+from strands_sandbox.e2bcodeinterpreter import E2BCodeInterpreter
+from strands_sandbox.models import ExecutionResult
+
+
+def _fill(execution: Execution) -> ExecutionResult:
+    result = ExecutionResult(kind="code")
+    E2BCodeInterpreter._fill_result(result, execution)
+    return result
+
+
+def test_standard_formats_are_copied():
+    execution = Execution(
+        results=[Result(text="<Figure>", png="iVBORw0KGgo=", is_main_result=True)],
+        logs=Logs(stdout=["hello\n"], stderr=[]),
+    )
+
+    result = _fill(execution)
+
+    assert result.results == [{"text": "<Figure>", "png": "iVBORw0KGgo="}]
+    assert result.stdout == ["hello\n"]
+    assert result.success
+
+
+def test_extra_mime_types_are_merged():
+    figure = {"data": [{"type": "bar", "y": [1, 2]}], "layout": {}}
+    execution = Execution(
+        results=[Result(text="Figure()", extra={"application/vnd.plotly.v1+json": figure})],
+        logs=Logs(),
+    )
+
+    result = _fill(execution)
+
+    assert result.results == [{"text": "Figure()", "application/vnd.plotly.v1+json": figure}]
+    assert result.success
+
+
+def test_error_is_copied():
+    execution = Execution(logs=Logs(), error=E2BExecutionError("NameError", "name 'x' is not defined", "tb"))
+
+    result = _fill(execution)
+
+    assert result.error.name == "NameError"
+    assert not result.success
@@ -0,0 +1,188 @@
+import base64
+import contextlib
+import io
+from types import SimpleNamespace
+
+from strands_sandbox.e2bcodeinterpreter import E2BCodeInterpreter
+from strands_sandbox.models import ListFilesAction, ReadFilesAction, RemoveFilesAction
+
+
+def _interpreter(**options):
+    """Interpreter whose session runs helper code in a local namespace, reporting exceptions like the kernel"""
+    interpreter = E2BCodeInterpreter(api_key="test", **options)
+    interpreter._sessions["main"] = SimpleNamespace(sandbox_id="sbx-local")
+    namespace = {}
+
+    def run_code(session_name, code, **kwargs):
+        stdout = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(stdout):
+                exec(code, namespace)
+        except Exception as e:
+            return SimpleNamespace(error=SimpleNamespace(value=str(e)), logs=None)
+        return SimpleNamespace(error=None, logs=SimpleNamespace(stdout=[stdout.getvalue()]))
+
+    interpreter._run_code = run_code
+    return interpreter
+
+
+def _tree(root):
+    for rel in ("b.txt", "a/one.py", "a/deep/two.py", "c/three.txt"):
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel)
+
+
+def _list(interpreter, root, **fields):
+    return interpreter.list_files(ListFilesAction(type="listFiles", session_name="main", path=str(root), **fields))
+
+
+def test_list_is_recursive_with_metadata_and_depth_limit(tmp_path):
+    _tree(tmp_path)
+    interpreter = _interpreter()
+
+    listing = _list(interpreter, tmp_path, recursive=True)["content"][0]["json"]
+    names = [entry["name"] for entry in listing["files"]]
+    shallow = _list(interpreter, tmp_path, recursive=True, max_depth=1)["content"][0]["json"]
+
+    # Each directory's entries come before those of its subdirectories
+    assert names == ["a", "b.txt", "c", "a/deep", "a/one.py", "a/deep/two.py", "c/three.txt"]
+    assert listing["nextCursor"] is None
+    entry = listing["files"][names.index("b.txt")]
+    assert entry["type"] == "file" and entry["size"] == 5 and entry["mode"].startswith("-")
+    assert [entry["name"] for entry in shallow["files"]] == ["a", "b.txt", "c"]
+
+
+def test_list_pages_follow_the_cursor(tmp_path):
+    _tree(tmp_path)
+    interpreter = _interpreter()
+    full = _list(interpreter, tmp_path, recursive=True)["content"][0]["json"]["files"]
+
+    pages, cursor = [], None
+    while True:
+        page = _list(interpreter, tmp_path, recursive=True, limit=3, cursor=cursor)["content"][0]["json"]
+        pages.append(page["files"])
+        cursor = page["nextCursor"]
+        if cursor is None:
+            break
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [entry for page in pages for entry in page] == full
+
+
+def test_list_filters_by_pattern(tmp_path):
+    _tree(tmp_path)
+
+    listing = _list(_interpreter(), tmp_path, recursive=True, pattern="*.py")["content"][0]["json"]
+
+    assert [entry["name"] for entry in listing["files"]] == ["a/one.py", "a/deep/two.py"]
+
+
+def test_list_rejects_bad_cursors_and_missing_directories(tmp_path):
+    interpreter = _interpreter()
+
+    bad_cursor = _list(interpreter, tmp_path, cursor="page-2")
+    missing = _list(interpreter, tmp_path / "missing")
+
+    assert bad_cursor["status"] == "error"
+    assert bad_cursor["content"][0]["text"] == "Invalid cursor: page-2"
+    assert missing["status"] == "error"
+    assert missing["content"][0]["text"].startswith("Failed to list files")
+
+
+def _remove(interpreter, paths, **fields):
+    return interpreter.remove_files(RemoveFilesAction(type="removeFiles", session_name="main", paths=paths, **fields))
+
+
+def test_remove_expands_globs_and_reports_each_path(tmp_path):
+    _tree(tmp_path)
+
+    result = _remove(_interpreter(), [str(tmp_path / "a" / "*.py"), str(tmp_path / "b.txt")])
+
+    assert result["status"] == "success"
+    assert result["content"][0]["text"] == "Removed 2 path(s), 0 failed"
+    assert result["content"][1]["json"]["results"] == [
+        {"path": str(tmp_path / "a" / "one.py"), "status": "removed"},
+        {"path": str(tmp_path / "b.txt"), "status": "removed"},
+    ]
+    assert (tmp_path / "a" / "deep" / "two.py").exists()
+
+
+def test_remove_reports_failures_per_path(tmp_path):
+    _tree(tmp_path)
+
+    result = _remove(_interpreter(), [str(tmp_path / "c"), str(tmp_path / "*.md"), str(tmp_path / "b.txt")])
+
+    results = {entry["path"]: entry for entry in result["content"][1]["json"]["results"]}
+    assert result["status"] == "error"
+    assert result["content"][0]["text"] == "Removed 1 path(s), 2 failed"
+    assert "set recursive" in results[str(tmp_path / "c")]["error"]
+    assert results[str(tmp_path / "*.md")]["error"] == "No files matched"
+    assert results[str(tmp_path / "b.txt")]["status"] == "removed"
+
+
+def test_remove_deletes_directories_when_recursive(tmp_path):
+    _tree(tmp_path)
+
+    result = _remove(_interpreter(), [str(tmp_path / "a")], recursive=True)
+
+    assert result["status"] == "success"
+    assert not (tmp_path / "a").exists()
+
+
+LINES = "".join(f"line {number}\n" for number in range(1, 11))
+
+
+def _read(interpreter, path, **fields):
+    result = interpreter.read_files(ReadFilesAction(type="readFiles", session_name="main", paths=[str(path)], **fields))
+    return result["content"][0]["json"]["files"][0]
+
+
+def test_read_returns_byte_ranges(tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_text(LINES)
+
+    entry = _read(_interpreter(), path, offset=7, length=6)
+
+    assert entry["content"] == "line 2"
+    assert (entry["offset"], entry["bytes"], entry["size"], entry["truncated"]) == (7, 6, len(LINES), False)
+
+
+def test_read_returns_line_ranges_and_tails(tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_text(LINES)
+    interpreter = _interpreter()
+
+    lines = _read(interpreter, path, start_line=2, end_line=3)
+    tail = _read(interpreter, path, tail_lines=2)
+
+    assert lines["content"] == "line 2\nline 3\n"
+    assert lines["offset"] == len("line 1\n")
+    assert tail["content"] == "line 9\nline 10\n"
+    assert tail["offset"] == len(LINES) - len("line 9\nline 10\n")
+
+
+def test_read_marks_truncated_content(tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_text(LINES)
+    interpreter = _interpreter()
+
+    head = _read(interpreter, path, max_bytes=6)
+    tail = _read(interpreter, path, tail_lines=3, max_bytes=8)
+
+    assert head["truncated"] is True
+    assert head["content"] == f"line 1\n[... truncated: 6 of {len(LINES)} bytes shown]"
+    # A truncated tail keeps its last bytes and puts the marker first
+    assert tail["truncated"] is True
+    assert tail["content"] == f"[... truncated: 8 of {len(LINES)} bytes shown]\nline 10\n"
+
+
+def test_read_returns_binary_content_through_compression(tmp_path):
+    path = tmp_path / "blob.bin"
+    data = bytes(range(256)) * 64
+    path.write_bytes(data)
+
+    entry = _read(_interpreter(compression_threshold=1024), path, binary=True, max_bytes=len(data))
+
+    assert entry["encoding"] == "base64"
+    assert base64.b64decode(entry["content"]) == data
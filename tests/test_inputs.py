@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+from strands_sandbox import e2bcodeinterpreter
+from strands_sandbox.e2bcodeinterpreter import E2BCodeInterpreter
+
+INPUTS = {
+    "blob": b"\x00\xffdata",
+    "record": {"$bytes": "not base64", "$$price": 3, "nested": [b"x", {"$ref": "y"}]},
+    "text": "héllo",
+}
+
+
+class LocalFiles:
+    """Stands in for the sandbox file API, writing to the local filesystem"""
+
+    def __init__(self):
+        self.writes = []
+
+    def write(self, path, data, gzip=False):
+        self.writes.append(path)
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+def _interpreter(files):
+    interpreter = E2BCodeInterpreter(api_key="test")
+    interpreter._sessions["main"] = SimpleNamespace(files=files)
+    return interpreter
+
+
+def _run(line):
+    namespace = {}
+    exec(line, namespace)
+    namespace.pop("__builtins__")
+    return namespace
+
+
+def test_inputs_are_embedded_in_a_single_loader_line():
+    files = LocalFiles()
+    interpreter = _interpreter(files)
+
+    line, size = interpreter._inputs_loader("main", INPUTS)
+
+    assert "\n" not in line
+    assert files.writes == []
+    assert _run(line) == INPUTS
+    assert interpreter._stats["main"].bytes_in == size
+    assert interpreter._stats["main"].executions == 0
+
+
+def test_large_inputs_are_read_from_an_uploaded_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(e2bcodeinterpreter, "_DATA_TRANSFER_DIR", str(tmp_path))
+    monkeypatch.setattr(e2bcodeinterpreter, "_INPUTS_INLINE_LIMIT", 16)
+    files = LocalFiles()
+    interpreter = _interpreter(files)
+
+    line, _ = interpreter._inputs_loader("main", INPUTS)
+
+    assert len(files.writes) == 1
+    assert _run(line) == INPUTS
+    assert list(tmp_path.iterdir()) == []
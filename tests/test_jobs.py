@@ -0,0 +1,40 @@
+from strands_sandbox import e2bcodeinterpreter
+from strands_sandbox.e2bcodeinterpreter import _Job
+
+
+def test_job_output_is_read_incrementally():
+    job = _Job(job_id="job-1", kind="code")
+    job.append("hello ")
+    job.append("world\n")
+
+    assert job.read(0) == ("hello world\n", 12, 0)
+    assert job.read(6) == ("world\n", 12, 0)
+    assert job.read(12) == ("", 12, 0)
+
+
+def test_job_output_keeps_only_the_most_recent_characters(monkeypatch):
+    monkeypatch.setattr(e2bcodeinterpreter, "_JOB_OUTPUT_LIMIT", 10)
+    job = _Job(job_id="job-1", kind="code")
+    for chunk in ("0123", "4567", "89ab", "cdef"):
+        job.append(chunk)
+
+    assert job.retained == 10
+    assert job.read(0) == ("6789abcdef", 16, 6)
+    assert job.read(8) == ("89abcdef", 16, 0)
+
+
+def test_oversized_chunk_is_cut_to_the_limit(monkeypatch):
+    monkeypatch.setattr(e2bcodeinterpreter, "_JOB_OUTPUT_LIMIT", 4)
+    job = _Job(job_id="job-1", kind="command")
+    job.append("abcdefgh")
+
+    assert job.read(0) == ("efgh", 8, 4)
+
+
+def test_cancelled_job_keeps_its_status():
+    job = _Job(job_id="job-1", kind="command")
+    job.status = "cancelled"
+    job.finish("completed", exit_code=0)
+
+    assert job.status == "cancelled"
+    assert job.finished_at is not None
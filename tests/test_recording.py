@@ -0,0 +1,119 @@
+import gzip
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from strands_sandbox.code_interpreter import CodeInterpreter
+from strands_sandbox.models import ExecuteCodeAction, LanguageType, decode_json_value, dump_action
+from strands_sandbox.recording import RecordingCodeInterpreter, ReplayCodeInterpreter
+
+
+class ObservedBackend(CodeInterpreter):
+    """In-memory backend reporting the code it runs through code_observer, like E2BCodeInterpreter"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.validators = {}
+        self.code_observer = None
+        self.runs = 0
+
+    def start_platform(self) -> None:
+        pass
+
+    def cleanup_platform(self) -> None:
+        pass
+
+    def get_supported_languages(self) -> List[LanguageType]:
+        return [LanguageType.PYTHON]
+
+    def _observe(self, session_name: Optional[str], code: str) -> None:
+        if self.code_observer is not None:
+            self.code_observer(session_name or "default", code, None)
+
+    def execute_code(self, action: Any) -> Dict[str, Any]:
+        self.runs += 1
+        self._observe(action.session_name, f"_inputs = {sorted(action.inputs)}")
+        self._observe(action.session_name, action.code)
+        return {"status": "success", "content": [{"text": f"{action.code} -> {self.runs}"}]}
+
+    def execute_command(self, action: Any) -> Dict[str, Any]:
+        # Code run off the dispatching thread is not attributed to the action
+        worker = threading.Thread(target=self._observe, args=(action.session_name, "background"))
+        worker.start()
+        worker.join()
+        return {"status": "success", "content": [{"text": action.command}]}
+
+    def init_session(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"text": "session"}]}
+
+    def read_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"json": {"files": []}}]}
+
+    def list_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"json": {"files": []}}]}
+
+    def remove_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"text": "removed"}]}
+
+    def write_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"text": "written"}]}
+
+    def list_local_sessions(self) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"json": {"sessions": []}}]}
+
+
+def _code(code: str, **fields: Any) -> Dict[str, Any]:
+    return {"action": {"type": "executeCode", "code": code, "language": "python", **fields}}
+
+
+def _entries(path: Any) -> List[Dict[str, Any]]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f][1:]
+
+
+def test_record_then_replay_returns_recorded_results(tmp_path):
+    path = tmp_path / "session.jsonl.gz"
+    recorder = RecordingCodeInterpreter(ObservedBackend(), str(path))
+    live = [recorder.code_interpreter(_code("a")), recorder.code_interpreter(_code("a"))]
+    recorder._cleanup()
+
+    replay = ReplayCodeInterpreter(str(path))
+
+    assert [replay.code_interpreter(_code("a")), replay.code_interpreter(_code("a"))] == live
+    assert replay.remaining() == 0
+    assert replay.code_interpreter(_code("a"))["status"] == "error"
+
+
+def test_generated_code_is_recorded_per_action(tmp_path):
+    path = tmp_path / "session.jsonl.gz"
+    recorder = RecordingCodeInterpreter(ObservedBackend(), str(path))
+    recorder.code_interpreter(_code("print(1)", session_name="s"))
+    recorder.code_interpreter({"action": {"type": "executeCommand", "command": "ls"}})
+    recorder._cleanup()
+
+    code_entry, command_entry = _entries(path)
+    assert [item["code"] for item in code_entry["generatedCode"]] == ["_inputs = []", "print(1)"]
+    assert code_entry["generatedCode"][1]["sessionName"] == "s"
+    assert "generatedCode" not in command_entry
+
+
+def test_bytes_inputs_replay_distinct_from_strings(tmp_path):
+    path = tmp_path / "session.jsonl.gz"
+    recorder = RecordingCodeInterpreter(ObservedBackend(), str(path))
+    as_bytes = recorder.code_interpreter(_code("x", inputs={"blob": b"\xff\x00abc"}))
+    as_text = recorder.code_interpreter(_code("x", inputs={"blob": "/wBhYmM="}))
+    recorder._cleanup()
+
+    replay = ReplayCodeInterpreter(str(path))
+
+    assert replay.code_interpreter(_code("x", inputs={"blob": "/wBhYmM="})) == as_text
+    assert replay.code_interpreter(_code("x", inputs={"blob": b"\xff\x00abc"})) == as_bytes
+
+
+def test_dump_action_round_trips_bytes_and_tag_like_dicts():
+    inputs = {"blob": b"\x00\xff", "tagged": {"$bytes": "not bytes"}, "nested": [{"$$x": 1}]}
+    action = ExecuteCodeAction(type="executeCode", code="x", inputs=inputs)
+
+    dumped = json.loads(json.dumps(dump_action(action)))
+
+    assert decode_json_value(dumped)["inputs"] == inputs
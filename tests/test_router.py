@@ -0,0 +1,158 @@
+import time
+from typing import Any, Dict, List
+
+from strands_sandbox.code_interpreter import CodeInterpreter
+from strands_sandbox.models import LanguageType
+from strands_sandbox.router import RouterCodeInterpreter
+
+
+class StubBackend(CodeInterpreter):
+    """In-memory backend holding named sessions; executeCode sleeps for the number of seconds in its code"""
+
+    def __init__(self, languages=(LanguageType.PYTHON,), init_delay: float = 0.0) -> None:
+        self.languages = list(languages)
+        super().__init__()
+        self.validators = {}
+        self.init_delay = init_delay
+        self.fail_init = False
+        self.sessions: List[str] = []
+        self.calls: List[Any] = []
+
+    def start_platform(self) -> None:
+        pass
+
+    def cleanup_platform(self) -> None:
+        self.sessions.clear()
+
+    def get_supported_languages(self) -> List[LanguageType]:
+        return self.languages
+
+    def _missing(self, session_name: str) -> Dict[str, Any]:
+        return {"status": "error", "content": [{"text": f"Session '{session_name}' not found"}]}
+
+    def init_session(self, action: Any) -> Dict[str, Any]:
+        time.sleep(self.init_delay)
+        if self.fail_init:
+            return {"status": "error", "content": [{"text": "backend unavailable"}]}
+        self.sessions.append(action.session_name)
+        return {"status": "success", "content": [{"json": {"sessionName": action.session_name}}]}
+
+    def execute_code(self, action: Any) -> Dict[str, Any]:
+        self.calls.append(action)
+        if action.session_name not in self.sessions:
+            return self._missing(action.session_name)
+        time.sleep(float(action.code))
+        return {"status": "success", "content": [{"text": action.code}]}
+
+    def execute_command(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"text": action.command}]}
+
+    def read_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"json": {"files": []}}]}
+
+    def list_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"json": {"files": []}}]}
+
+    def remove_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"text": "removed"}]}
+
+    def write_files(self, action: Any) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"text": "written"}]}
+
+    def list_local_sessions(self) -> Dict[str, Any]:
+        return {"status": "success", "content": [{"json": {"sessions": [{"sessionName": s} for s in self.sessions]}}]}
+
+
+def _code(router: RouterCodeInterpreter, session_name: str, code: str = "0", **fields: Any) -> Dict[str, Any]:
+    return router.code_interpreter(
+        {"action": {"type": "executeCode", "session_name": session_name, "code": code, "language": "python", **fields}}
+    )
+
+
+def _init(router: RouterCodeInterpreter, session_name: str) -> Dict[str, Any]:
+    return router.code_interpreter(
+        {"action": {"type": "initSession", "session_name": session_name, "description": "test"}}
+    )
+
+
+def test_sessions_are_pinned_to_their_backend():
+    first, second = StubBackend(), StubBackend()
+    router = RouterCodeInterpreter([first, second])
+
+    assert _code(router, "a")["status"] == "success"
+    assert _code(router, "a")["status"] == "success"
+
+    assert first.sessions == ["a"]
+    assert len(first.calls) == 2 and second.calls == []
+
+
+def test_placement_respects_language_support():
+    python, javascript = StubBackend(), StubBackend(languages=[LanguageType.JAVASCRIPT])
+    router = RouterCodeInterpreter([javascript, python])
+
+    _code(router, "a")
+
+    assert python.sessions == ["a"] and javascript.sessions == []
+
+
+def test_full_backend_spills_over():
+    first, second = StubBackend(), StubBackend()
+    router = RouterCodeInterpreter([first, second], max_sessions=[1, None])
+
+    _init(router, "a")
+    _init(router, "b")
+
+    assert first.sessions == ["a"] and second.sessions == ["b"]
+
+
+def test_failed_placement_fails_over_and_degrades_backend():
+    first, second = StubBackend(), StubBackend()
+    first.fail_init = True
+    router = RouterCodeInterpreter([first, second], failure_threshold=2, cooldown=60)
+
+    assert _init(router, "a")["status"] == "success"
+    assert _init(router, "b")["status"] == "success"
+    assert second.sessions == ["a", "b"]
+
+    stats = router.backend_stats()
+    assert not stats[0]["healthy"] and stats[1]["healthy"]
+
+
+def test_existing_session_actions_do_not_place_sessions():
+    backend = StubBackend()
+    router = RouterCodeInterpreter([backend])
+
+    result = router.code_interpreter({"action": {"type": "getJob", "session_name": "a", "job_id": "job-1"}})
+
+    assert result["content"][0]["text"] == "Session 'a' not found"
+    assert backend.sessions == []
+
+
+def test_latency_only_measures_session_creation():
+    slow_init, fast_init = StubBackend(init_delay=0.05), StubBackend()
+    router = RouterCodeInterpreter([fast_init, slow_init], max_sessions=[1, 1])
+
+    _code(router, "a", code="0.2")
+    _code(router, "b")
+
+    stats = router.backend_stats()
+    assert stats[0]["latencySeconds"] < 0.05
+    assert stats[1]["latencySeconds"] >= 0.05
+
+
+def test_ended_sessions_free_capacity():
+    backend = StubBackend()
+    router = RouterCodeInterpreter([backend], max_sessions=[1])
+
+    _init(router, "a")
+    assert router.backend_stats()[0]["sessions"] == 1
+
+    # The backend lost the session (e.g. it was restarted); the next call unpins it
+    backend.sessions.clear()
+    assert _code(router, "a")["status"] == "error"
+    assert router.backend_stats()[0]["sessions"] == 0
+
+    _init(router, "b")
+    backend.sessions.clear()
+    router.code_interpreter({"action": {"type": "listLocalSessions"}})
+    assert router.backend_stats()[0]["sessions"] == 0
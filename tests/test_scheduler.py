@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from strands_sandbox.scheduler import Priority, SandboxScheduler, SchedulerTimeoutError
+
+
+def _queue_waiter(scheduler, order, label, tenant, priority):
+    """Start a thread waiting for a sandbox slot and return once it is queued"""
+    queued = scheduler._sandboxes.queued()
+
+    def wait():
+        scheduler.acquire_sandbox(tenant, priority, timeout=5)
+        order.append(label)
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    while scheduler._sandboxes.queued() == queued:
+        time.sleep(0.001)
+    return thread
+
+
+def _drain(scheduler, threads, order):
+    for expected in range(1, len(threads) + 1):
+        scheduler.release_sandbox()
+        while len(order) < expected:
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+
+
+def test_acquire_and_release():
+    scheduler = SandboxScheduler(max_sandboxes=2)
+    scheduler.acquire_sandbox()
+    scheduler.acquire_sandbox()
+    assert scheduler.stats()["sandboxes"]["inUse"] == 2
+
+    scheduler.release_sandbox()
+    assert scheduler.stats()["sandboxes"]["inUse"] == 1
+
+
+def test_interactive_served_before_batch():
+    scheduler = SandboxScheduler(max_sandboxes=1)
+    scheduler.acquire_sandbox()
+    order = []
+    threads = [
+        _queue_waiter(scheduler, order, "batch", "a", Priority.BATCH),
+        _queue_waiter(scheduler, order, "interactive", "b", Priority.INTERACTIVE),
+    ]
+
+    _drain(scheduler, threads, order)
+
+    assert order == ["interactive", "batch"]
+
+
+def test_tenants_served_round_robin():
+    scheduler = SandboxScheduler(max_sandboxes=1)
+    scheduler.acquire_sandbox()
+    order = []
+    threads = [
+        _queue_waiter(scheduler, order, label, label[0], Priority.INTERACTIVE) for label in ("a1", "a2", "a3", "b1")
+    ]
+
+    _drain(scheduler, threads, order)
+
+    assert order == ["a1", "b1", "a2", "a3"]
+
+
+def test_timeout_leaves_no_ticket_behind():
+    scheduler = SandboxScheduler(max_sandboxes=1, max_wait=0.05)
+    scheduler.acquire_sandbox()
+
+    with pytest.raises(SchedulerTimeoutError):
+        scheduler.acquire_sandbox()
+
+    stats = scheduler.stats()
+    assert stats["sandboxes"]["queued"] == 0
+    assert stats["counters"]["rejected.sandbox"] == 1
+    # The released slot goes to the next caller, not to the abandoned request
+    scheduler.release_sandbox()
+    scheduler.acquire_sandbox()
+    assert scheduler.stats()["sandboxes"]["inUse"] == 1
+
+
+def test_lapsed_lease_frees_capacity():
+    scheduler = SandboxScheduler(max_sandboxes=1, max_wait=2)
+    lease = scheduler.acquire_sandbox(lifetime=0.05)
+
+    start = time.perf_counter()
+    scheduler.acquire_sandbox()
+    assert time.perf_counter() - start < 1
+
+    # Releasing the lapsed lease must not free the slot taken since
+    scheduler.release_sandbox(lease)
+    assert scheduler.stats()["sandboxes"]["inUse"] == 1
+
+
+def test_execution_slot_released_on_error():
+    scheduler = SandboxScheduler(max_executions=1, max_wait=0.05)
+
+    with pytest.raises(RuntimeError):
+        with scheduler.execution():
+            raise RuntimeError("boom")
+
+    with scheduler.execution():
+        assert scheduler.stats()["executions"]["inUse"] == 1
+    assert scheduler.stats()["executions"]["inUse"] == 0
@@ -0,0 +1,74 @@
+import threading
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from strands_sandbox.e2bcodeinterpreter import E2BCodeInterpreter
+
+
+class MetricsSandbox:
+    """Stands in for a sandbox, reporting one metrics sample after waiting for the other sandboxes' requests"""
+
+    def __init__(self, sandbox_id, barrier=None, fail=False):
+        self.sandbox_id = sandbox_id
+        self.barrier = barrier
+        self.fail = fail
+        self.starts = []
+
+    def get_metrics(self, start=None, end=None):
+        self.starts.append(start)
+        if self.barrier is not None:
+            self.barrier.wait(timeout=5)
+        if self.fail:
+            raise RuntimeError("metrics unavailable")
+        return [
+            SimpleNamespace(
+                cpu_count=2, cpu_used_pct=12.5, mem_used=256, mem_total=1024,
+                timestamp=datetime(2026, 1, 1, tzinfo=timezone.utc),
+            )
+        ]
+
+
+def _listing(interpreter):
+    return interpreter.list_local_sessions()["content"][0]["json"]
+
+
+def test_usage_is_accounted_per_session_and_totalled():
+    interpreter = E2BCodeInterpreter(api_key="test")
+    shared = MetricsSandbox("sbx-1")
+    interpreter._sessions.update({"a": shared, "b": shared, "c": MetricsSandbox("sbx-2", fail=True)})
+
+    interpreter._record_usage("a", seconds=1.25, bytes_in=10, bytes_out=100)
+    interpreter._record_usage("a", seconds=0.5, bytes_in=5)
+    interpreter._record_usage("b", bytes_in=7, executions=0)
+
+    listing = _listing(interpreter)
+    sessions = {info["sessionName"]: info for info in listing["sessions"]}
+
+    assert sessions["a"]["executions"] == 2
+    assert sessions["a"]["executionSeconds"] == 1.75
+    assert sessions["a"]["bytesIn"] == 15
+    assert sessions["b"]["executions"] == 0
+    assert sessions["c"]["lastUsed"] is None
+    assert sessions["c"]["resources"] is None
+    assert listing["totals"] == {"executions": 2, "executionSeconds": 1.75, "bytesIn": 22, "bytesOut": 100}
+    assert listing["totalSessions"] == 3
+    assert listing["totalSandboxes"] == 2
+
+
+def test_sandboxes_are_sampled_once_and_concurrently():
+    interpreter = E2BCodeInterpreter(api_key="test")
+    # Sequential sampling would time out on the barrier and break it
+    barrier = threading.Barrier(2)
+    first, second = MetricsSandbox("sbx-1", barrier), MetricsSandbox("sbx-2", barrier)
+    interpreter._sessions.update({"a": first, "b": first, "c": second})
+
+    sessions = _listing(interpreter)["sessions"]
+
+    assert not barrier.broken
+    assert len(first.starts) == len(second.starts) == 1
+    # Only recent metrics are requested
+    assert (datetime.now(timezone.utc) - first.starts[0]).total_seconds() < 120
+    assert sessions[0]["resources"] == {
+        "cpuCount": 2, "cpuUsedPct": 12.5, "memUsedBytes": 256, "memTotalBytes": 1024,
+        "sampledAt": datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp(),
+    }
@@ -0,0 +1,122 @@
+import contextlib
+import io
+import os
+from types import SimpleNamespace
+
+from strands_sandbox.e2bcodeinterpreter import E2BCodeInterpreter
+from strands_sandbox.models import SyncFilesAction
+
+
+class LocalSandbox:
+    """Stands in for a sandbox whose file system is the local one"""
+
+    sandbox_id = "sbx-local"
+
+    def __init__(self):
+        self.files = self
+        self.namespace = {}
+
+    def run_code(self, code):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            exec(code, self.namespace)
+        return SimpleNamespace(error=None, logs=SimpleNamespace(stdout=[stdout.getvalue()]))
+
+    def write_files(self, files, gzip=False):
+        for file in files:
+            os.makedirs(os.path.dirname(file["path"]), exist_ok=True)
+            with open(file["path"], "wb") as f:
+                f.write(file["data"])
+
+    def read(self, path, format="bytes", gzip=False):
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def _sync(tmp_path, **fields):
+    interpreter = E2BCodeInterpreter(api_key="test", sync_root=str(tmp_path / "local"))
+    sandbox = LocalSandbox()
+    interpreter._sessions["main"] = sandbox
+    interpreter._run_code = lambda session_name, code, **kwargs: sandbox.run_code(code)
+    action = SyncFilesAction(
+        type="syncFiles", session_name="main", local_path="project", remote_path=str(tmp_path / "remote"), **fields
+    )
+    return interpreter.sync_files(action)
+
+
+def test_upload_transfers_changed_files_and_deletes_stale_ones(tmp_path):
+    local, remote = tmp_path / "local" / "project", tmp_path / "remote"
+    _write(local / "same.txt", "same")
+    _write(local / "pkg" / "changed.py", "new")
+    _write(remote / "same.txt", "same")
+    _write(remote / "pkg" / "changed.py", "old")
+    _write(remote / "stale" / "gone.txt", "gone")
+
+    result = _sync(tmp_path)
+
+    summary = result["content"][0]["json"]
+    assert result["status"] == "success"
+    assert summary["transferred"] == ["pkg/changed.py"]
+    assert summary["deleted"] == ["stale/gone.txt"]
+    assert summary["unchanged"] == 1
+    assert (remote / "pkg" / "changed.py").read_text() == "new"
+    assert not (remote / "stale").exists()
+
+
+def test_upload_from_an_empty_directory_refuses_to_delete_everything(tmp_path):
+    (tmp_path / "local" / "project").mkdir(parents=True)
+    _write(tmp_path / "remote" / "keep.txt", "keep")
+
+    result = _sync(tmp_path)
+
+    assert result["status"] == "error"
+    assert "Refusing to delete all 1" in result["content"][0]["text"]
+    assert (tmp_path / "remote" / "keep.txt").exists()
+
+
+def test_upload_reports_files_it_could_not_delete(tmp_path, monkeypatch):
+    _write(tmp_path / "local" / "project" / "keep.txt", "keep")
+    _write(tmp_path / "remote" / "keep.txt", "keep")
+    _write(tmp_path / "remote" / "locked.txt", "locked")
+
+    def refuse(path):
+        raise PermissionError(f"Permission denied: '{path}'")
+
+    monkeypatch.setattr(os, "remove", refuse)
+    result = _sync(tmp_path)
+
+    summary = result["content"][1]["json"]
+    assert result["status"] == "error"
+    assert summary["deleted"] == []
+    assert list(summary["deleteFailed"]) == ["locked.txt"]
+
+
+def test_symbolic_links_are_not_uploaded(tmp_path):
+    outside = tmp_path / "secret.txt"
+    _write(outside, "secret")
+    _write(tmp_path / "local" / "project" / "file.txt", "file")
+    os.symlink(outside, tmp_path / "local" / "project" / "link.txt")
+
+    result = _sync(tmp_path)
+
+    assert result["content"][0]["json"]["transferred"] == ["file.txt"]
+    assert not (tmp_path / "remote" / "link.txt").exists()
+
+
+def test_download_refuses_to_write_through_a_symbolic_link(tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (tmp_path / "local" / "project").mkdir(parents=True)
+    os.symlink(outside, tmp_path / "local" / "project" / "data")
+    _write(tmp_path / "remote" / "data" / "payload.txt", "payload")
+
+    result = _sync(tmp_path, direction="download")
+
+    assert result["status"] == "error"
+    assert "data/payload.txt" in result["content"][0]["text"]
+    assert list(outside.iterdir()) == []
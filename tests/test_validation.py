@@ -0,0 +1,61 @@
+import shutil
+
+import pytest
+
+from strands_sandbox.validation import check_python, external_checker
+
+
+def test_valid_python_passes():
+    assert check_python("x = 1\nprint(x)") is None
+
+
+def test_top_level_await_passes():
+    assert check_python("import asyncio\nawait asyncio.sleep(0)") is None
+
+
+def test_syntax_error_is_reported():
+    error = check_python("def f(:\n    pass")
+    assert error is not None
+    assert "SyntaxError" in error
+
+
+def test_comment_ending_in_question_mark_does_not_hide_errors():
+    assert check_python("def f(:\n  pass\n# ok?") is not None
+    assert check_python("x = (1,\ny = 2  # why?") is not None
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "!pip install numpy",
+        "%timeit sum(range(10))",
+        "files = !ls",
+        "import os\nos.path?",
+        "len??",
+        "?print",
+        "%%bash\necho hi",
+        "for i in range(3):\n    !echo $i",
+    ],
+)
+def test_ipython_syntax_passes(code):
+    assert check_python(code) is None
+
+
+def test_errors_next_to_ipython_lines_are_reported():
+    error = check_python("!ls\ndef f(:\n    pass")
+    assert error is not None
+    assert "line 2" in error
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_javascript_expressions_pass():
+    check = external_checker(["node", "--check"], ".js", expressions=True)
+    assert check("{a: 1, b: 2}") is None
+    assert check("const x = 1\nx + 1") is None
+    assert check("function (") is not None
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_javascript_script_checker_without_expressions():
+    check = external_checker(["node", "--check"], ".js")
+    assert check("{a: 1, b: 2}") is not None